@@ -0,0 +1,125 @@
+"""
+Measure cache.db size and the startup tag query before and after the migration to integer tag ids.
+
+    python benchmarks/cache_db.py [--files 100000] [--tags-per-file 40] [--vocabulary 20000] [--window 2000] [--seed 0]
+
+A cache.db in the previous layout (ttags storing the tag text, indexed by tag and by id) is generated
+for a synthetic library, then migrated by create_table() of a temporary copy of the extension loaded
+against the WebUI stubs. Reports as JSON, for both layouts, the database size and the time to read the
+tags of the newest `--window` files, plus the time the migration took.
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+extension_dir = Path(__file__).parents[1]
+
+LEGACY_SCHEMA = [
+    """
+    CREATE TABLE tfiles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        directory TEXT,
+        name TEXT,
+        timestamp REAL,
+        counted INTEGER DEFAULT 0
+    )
+    """,
+    "CREATE INDEX tfiles_directory_name ON tfiles(directory, name)",
+    "CREATE INDEX tfiles_directory_timestamp ON tfiles(directory, timestamp DESC)",
+    "CREATE TABLE ttags (id INTEGER, tag TEXT, tag_order INTEGER)",
+    "CREATE INDEX ttags_tag ON ttags(tag)",
+    "CREATE INDEX ttags_id_order ON ttags(id, tag_order)",
+]
+
+LEGACY_FETCH = "SELECT ttags.id, tag FROM tdelta INNER JOIN ttags ON tdelta.id = ttags.id ORDER BY ttags.id, tag_order"
+
+
+def generate_legacy_db(db_path: str, files: int, tags_per_file: int, vocabulary: int, rnd: random.Random) -> None:
+    words = [f"tag_{i}_{'x' * rnd.randint(0, 16)}" for i in range(vocabulary)]
+    weights = [1 / (i + 1) for i in range(vocabulary)]
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    for statement in LEGACY_SCHEMA:
+        cursor.execute(statement)
+    for file_id in range(1, files + 1):
+        cursor.execute(
+            "INSERT INTO tfiles(id, directory, name, timestamp, counted) VALUES (?, ?, ?, ?, 1)",
+            (file_id, "<save>", f"{file_id:08d}.png", 1_600_000_000 + file_id)
+        )
+        tags = rnd.choices(words, weights, k=tags_per_file)
+        cursor.executemany("INSERT INTO ttags(id, tag, tag_order) VALUES (?, ?, ?)", [(file_id, tag, i) for i, tag in enumerate(tags, 1)])
+    conn.commit()
+    conn.close()
+
+
+def measure(db_path: str, window: int, fetch) -> Dict[str, Any]:
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    cursor.execute("SELECT id FROM tfiles ORDER BY timestamp DESC LIMIT ?", (window,))
+    file_ids = [row[0] for row in cursor.fetchall()]
+    start = time.perf_counter()
+    rows = fetch(cursor, file_ids)
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return {"bytes": os.path.getsize(db_path), "fetch_seconds": elapsed, "fetched_files": rows}
+
+
+def legacy_fetch(cursor: sqlite3.Cursor, file_ids: list) -> int:
+    cursor.execute("CREATE TEMP TABLE tdelta (id INTEGER PRIMARY KEY)")
+    cursor.executemany("INSERT INTO tdelta(id) VALUES (?)", [(file_id,) for file_id in file_ids])
+    tags_by_id: Dict[int, list] = {}
+    for file_id, tag in cursor.execute(LEGACY_FETCH):
+        tags_by_id.setdefault(file_id, []).append(tag)
+    return len(tags_by_id)
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--files", type=int, default=100000)
+    arg_parser.add_argument("--tags-per-file", type=int, default=40)
+    arg_parser.add_argument("--vocabulary", type=int, default=20000)
+    arg_parser.add_argument("--window", type=int, default=2000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="prompt_pilot_cache_db_")
+    try:
+        shutil.copytree(extension_dir / "scripts", os.path.join(workdir, "scripts"))
+        os.makedirs(os.path.join(workdir, "tags"))
+        db_path = os.path.join(workdir, "cache.db")
+        generate_legacy_db(db_path, args.files, args.tags_per_file, args.vocabulary, random.Random(args.seed))
+        before = measure(db_path, args.window, legacy_fetch)
+
+        sys.path.insert(0, str(Path(__file__).parent))
+        import webui_stubs
+
+        webui_stubs.install({"prompt_pilot_enabled": False, "prompt_pilot_tag_sync_timeout": 0})
+        sys.path.insert(0, workdir)
+        main = importlib.import_module("scripts.main")
+        start = time.perf_counter()
+        main.create_table()
+        migration_seconds = time.perf_counter() - start
+        after = measure(db_path, args.window, lambda cursor, file_ids: len(main._fetch_tags_by_ids(cursor, file_ids)))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps({
+        "config": vars(args),
+        "before": before,
+        "after": after,
+        "migration_seconds": migration_seconds,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compare the header-only metadata reader with the PIL path on a directory of images.
+
+    python benchmarks/metadata_reader.py <image directory> [--limit N]
+
+Reports time and bytes read per file for both readers (bytes come from /proc/self/io and are
+only available on Linux) and lists every file whose result differs.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from scripts.metadata import EXTENSIONS, get_prompt, get_prompt_pil  # noqa: E402
+
+
+def read_bytes() -> int:
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return -1
+
+
+def run(reader, files):
+    results = []
+    start_bytes = read_bytes()
+    start = time.perf_counter()
+    for file in files:
+        results.append(reader(file))
+    elapsed = time.perf_counter() - start
+    return results, elapsed, read_bytes() - start_bytes
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("directory")
+    arg_parser.add_argument("--limit", type=int, default=1000)
+    args = arg_parser.parse_args()
+
+    files = []
+    for root, __, filenames in os.walk(args.directory):
+        for filename in filenames:
+            if "." + filename.split(".")[-1].lower() in EXTENSIONS:
+                files.append(os.path.join(root, filename))
+    files = files[:args.limit]
+    if not files:
+        print("no images found")
+        return
+
+    pil_results, pil_time, pil_bytes = run(get_prompt_pil, files)
+    header_results, header_time, header_bytes = run(get_prompt, files)
+
+    for name, elapsed, size in [("pil", pil_time, pil_bytes), ("header", header_time, header_bytes)]:
+        print(f"{name:>6}: {elapsed / len(files) * 1e6:10.1f} us/file  {size / len(files):12.0f} bytes/file")
+
+    mismatches = [file for file, a, b in zip(files, pil_results, header_results) if a != b]
+    print(f"{len(files)} files, {len(mismatches)} mismatches")
+    for file in mismatches:
+        print(f"  {file}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
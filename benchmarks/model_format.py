@@ -0,0 +1,103 @@
+"""
+Compare the size and parse time of models.json.gz in the nested and in the columnar format.
+
+    python benchmarks/model_format.py [--tags 100000] [--aliases 30000] [--used 3000] [--neighbours 50] [--loras 200] [--seed 0]
+
+Synthetic models shaped like those of a full danbooru dictionary are written both ways, and the gzip size, the
+JSON size and the time to gunzip and json.loads each file are reported as JSON. The columnar file is also
+decoded back and compared with the nested models.
+"""
+import argparse
+import gzip
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+from scripts import model_format  # noqa: E402
+
+
+def generate_models(args: argparse.Namespace, rnd: random.Random) -> Dict[str, Any]:
+    tags = [f"{rnd.choice(['long', 'short', 'blue', 'red', 'open'])} {rnd.choice(['hair', 'eyes', 'dress', 'mouth'])} {i}" for i in range(args.tags)]
+    tag_models = {
+        tag: {"post_count": int(rnd.paretovariate(0.8)), "category": rnd.choice([0, 0, 0, 1, 3, 4, 5]), "aliases": [], "use_count": 0}
+        for tag in tags
+    }
+    for i in range(args.aliases):
+        tag_models[rnd.choice(tags)]["aliases"].append(f"alias {i}")
+    used = rnd.sample(tags, args.used)
+    for tag in used:
+        tag_models[tag]["use_count"] = rnd.randint(1, 500)
+    for i in range(args.used // 10):
+        tag_models[f"custom tag {i}"] = {"post_count": 0, "category": "custom", "aliases": [], "use_count": rnd.randint(1, 50)}
+    suggestion_models = {tag: {neighbour: rnd.randint(1, 100) for neighbour in rnd.sample(used, args.neighbours)} for tag in used}
+    lora_models = {
+        f"lora_{i}": {"search_words": [f"lora {i}", "sdxl 1.0", f"trigger {i}"], "preview_file": "./file=html/card-no-preview.png"}
+        for i in range(args.loras)
+    }
+    return {"version": 1, "tagModels": tag_models, "suggestionModels": suggestion_models, "loraModels": lora_models}
+
+
+def decode(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Python counterpart of decodeModels() in react/src/services/modelFormat.ts.
+    """
+    strings = data["strings"]
+    tags = data["tags"]
+    tag_models = {}
+    for i in range(tags["count"]):
+        category = tags["category"][i]
+        tag_models[strings[i]] = {
+            "post_count": tags["postCount"][i],
+            "category": "custom" if category == model_format.CUSTOM_CATEGORY else category,
+            "aliases": [strings[j] for j in tags["aliases"][tags["aliasOffsets"][i]:tags["aliasOffsets"][i + 1]]],
+            "use_count": tags["useCount"][i],
+        }
+    suggestions = data["suggestions"]
+    suggestion_models = {}
+    for i, tag in enumerate(suggestions["tag"]):
+        start, end = suggestions["offsets"][i], suggestions["offsets"][i + 1]
+        suggestion_models[strings[tag]] = {strings[n]: score for n, score in zip(suggestions["neighbour"][start:end], suggestions["score"][start:end])}
+    loras = data["loras"]
+    lora_models = {}
+    for i, name in enumerate(loras["name"]):
+        lora_models[strings[name]] = {
+            "search_words": [strings[j] for j in loras["words"][loras["wordOffsets"][i]:loras["wordOffsets"][i + 1]]],
+            "preview_file": strings[loras["previewFile"][i]],
+        }
+    return {"version": data["version"], "tagModels": tag_models, "suggestionModels": suggestion_models, "loraModels": lora_models}
+
+
+def measure(data: Dict[str, Any]) -> Dict[str, Any]:
+    text = json.dumps(data, ensure_ascii=True, separators=(',', ':'))
+    compressed = gzip.compress(text.encode("utf-8"))
+    start = time.perf_counter()
+    json.loads(gzip.decompress(compressed))
+    return {"json_bytes": len(text), "gz_bytes": len(compressed), "parse_seconds": time.perf_counter() - start}
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--tags", type=int, default=100000)
+    arg_parser.add_argument("--aliases", type=int, default=30000)
+    arg_parser.add_argument("--used", type=int, default=3000)
+    arg_parser.add_argument("--neighbours", type=int, default=50)
+    arg_parser.add_argument("--loras", type=int, default=200)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    models = generate_models(args, random.Random(args.seed))
+    compact = model_format.encode(models)
+    print(json.dumps({
+        "config": vars(args),
+        "nested": measure(models),
+        "columnar": measure(compact),
+        "round_trip": decode(compact) == models,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
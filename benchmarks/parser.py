@@ -0,0 +1,166 @@
+"""
+Check scripts/parser.py against the previous character-by-character tokenizer and time both.
+
+    python benchmarks/parser.py [--repeat 2000] [--prompts <file with one prompt per line>]
+
+Every prompt of benchmarks/parser_corpus.json (and of --prompts, if given) must give identical
+tags from both implementations; the script exits 1 on the first mismatch.
+Timings are printed as JSON in microseconds per prompt.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+import scripts.parser as parser  # noqa: E402
+from scripts.parser import (  # noqa: E402
+    PREFIX_LENGTH, NestType, closer_for_type, closer_to_type, delimiters, dynamic_prompt_regex, is_number,
+    match_meta_keyword_regex, opener_to_type
+)
+
+
+def get_tags_reference(prompt: str) -> list:
+    """
+    The tokenizer as it was before the slice-based rewrite, kept verbatim as the parity reference.
+    """
+    prompt = match_meta_keyword_regex.sub(
+        lambda match: ",".ljust(len(match.group()), " "), prompt)
+    prompt = dynamic_prompt_regex.sub(
+        lambda match: "{" + " " * len(match.group(1)) + match.group(2) + "}", prompt)
+
+    is_escaped = False
+    nest_types = [NestType.ROOT]
+
+    tag = ""
+    tokens = []
+
+    def flush(token):
+        token = token.replace("_", " ").strip()
+        if token != "":
+            tokens.append(token)
+
+    skip_counter = 0
+    for i in range(len(prompt)):
+        if skip_counter > 0:
+            skip_counter -= 1
+            continue
+        char = prompt[i]
+
+        current_nest_type = nest_types[-1]
+
+        if char == "\n":
+            flush(tag)
+            tag = ""
+            is_escaped = False
+            continue
+        if is_escaped:
+            tag += char
+            is_escaped = False
+            continue
+        if char == "\\":
+            is_escaped = True
+            continue
+
+        if char in opener_to_type:
+            opener_type = opener_to_type[char]
+            if opener_type == NestType.ANGLE:
+                if len(prompt) - i > PREFIX_LENGTH:
+                    lora_prefix = prompt[i+1:i+PREFIX_LENGTH+1]
+                    if lora_prefix == "lora:" or lora_prefix == "lyco:":
+                        opener_type = NestType.LORA
+
+            nest_types.append(opener_type)
+
+            if opener_type == NestType.LORA:
+                skip_counter = PREFIX_LENGTH
+
+            flush(tag)
+            tag = ""
+            continue
+
+        if char in closer_to_type:
+            expected_closer = closer_for_type[current_nest_type]
+            if char != expected_closer:
+                tag += char
+                continue
+
+            if current_nest_type == NestType.PAREN or current_nest_type == NestType.SQUARE:
+                colon_index = tag.rfind(":")
+                if colon_index >= 0:
+                    word = tag[:colon_index]
+                    weight_value = tag[colon_index+1:]
+                    if is_number(weight_value):
+                        tag = word
+                elif current_nest_type == NestType.SQUARE:
+                    if is_number(tag):
+                        tag = ""
+            elif current_nest_type == NestType.LORA:
+                tag = ""
+
+            nest_types.pop()
+
+            flush(tag)
+            tag = ""
+            continue
+
+        if current_nest_type == NestType.LORA:
+            if tag != "" or char != " ":
+                tag += char
+            continue
+
+        if char in delimiters.get(current_nest_type, set()):
+            flush(tag)
+            tag = ""
+            continue
+
+        tag += char
+
+    tag = tag.replace("_", " ").strip()
+    if tag != "":
+        tokens.append(tag)
+
+    return tokens
+
+
+def measure(function, prompts, repeat: int) -> float:
+    start = time.perf_counter()
+    for __ in range(repeat):
+        function(prompts)
+    return (time.perf_counter() - start) / (repeat * len(prompts)) * 1e6
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--repeat", type=int, default=2000)
+    arg_parser.add_argument("--prompts")
+    args = arg_parser.parse_args()
+
+    with open(Path(__file__).parent / "parser_corpus.json", "r", encoding="utf-8") as f:
+        prompts = json.load(f)
+    if args.prompts:
+        with open(args.prompts, "r", encoding="utf-8") as f:
+            prompts += [line.rstrip("\n") for line in f]
+
+    for prompt in prompts:
+        expected = get_tags_reference(prompt)
+        actual = parser.get_tags(prompt)
+        if actual != expected:
+            print(json.dumps({"mismatch": prompt, "expected": expected, "actual": actual}, ensure_ascii=False))
+            sys.exit(1)
+    if parser.get_tags_batch(prompts + [None]) != [get_tags_reference(prompt) for prompt in prompts] + [[]]:
+        print(json.dumps({"mismatch": "get_tags_batch"}))
+        sys.exit(1)
+
+    print(json.dumps({
+        "prompts": len(prompts),
+        "reference_us": measure(lambda batch: [get_tags_reference(prompt) for prompt in batch], prompts, args.repeat),
+        "get_tags_us": measure(lambda batch: [parser.get_tags(prompt) for prompt in batch], prompts, args.repeat),
+        "get_tags_batch_us": measure(parser.get_tags_batch, prompts, args.repeat),
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Time every stage of the model build on a synthetic, reproducible corpus.
+
+    python benchmarks/pipeline.py [--images 2000] [--tags 100000] [--aliases 30000] [--loras 200] [--runs 3] [--seed 0] [--output result.json]
+
+A temporary copy of the extension is created with
+    tags/synthetic/tags.csv, tag_aliases.csv  a generated dictionary of the requested size
+    images/                                   PNG files with a `parameters` text chunk and WebP files
+                                              with an EXIF UserComment, as the WebUI writes them
+    loras/                                    LoRA stand-ins, some with .civitai.info and preview files
+Every run imports scripts/main.py in a fresh process against the WebUI stubs (benchmarks/webui_stubs.py)
+and times each stage in isolation, followed by the whole build from an empty and from a warm cache.
+The result is printed as one JSON document: the configuration, the seconds per stage of every run
+and the median over all runs. The same arguments always produce the same corpus.
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+extension_dir = Path(__file__).parents[1]
+
+SOURCE = "synthetic"
+WORDS = [
+    "hair", "eyes", "long", "short", "blue", "red", "black", "white", "smile", "open", "mouth", "dress",
+    "shirt", "skirt", "looking", "at", "viewer", "sky", "cloud", "outdoors", "indoors", "holding", "sword",
+    "flower", "school", "uniform", "hat", "ribbon", "standing", "sitting", "from", "side", "above", "below",
+]
+
+
+def synthetic_tag(rnd: random.Random, i: int) -> str:
+    return "_".join(rnd.choice(WORDS) for __ in range(rnd.randint(1, 3))) + f"_{i}"
+
+
+def generate_dictionary(tags_dir: str, tag_count: int, alias_count: int, rnd: random.Random) -> list:
+    os.makedirs(tags_dir, exist_ok=True)
+    tags = [synthetic_tag(rnd, i) for i in range(tag_count)]
+    with open(os.path.join(tags_dir, "tags.csv"), "w", encoding="utf-8") as f:
+        f.write("id,name,category,post_count\n")
+        for i, tag in enumerate(tags):
+            f.write(f"{i},{tag},{rnd.choice([0, 0, 0, 1, 3, 4, 5])},{int(rnd.paretovariate(0.8))}\n")
+    with open(os.path.join(tags_dir, "tag_aliases.csv"), "w", encoding="utf-8") as f:
+        f.write("id,antecedent_name,consequent_name\n")
+        for i in range(alias_count):
+            f.write(f"{i},alias_{synthetic_tag(rnd, i)},{rnd.choice(tags)}\n")
+    return tags
+
+
+def synthetic_prompt(rnd: random.Random, tags: list, loras: int) -> str:
+    parts = []
+    for __ in range(rnd.randint(5, 40)):
+        tag = rnd.choice(tags) if rnd.random() < 0.9 else f"custom_{rnd.randint(0, 500)}"
+        roll = rnd.random()
+        if roll < 0.1:
+            tag = f"({tag}:{rnd.uniform(0.5, 1.5):.1f})"
+        elif roll < 0.15:
+            tag = f"[{tag}]"
+        elif roll < 0.18:
+            tag = f"{{{tag}|{rnd.choice(tags)}}}"
+        elif roll < 0.2:
+            tag = "BREAK"
+        parts.append(tag)
+    if loras and rnd.random() < 0.5:
+        parts.append(f"<lora:lora_{rnd.randrange(loras)}:0.8>")
+    prompt = ", ".join(parts)
+    return f"{prompt}\nNegative prompt: lowres, bad anatomy\nSteps: 20, Sampler: Euler a, CFG scale: 7, Seed: {rnd.randint(0, 2**32)}"
+
+
+def generate_images(images_dir: str, count: int, tags: list, loras: int, rnd: random.Random) -> None:
+    import piexif
+    import piexif.helper
+    from PIL import Image, PngImagePlugin
+
+    image = Image.new("RGB", (64, 64), (128, 128, 128))
+    for i in range(count):
+        directory = os.path.join(images_dir, f"{i // 500:05d}")
+        os.makedirs(directory, exist_ok=True)
+        parameters = synthetic_prompt(rnd, tags, loras)
+        if i % 4 == 3:
+            path = os.path.join(directory, f"{i:08d}.webp")
+            exif = piexif.dump({"Exif": {piexif.ExifIFD.UserComment: piexif.helper.UserComment.dump(parameters, encoding="unicode")}})
+            image.save(path, "WEBP", exif=exif)
+        else:
+            path = os.path.join(directory, f"{i:08d}.png")
+            info = PngImagePlugin.PngInfo()
+            info.add_text("parameters", parameters)
+            image.save(path, "PNG", pnginfo=info)
+        # deterministic timestamps so the newest-N window is the same on every run
+        os.utime(path, (1_600_000_000 + i, 1_600_000_000 + i))
+
+
+def generate_loras(loras_dir: str, count: int, rnd: random.Random) -> Dict[str, Dict[str, str]]:
+    os.makedirs(loras_dir, exist_ok=True)
+    loras = {}
+    for i in range(count):
+        name = f"lora_{i}"
+        path = os.path.join(loras_dir, f"{name}.safetensors")
+        with open(path, "wb"):
+            pass
+        if i % 2 == 0:
+            with open(os.path.join(loras_dir, f"{name}.civitai.info"), "w", encoding="utf-8") as f:
+                json.dump({"baseModel": rnd.choice(["SD 1.5", "SDXL 1.0", "Pony"]), "trainedWords": [f"trigger {i}", rnd.choice(WORDS)]}, f)
+        if i % 3 == 0:
+            with open(os.path.join(loras_dir, f"{name}.preview.png"), "wb"):
+                pass
+        loras[name] = {"name": name, "alias": name, "filename": path}
+    return loras
+
+
+def timed(stages: Dict[str, float], name: str, function: Callable, *args) -> Any:
+    start = time.perf_counter()
+    result = function(*args)
+    stages[name] = time.perf_counter() - start
+    return result
+
+
+def run_child(workdir: str, image_count: int) -> None:
+    sys.path.insert(0, str(Path(__file__).parent))
+    import webui_stubs
+
+    with open(os.path.join(workdir, "loras.json"), "r", encoding="utf-8") as f:
+        loras = {name: types.SimpleNamespace(**lora) for name, lora in json.load(f).items()}
+    images_dir = os.path.join(workdir, "images")
+    webui_stubs.install({
+        # keep the import from starting the background build; the stages are run one by one below
+        "prompt_pilot_enabled": False,
+        # and from updating the tag dictionary over the network
+        "prompt_pilot_tag_sync_timeout": 0,
+        # the cleanup queued after each build would print behind the result line and is not a build stage
+        "prompt_pilot_cache_retention_enabled": False,
+        "prompt_pilot_tag_source": SOURCE,
+        "prompt_pilot_analysis_directory": [images_dir],
+        "prompt_pilot_analysis_image_count": image_count,
+    }, loras)
+    sys.path.insert(0, workdir)
+
+    stages: Dict[str, float] = {}
+    main = timed(stages, "import", importlib.import_module, "scripts.main")
+    from scripts import parser, tag_dictionary
+    from scripts.database import DBManager
+    from scripts.metadata import get_prompt
+
+    db_path = os.path.join(workdir, "cache.db")
+    cache_dir = os.path.join(workdir, "tags_cache")
+    tags_dir = os.path.join(workdir, "tags", SOURCE)
+
+    def reset_cache() -> None:
+        for path in [db_path, f"{db_path}-wal", f"{db_path}-shm"]:
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    reset_cache()
+    main.create_table()
+    with DBManager(db_path) as conn:
+        cursor = conn.cursor()
+        directories = [(images_dir, images_dir)]
+        timed(stages, "scan_cold", main._get_window_files, cursor, directories, image_count)
+        window = timed(stages, "scan_warm", main._get_window_files, cursor, directories, image_count)
+        files = [file for __, __, file, __ in window]
+
+    prompts = timed(stages, "read_metadata", lambda: [get_prompt(file) for file in files])
+    tags = timed(stages, "parse", parser.get_tags_batch, prompts)
+
+    reset_cache()
+    main.create_table()
+    with DBManager(db_path) as conn:
+        cursor = conn.cursor()
+        timed(stages, "process_files_cold", main.process_ai_illust_files, cursor)
+    with DBManager(db_path) as conn:
+        cursor = conn.cursor()
+        timed(stages, "process_files_warm", main.process_ai_illust_files, cursor)
+        tag_counter, suggest_counter = timed(stages, "fetch_tag_counts", main._fetch_tag_counts, cursor)
+
+    timed(stages, "csv_load_cold", tag_dictionary.load, tags_dir, cache_dir)
+    timed(stages, "csv_load_warm", tag_dictionary.load, tags_dir, cache_dir)
+
+    with DBManager(db_path) as conn:
+        cursor = conn.cursor()
+        tag_models, suggestion_models = timed(stages, "build_tag_models", main._build_tag_models, cursor)
+    lora_models = timed(stages, "build_lora_models", main._build_lora_models)
+    models = {"suggestionModels": suggestion_models, "tagModels": tag_models, "loraModels": lora_models}
+    output_path = timed(stages, "write_models", main._write_models, models)
+
+    reset_cache()
+    timed(stages, "build_models_cold", main._build_models)
+    timed(stages, "build_models_warm", main._build_models)
+
+    print(json.dumps({
+        "stages": stages,
+        "counts": {
+            "files": len(files),
+            "prompts": sum(prompt is not None for prompt in prompts),
+            "tags": sum(len(file_tags) for file_tags in tags),
+            "used_tags": len(tag_counter),
+            "suggestion_tags": len(suggest_counter),
+            "tag_models": len(tag_models),
+            "lora_models": len(lora_models),
+            "models_gz_bytes": os.path.getsize(output_path),
+        }
+    }))
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--images", type=int, default=2000)
+    arg_parser.add_argument("--tags", type=int, default=100000)
+    arg_parser.add_argument("--aliases", type=int, default=30000)
+    arg_parser.add_argument("--loras", type=int, default=200)
+    arg_parser.add_argument("--runs", type=int, default=3)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--output", help="also write the result to this file")
+    arg_parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.images)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="prompt_pilot_pipeline_")
+    try:
+        shutil.copytree(extension_dir / "scripts", os.path.join(workdir, "scripts"))
+        rnd = random.Random(args.seed)
+        start = time.perf_counter()
+        tags = generate_dictionary(os.path.join(workdir, "tags", SOURCE), args.tags, args.aliases, rnd)
+        generate_images(os.path.join(workdir, "images"), args.images, tags, args.loras, rnd)
+        loras = generate_loras(os.path.join(workdir, "loras"), args.loras, rnd)
+        with open(os.path.join(workdir, "loras.json"), "w", encoding="utf-8") as f:
+            json.dump(loras, f)
+        generate_seconds = time.perf_counter() - start
+
+        runs = []
+        for __ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, __file__, "--images", str(args.images), "--child", workdir],
+                check=True, capture_output=True, text=True
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        "config": {
+            "images": args.images,
+            "tags": args.tags,
+            "aliases": args.aliases,
+            "loras": args.loras,
+            "runs": args.runs,
+            "seed": args.seed,
+            "python": sys.version.split()[0],
+        },
+        "generate_seconds": generate_seconds,
+        "counts": runs[0]["counts"] if runs else {},
+        "runs": [run["stages"] for run in runs],
+        "median": {stage: statistics.median(run["stages"][stage] for run in runs) for stage in (runs[0]["stages"] if runs else {})},
+    }
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
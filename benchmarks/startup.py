@@ -0,0 +1,78 @@
+"""
+Measure how long the extension adds to WebUI startup.
+
+    python benchmarks/startup.py --images <image directory> [--runs 3] [--count 2000]
+
+Each run imports scripts/main.py in a fresh process from a temporary copy of the extension
+(the tags directory is shared) and reports two numbers as JSON:
+
+    import_seconds  time the WebUI script loader is blocked by the import
+    ready_seconds   time until the background model build has written models.json.gz
+
+The first run starts from an empty cache.db, the following ones reuse it.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+extension_dir = Path(__file__).parents[1]
+
+
+def run_child(workdir: str, images: str, count: int) -> None:
+    sys.path.insert(0, str(Path(__file__).parent))
+    import webui_stubs
+
+    webui_stubs.install({
+        "prompt_pilot_analysis_directory": [images],
+        "prompt_pilot_analysis_image_count": count,
+    })
+    sys.path.insert(0, workdir)
+
+    start = time.perf_counter()
+    import scripts.main as main
+    imported = time.perf_counter()
+    main.get_models_future().result()
+    ready = time.perf_counter()
+
+    print(json.dumps({"import_seconds": imported - start, "ready_seconds": ready - start}))
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--images", required=True)
+    arg_parser.add_argument("--runs", type=int, default=3)
+    arg_parser.add_argument("--count", type=int, default=2000)
+    arg_parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.child:
+        run_child(args.child, os.path.abspath(args.images), args.count)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="prompt_pilot_bench_")
+    try:
+        shutil.copytree(extension_dir / "scripts", os.path.join(workdir, "scripts"))
+        os.symlink(extension_dir / "tags", os.path.join(workdir, "tags"), target_is_directory=True)
+        results = []
+        for i in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, __file__, "--images", args.images, "--count", str(args.count), "--child", workdir],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            result["run"] = i
+            result["cache"] = "cold" if i == 0 else "warm"
+            results.append(result)
+            print(json.dumps(result))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
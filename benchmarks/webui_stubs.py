@@ -0,0 +1,66 @@
+"""
+Minimal stand-ins for the WebUI modules that scripts/main.py imports, so the extension can be
+loaded and timed outside the WebUI. gradio, fastapi, polars, PIL and piexif must be installed.
+"""
+import sys
+import types
+from typing import Any, Dict
+
+
+class _Opts:
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+
+
+class _OptionInfo:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def needs_reload_ui(self) -> "_OptionInfo":
+        return self
+
+    def info(self, *args) -> "_OptionInfo":
+        return self
+
+
+def _module(name: str, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install(opts: Dict[str, Any], loras: Dict[str, Any] = None) -> types.SimpleNamespace:
+    """
+    Register the stub modules. `loras` maps LoRA names to objects with `name`, `alias` and `filename`.
+    Returns the registered callbacks and the stubbed `shared` / `networks` objects.
+    """
+    callbacks: Dict[str, list] = {}
+
+    def register(name):
+        return lambda callback: callbacks.setdefault(name, []).append(callback)
+
+    shared = _module(
+        "modules.shared",
+        opts=_Opts(opts),
+        OptionInfo=_OptionInfo,
+        options_templates={},
+        options_section=lambda section, options: options,
+    )
+    script_callbacks = _module(
+        "modules.script_callbacks",
+        ImageSaveParams=object,
+        on_ui_settings=register("ui_settings"),
+        on_app_started=register("app_started"),
+        on_image_saved=register("image_saved"),
+    )
+    ui_components = _module("modules.ui_components", DropdownMulti=None)
+    options = _module("modules.options", OptionHTML=lambda *args, **kwargs: None)
+    _module("modules", shared=shared, script_callbacks=script_callbacks, ui_components=ui_components, options=options)
+
+    networks = types.SimpleNamespace(available_networks=loras or {})
+    _module("extensions-builtin")
+    _module("extensions-builtin.Lora")
+    _module("extensions-builtin.Lora.ui_extra_networks_lora", networks=networks)
+
+    return types.SimpleNamespace(callbacks=callbacks, shared=shared, networks=networks)
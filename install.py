@@ -2,3 +2,5 @@ import launch
 
 if not launch.is_installed("polars"):
     launch.run_pip("install polars", "polars")
+if not launch.is_installed("scipy"):
+    launch.run_pip("install scipy", "scipy")
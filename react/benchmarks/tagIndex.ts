@@ -0,0 +1,300 @@
+// Compare the heap size and the per-query time of the tag index before and after the sorted word index.
+//
+//     npm run benchmark-tag-index -- [--tags 100000] [--aliases 30000] [--vocabulary 20000] [--queries 200] [--seed 0]
+//
+// A synthetic dictionary is indexed with the previous prefix maps (kept below, with the searchTag that used them)
+// and with tagService, and the same queries of one, two and three letters, whole words and two words are run on
+// both, as well as every keystroke of typing two words one after the other. Reports as JSON the heap the index and the models take, the build time, the mean time per query of each
+// kind, and whether both returned the same results for every query.
+import * as tagService from '@/services/tagService';
+import { ResponseData } from '@/types/api';
+import { ItemProps } from '@/types/props';
+
+declare const process: { argv: string[]; memoryUsage: () => { heapUsed: number } };
+
+const GROUP_LIMITS: Record<string, number> = { '0': 30, '1': 10, '3': 10, '4': 10, '5': 10, custom: 20 };
+
+function parseArgs(): Record<string, number> {
+    const args: Record<string, number> = { tags: 100000, aliases: 30000, vocabulary: 20000, queries: 200, seed: 0 };
+    const argv = process.argv.slice(2);
+    for (let i = 0; i < argv.length; i += 2) {
+        args[argv[i].replace(/^--/, '')] = Number(argv[i + 1]);
+    }
+    return args;
+}
+
+function createRandom(seed: number): (n: number) => number {
+    let state = seed + 1;
+    return (n: number) => {
+        state = (Math.imul(state, 1103515245) + 12345) & 0x7fffffff;
+        return state % n;
+    };
+}
+
+function generateModels(args: Record<string, number>, rnd: (n: number) => number): ResponseData {
+    const letters = 'abcdefghijklmnopqrstuvwxyz';
+    const vocabulary = Array.from({ length: args.vocabulary }, () => Array.from({ length: 2 + rnd(8) }, () => letters[rnd(26)]).join(''));
+    // frequent words are reused by many tags, like "hair" or "long" in the danbooru dictionary
+    const pickWord = () => vocabulary[Math.floor(vocabulary.length * Math.pow(rnd(10000) / 10000, 3))];
+    const categories = ['0', '0', '0', '1', '3', '4', '5'];
+    const tagModels: ResponseData['tagModels'] = {};
+    const tags: string[] = [];
+    while (tags.length < args.tags) {
+        const tag = Array.from({ length: 1 + rnd(3) }, pickWord).join(rnd(4) ? ' ' : '_');
+        if (!(tag in tagModels)) {
+            tagModels[tag] = { post_count: rnd(100000), category: categories[rnd(categories.length)], is_deprecated: false, aliases: [], use_count: 0 };
+            tags.push(tag);
+        }
+    }
+    for (let i = 0; i < args.aliases; i++) {
+        tagModels[tags[rnd(tags.length)]].aliases.push(`${pickWord()} ${pickWord()}`);
+    }
+    for (let i = 0; i < 3000; i++) {
+        tagModels[tags[rnd(tags.length)]].use_count = 1 + rnd(500);
+    }
+    return { version: 1, tagModels: tagModels, suggestionModels: {}, loraModels: {} };
+}
+
+function generateQueries(models: ResponseData, count: number, rnd: (n: number) => number): Record<string, string[]> {
+    const words = Object.keys(models.tagModels).flatMap((tag) => tag.split(/[ _-]/g));
+    const word = () => words[rnd(words.length)];
+    const queries: Record<string, string[]> = { '1 letter': [], '2 letters': [], '3 letters': [], word: [], 'two words': [], typing: [] };
+    for (let i = 0; i < count; i++) {
+        queries['1 letter'].push(word().slice(0, 1));
+        queries['2 letters'].push(word().slice(0, 2));
+        queries['3 letters'].push(word().slice(0, 3));
+        queries['word'].push(word());
+        queries['two words'].push(`${word()} ${word().slice(0, 2)}`);
+        if (i % 10 === 0) {
+            const typed = `${word()} ${word()}`;
+            for (let j = 1; j <= typed.length; j++) {
+                queries['typing'].push(typed.slice(0, j));
+            }
+        }
+    }
+    return queries;
+}
+
+function heapUsed(): number {
+    // run with --expose-gc, otherwise garbage still to be collected is counted as well
+    const gc: (() => void) | undefined = (globalThis as any).gc;
+    if (gc) {
+        gc();
+        gc();
+    }
+    return process.memoryUsage().heapUsed;
+}
+
+function measure(
+    models: ResponseData,
+    queries: Record<string, string[]>,
+    initialize: (models: ResponseData) => unknown,
+    search: (query: string) => ItemProps[],
+) {
+    const heapBefore = heapUsed();
+    let start = performance.now();
+    const index = initialize(models);
+    const buildMs = performance.now() - start;
+    const heapBytes = heapUsed() - heapBefore;
+
+    const queryMs: Record<string, number> = {};
+    const results: string[] = [];
+    for (const [kind, list] of Object.entries(queries)) {
+        start = performance.now();
+        for (const query of list) {
+            const items = search(query);
+            results.push(JSON.stringify(items.map((item) => [item.value, item.matchedWords, item.consequentTagModel?.value])));
+        }
+        queryMs[kind] = (performance.now() - start) / list.length;
+    }
+    return { index: index, result: { build_ms: buildMs, heap_bytes: heapBytes, query_ms: queryMs }, results: results };
+}
+
+function main() {
+    const args = parseArgs();
+    const opts: Record<string, number> = {};
+    for (const [key, limit] of Object.entries(GROUP_LIMITS)) {
+        opts[`prompt_pilot_max_results_group${key}`] = limit;
+    }
+    (globalThis as any).window = { opts: opts };
+
+    const rnd = createRandom(args.seed);
+    const models = generateModels(args, rnd);
+    const queries = generateQueries(models, args.queries, rnd);
+
+    const before = measure(models, queries, legacyInitialize, (query) => legacySearchTag(query, []));
+    before.index = null;
+    legacyTagIndex = {};
+    const after = measure(
+        models,
+        queries,
+        (models) => tagService.initializeTagModels(models),
+        (query) => tagService.searchTag(query, []),
+    );
+
+    console.log(
+        JSON.stringify(
+            {
+                config: args,
+                gc: (globalThis as any).gc !== undefined,
+                before: before.result,
+                after: after.result,
+                same_results: before.results.every((result, i) => result === after.results[i]),
+            },
+            null,
+            2,
+        ),
+    );
+}
+
+
+// the tag models and prefix maps as they were before the sorted word index, and the searchTag that used them
+interface LegacyTagModel {
+    value: string;
+    values: string[];
+    flatValue: string;
+    category: string;
+    useCount: number;
+    postCount: number;
+    consequentTagModel: LegacyTagModel | null;
+    isOfficial: boolean;
+}
+
+let legacyTagIndex: Record<string, Record<string, LegacyTagModel>> = {};
+
+function legacyInitialize(resData: ResponseData) {
+    const tagModels: Record<string, LegacyTagModel> = {};
+    const toModel = (tag: string, data: ResponseData['tagModels'][string], consequentTagModel: LegacyTagModel | null): LegacyTagModel => {
+        const splitTag = tag.split(/[ _-]/g);
+        return {
+            value: tag,
+            values: splitTag,
+            flatValue: splitTag.join(''),
+            category: data.category,
+            useCount: data.use_count,
+            postCount: data.post_count,
+            consequentTagModel: consequentTagModel,
+            isOfficial: consequentTagModel === null,
+        };
+    };
+    for (const [tag, data] of Object.entries(resData.tagModels)) {
+        const tagModel = tagModels[tag] ?? toModel(tag, data, null);
+        tagModel.isOfficial = true;
+        for (const alias of data.aliases) {
+            const aliasTagModel = tagModels[alias] ?? toModel(alias, data, tagModel);
+            if (aliasTagModel.isOfficial) {
+                aliasTagModel.consequentTagModel = tagModel;
+            } else {
+                tagModels[alias] = aliasTagModel;
+            }
+        }
+        tagModels[tag] = tagModel;
+    }
+
+    legacyTagIndex = {};
+    for (const tagModel of Object.values(tagModels)) {
+        const prefixes = new Set<string>();
+        for (const word of tagModel.values) {
+            for (let i = 1; i <= Math.min(3, word.length); i++) {
+                prefixes.add(word.substring(0, i));
+            }
+        }
+        for (const prefix of prefixes) {
+            (legacyTagIndex[prefix] ??= {})[tagModel.value] = tagModel;
+        }
+    }
+    return legacyTagIndex;
+}
+
+function legacySearchTag(query: string, priorityTags: string[]): ItemProps[] {
+    const queries = query
+        .toLowerCase()
+        .split(/[ _-]/g)
+        .filter((q) => q.trim() !== '');
+    const joinedQuery = queries.length > 1 ? queries.join('') : undefined;
+    const priorityTagSet = new Set(priorityTags);
+    let resultList: ItemProps[] = [];
+    const resultKeySet: Record<string, boolean> = {};
+    for (const queryForCandidate of queries) {
+        const candidateTagList = legacyTagIndex[queryForCandidate.slice(0, 3)];
+        for (const key in candidateTagList) {
+            if (key in resultKeySet) {
+                continue;
+            }
+            const tagModel = candidateTagList[key];
+            const matchedWords: { word: string; index: number }[] = [];
+            if (joinedQuery && tagModel.value.startsWith(joinedQuery)) {
+                queries.forEach((q, i) => matchedWords.push({ word: q, index: i }));
+            } else {
+                const matchedQueryIndices: Record<number, boolean> = {};
+                for (const q of queries) {
+                    if (!(0 in matchedQueryIndices) && tagModel.flatValue.startsWith(q)) {
+                        matchedWords.push({ word: q, index: 0 });
+                        matchedQueryIndices[0] = true;
+                        continue;
+                    }
+                    for (let i = 0; i < tagModel.values.length; i++) {
+                        if (!(i in matchedQueryIndices) && tagModel.values[i].startsWith(q)) {
+                            matchedWords.push({ word: q, index: i });
+                            matchedQueryIndices[i] = true;
+                            break;
+                        }
+                    }
+                }
+            }
+            if (matchedWords.length > 0) {
+                resultList.push({
+                    ...tagModel,
+                    exists: false,
+                    isPriority: priorityTagSet.has(tagModel.value),
+                    matchedWords: matchedWords,
+                    view: null,
+                    previewFile: '',
+                });
+                resultKeySet[key] = true;
+            }
+        }
+    }
+
+    const consequentTagMatchCount: Record<string, number> = {};
+    resultList.filter((r) => !r.consequentTagModel).forEach((r) => (consequentTagMatchCount[r.value] = r.matchedWords.length));
+    resultList = resultList.filter((r) => {
+        if (!r.consequentTagModel) return true;
+        const consequentTag = r.consequentTagModel.value;
+        return !(consequentTag in consequentTagMatchCount) || consequentTagMatchCount[consequentTag] < r.matchedWords.length;
+    });
+    const resultTagCount: Record<string, number> = {};
+    const resultCount: Record<string, number> = {};
+    resultList.forEach((r) => r.matchedWords.forEach((m) => (resultTagCount[m.word] = (resultTagCount[m.word] ?? 0) + 1)));
+    resultList.forEach((r) => (resultCount[r.value] = r.matchedWords.reduce((acc, m) => acc + resultTagCount[m.word], 0)));
+
+    resultList.sort((self, other) => {
+        if (self.isPriority !== other.isPriority) return self.isPriority ? -1 : 1;
+        if (self.value === query || (joinedQuery && self.value === joinedQuery)) return -1;
+        if (other.value === query || (joinedQuery && other.value === joinedQuery)) return 1;
+        if (other.matchedWords.length !== self.matchedWords.length) {
+            return other.matchedWords.length - self.matchedWords.length;
+        } else if (queries.length === self.matchedWords.length) {
+            for (let i = 0; i < self.matchedWords.length; i++) {
+                if (self.matchedWords[i].index !== other.matchedWords[i].index) {
+                    return self.matchedWords[i].index - other.matchedWords[i].index;
+                }
+            }
+        }
+        if (other.useCount !== self.useCount) return other.useCount - self.useCount;
+        const count = resultCount[self.value] - resultCount[other.value];
+        if (count !== 0) return count;
+        if (other.postCount !== self.postCount) return other.postCount - self.postCount;
+        return self.value < other.value ? -1 : 1;
+    });
+    const groupCounter = { ...GROUP_LIMITS };
+    return resultList.filter((r) => {
+        if (groupCounter[r.category] < 0 || groupCounter[r.category] > 0) {
+            groupCounter[r.category] -= 1;
+            return true;
+        }
+        return false;
+    });
+}
+
+main();
@@ -11,8 +11,21 @@ const baseOptions = {
     jsxImportSource: 'preact',
 };
 
-build({
+// the model worker is loaded by services/workerService.ts; it must stay out of javascript/,
+// whose scripts the WebUI runs on the page
+const workerOptions = {
     ...baseOptions,
-    minify: process.argv.includes('--minify'),
-    sourcemap: process.argv.includes('--sourcemap'),
-}).catch(() => process.exit(1));
+    entryPoints: ['src/workers/modelWorker.ts'],
+    outfile: '../worker/prompt_pilot_worker.js',
+    format: 'iife',
+};
+
+Promise.all(
+    [baseOptions, workerOptions].map((options) =>
+        build({
+            ...options,
+            minify: process.argv.includes('--minify'),
+            sourcemap: process.argv.includes('--sourcemap'),
+        }),
+    ),
+).catch(() => process.exit(1));
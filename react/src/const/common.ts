@@ -4,3 +4,5 @@ export const API_PREFIX: string = `/${EXTENSION_ID}/v1`;
 export const TEXTAREA_SELECTOR = "*:is([id*='_toprow'] [id*='_prompt'], .prompt) textarea";
 
 export const DEBOUNCE_DELAY = 200;
+
+export const MODEL_SYNC_INTERVAL = 10000;
@@ -1,8 +1,9 @@
 import { useEffect } from 'preact/hooks';
-import { loadModelsData, initializeModels } from '@/services/initializationService';
+import { loadModelsData, initializeModels, syncModels } from '@/services/initializationService';
+import { setOptions } from '@/services/workerService';
 import { PromptPilotAction } from '@/reducers/appReducer';
 import { Dispatch } from 'preact/hooks';
-import { EXTENSION_ID } from '@/const/common';
+import { EXTENSION_ID, MODEL_SYNC_INTERVAL } from '@/const/common';
 
 declare function onOptionsChanged(callback: VoidFunction): void;
 
@@ -13,6 +14,7 @@ const initializedPromise = new Promise<boolean>((resolve) => {
 
 onOptionsChanged(() => {
     window.pilotIsActive = window.opts[`${EXTENSION_ID}_enabled`] as boolean;
+    setOptions(window.opts);
     if (resolveInitialized) {
         resolveInitialized(true);
         resolveInitialized = null;
@@ -26,11 +28,16 @@ export const useInitialization = (dispatch: Dispatch<PromptPilotAction>) => {
             if (result.success) {
                 try {
                     await initializedPromise;
-                    initializeModels(result.data);
+                    await initializeModels(result.data!);
                     dispatch({
                         type: 'SET_STATUS',
                         payload: 'success',
                     });
+                    setInterval(() => {
+                        if (document.visibilityState === 'visible') {
+                            syncModels();
+                        }
+                    }, MODEL_SYNC_INTERVAL);
                 } catch (e) {
                     console.error(e);
                     dispatch({
@@ -1,12 +1,14 @@
 import * as parser from '@/parsers/promptParser';
-import { AppProps, PromptInfo } from '@/types/props';
+import { EXTENSION_ID } from '@/const/common';
+import { AppProps, ItemProps, PromptInfo } from '@/types/props';
 import { Dispatch } from 'preact/hooks';
 import { PromptPilotAction } from '@/reducers/appReducer';
-import * as db_sg from '@/services/suggestionService';
-import * as db_tag from '@/services/tagService';
-import * as db_lora from '@/services/loraService';
+import * as model_worker from '@/services/workerService';
 import { dispatchSetItems, dispatchSetMessage } from '@/reducers/dispatchHelper';
 
+// incremented by every update; searches answered after a newer update started are dropped
+let contextGeneration = 0;
+
 function extractPromptInfo(state: AppProps) {
     const textarea = state.textarea!;
     const parseResult = parser.updatePromptState(textarea.value, textarea.selectionEnd);
@@ -14,10 +16,6 @@ function extractPromptInfo(state: AppProps) {
     return parseResult;
 }
 
-function collectExistingTags(promptInfo: PromptInfo): Set<string> {
-    return new Set(promptInfo.words.filter((word, i) => i !== promptInfo.activeWordIndex && word.type !== 'lora').map((word) => word.value));
-}
-
 function findNearestTag(promptInfo: PromptInfo): string | undefined {
     for (let i = promptInfo.activeWordIndex - 1; i >= 0; i--) {
         const word = promptInfo.words[i];
@@ -29,8 +27,11 @@ function findNearestTag(promptInfo: PromptInfo): string | undefined {
     return undefined;
 }
 
-function collectPriorityTags(inputtingString: string, nearestTag: string | undefined, existTags: Set<string>): string[] {
-    const suggestions = db_sg.searchSuggestion(nearestTag, existTags);
+async function collectPriorityTags(inputtingString: string, nearestTag: string | undefined): Promise<string[] | undefined> {
+    const suggestions = await model_worker.searchSuggestion(nearestTag);
+    if (!suggestions) {
+        return undefined;
+    }
     const priorityTag: string[] = [];
 
     for (const suggestion of suggestions) {
@@ -42,37 +43,62 @@ function collectPriorityTags(inputtingString: string, nearestTag: string | undef
     return priorityTag;
 }
 
-function handleTagItems(inputtingString: string, nearestTag: string | undefined, existTags: Set<string>, dispatch: Dispatch<PromptPilotAction>) {
+async function handleTagItems(
+    generation: number,
+    inputtingString: string,
+    nearestTag: string | undefined,
+    existTags: ReadonlyMap<string, number>,
+    dispatch: Dispatch<PromptPilotAction>,
+) {
     if (inputtingString === '') {
-        const suggestions = db_sg.searchSuggestion(nearestTag, existTags);
-        dispatchSetItems(dispatch, 'simple', suggestions);
+        const suggestions = await model_worker.searchSuggestion(nearestTag);
+        if (suggestions && generation === contextGeneration) {
+            dispatchSetItems(dispatch, 'simple', suggestions);
+        }
         return;
     }
 
-    const priorityTag = collectPriorityTags(inputtingString, nearestTag, existTags);
+    const priorityTag = await collectPriorityTags(inputtingString, nearestTag);
+    if (!priorityTag || generation !== contextGeneration) {
+        return;
+    }
 
     if (inputtingString.startsWith('*') && inputtingString.length > 1) {
-        db_tag.debounceSearchWithApi(inputtingString.substring(1), (resultSet) => {
-            dispatchSetItems(dispatch, 'tag', resultSet);
-        });
-        dispatchSetMessage(dispatch, 'tag', 'Searching for tags via API...');
-    } else {
-        const items = db_tag.searchTag(inputtingString, priorityTag);
-        items.forEach((item) => {
-            if (existTags.has(item.value.replaceAll('_', ' '))) {
-                item.exists = true;
+        model_worker.debounceSearchWithApi(inputtingString.substring(1), (resultSet) => {
+            if (generation === contextGeneration) {
+                dispatchSetItems(dispatch, 'tag', resultSet);
             }
         });
+        dispatchSetMessage(dispatch, 'tag', 'Searching for tags via API...');
+        return;
+    }
+
+    const items = window.opts[`${EXTENSION_ID}_server_search`]
+        ? await model_worker.searchTagOnServer(inputtingString, priorityTag)
+        : await model_worker.searchTag(inputtingString, priorityTag);
+    if (items && generation === contextGeneration) {
+        markExistingTags(items, existTags);
         dispatchSetItems(dispatch, 'tag', items);
     }
 }
 
-function handleLoraItems(inputtingString: string, dispatch: Dispatch<PromptPilotAction>) {
-    const items = db_lora.searchLora(inputtingString);
-    dispatchSetItems(dispatch, 'lora', items);
+function markExistingTags(items: ItemProps[], existTags: ReadonlyMap<string, number>) {
+    items.forEach((item) => {
+        if (existTags.has(item.value.replaceAll('_', ' '))) {
+            item.exists = true;
+        }
+    });
+}
+
+async function handleLoraItems(generation: number, inputtingString: string, dispatch: Dispatch<PromptPilotAction>) {
+    const items = await model_worker.searchLora(inputtingString);
+    if (items && generation === contextGeneration) {
+        dispatchSetItems(dispatch, 'lora', items);
+    }
 }
 
 export function updateContext(state: AppProps, dispatch: Dispatch<PromptPilotAction>) {
+    const generation = ++contextGeneration;
     const parseResult = extractPromptInfo(state);
 
     if (state.status !== 'success') {
@@ -93,12 +119,13 @@ export function updateContext(state: AppProps, dispatch: Dispatch<PromptPilotAct
     const activeWord = promptInfo.words[promptInfo.activeWordIndex];
     const inputtingString = promptInfo.inputtingString;
 
-    const existTags = collectExistingTags(promptInfo);
+    const existTags = parser.getExistTags();
+    model_worker.updateExistTags(parser.takeExistTagChanges()).catch((e) => console.error(e));
 
     if (activeWord.type !== 'lora') {
         const nearestTag = findNearestTag(promptInfo);
-        handleTagItems(inputtingString, nearestTag, existTags, dispatch);
+        handleTagItems(generation, inputtingString, nearestTag, existTags, dispatch).catch((e) => console.error(e));
     } else {
-        handleLoraItems(inputtingString, dispatch);
+        handleLoraItems(generation, inputtingString, dispatch).catch((e) => console.error(e));
     }
 }
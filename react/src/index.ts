@@ -1,6 +1,5 @@
-import * as db_lora from '@/services/loraService';
-import { API_PREFIX, TEXTAREA_SELECTOR } from '@/const/common';
-import { ResponseData } from '@/types/api';
+import { refreshModels } from '@/services/initializationService';
+import { TEXTAREA_SELECTOR } from '@/const/common';
 import { initialize } from '@/components/core/App';
 
 declare function gradioApp(): HTMLElement;
@@ -75,10 +74,7 @@ onUiLoaded(() => {
     const refreshButtons = gradioApp().querySelectorAll<HTMLDivElement>(refreshButtonSelector);
     refreshButtons.forEach((button) => {
         button.addEventListener('click', () => {
-            fetch(`${API_PREFIX}/refresh`, { method: 'POST' }).then(async (res) => {
-                const resData: ResponseData | undefined = await res.json();
-                db_lora.initializeLoraModels(resData);
-            });
+            refreshModels();
         });
     });
 });
@@ -53,6 +53,50 @@ function makeWordData(nestType: NestType, position: number): Word {
     };
 }
 
+// The state of the scan right after a word was flushed, from which it can resume at `index`. A scan looks at most
+// PREFIX_LENGTH characters ahead, so a checkpoint holds as long as the prompt up to index + PREFIX_LENGTH is unchanged.
+// nestTypes is never modified, only replaced, so checkpoints share it.
+interface Checkpoint {
+    index: number;
+    wordCount: number;
+    nestTypes: NestType[];
+    delimiter: string | undefined;
+    isNewLine: boolean;
+    wordPosition: number;
+}
+
+// The words of the last prompt as they are without a caret, with a checkpoint after each flush. Only the part of a
+// new prompt from the last checkpoint before the edit is scanned again, until the scan is back in a state it had
+// after the edit; the words and checkpoints past that are kept and moved. `source` is `prompt` as it is scanned.
+interface PromptCache {
+    prompt: string;
+    source: string;
+    words: Word[];
+    checkpoints: Checkpoint[];
+}
+
+const NO_CARET = -1;
+
+const initialCheckpoint: Checkpoint = {
+    index: 0,
+    wordCount: 0,
+    nestTypes: ['root'],
+    delimiter: undefined,
+    isNewLine: true,
+    wordPosition: 0,
+};
+
+// strings are compared this many characters at a time before looking for the first difference
+const COMPARE_BLOCK = 256;
+
+const cache: PromptCache = { prompt: '', source: '', words: [], checkpoints: [initialCheckpoint] };
+
+// how many times each tag occurs in the prompt, apart from the active word and the loras; kept along with the cache
+const existTags = new Map<string, number>();
+let excludedTag: string | undefined;
+// tags whose presence in existTags may have changed since takeExistTagChanges
+const changedTags = new Set<string>();
+
 export function updatePromptState(prompt: string, caret: number): ParseResult {
     const promptInfo: PromptInfo = {
         prompt: prompt,
@@ -68,21 +112,233 @@ export function updatePromptState(prompt: string, caret: number): ParseResult {
         needPrependSpace: false,
     };
 
-    prompt = prompt.replace(matchMetaKeywordRegex, (match) => ','.padEnd(match.length, '\0'));
-    prompt = prompt.replace(dynamicPromptRegex, (_, group1, group2) => {
-        const stars = '\0'.repeat(group1.length);
-        return `{${stars}${group2}}`;
+    if (excludedTag !== undefined) {
+        countTag(excludedTag, 1);
+        excludedTag = undefined;
+    }
+    if (prompt !== cache.prompt) {
+        updateCache(prompt);
+    }
+    prompt = cache.source;
+
+    // only the words from the last checkpoint before the caret to the end of the active word depend on the caret
+    const { words, checkpoints } = cache;
+    const start = checkpoints[findCheckpoint(checkpoints, caret)];
+    const activeWords: Word[] = [];
+    const end = scan(prompt, start, caret, promptInfo, insertionInfo, activeWords, () => promptInfo.activeWordIndex >= 0);
+    const rest = end ? words.slice(checkpoints[findCheckpoint(checkpoints, end.index)].wordCount) : [];
+    promptInfo.words = words.slice(0, start.wordCount).concat(activeWords, rest);
+
+    const activeWord = promptInfo.words[promptInfo.activeWordIndex];
+    if (activeWord.type !== 'lora' && activeWord.value !== '') {
+        excludedTag = activeWord.value;
+        countTag(excludedTag, -1);
+    }
+
+    return { promptInfo: promptInfo, insertionInfo: insertionInfo };
+}
+
+// the tags of the last parsed prompt other than the active word and the loras
+export function getExistTags(): ReadonlyMap<string, number> {
+    return existTags;
+}
+
+// the tags that were added to or removed from getExistTags() since the last call
+export function takeExistTagChanges(): { added: string[]; removed: string[] } {
+    const changes: { added: string[]; removed: string[] } = { added: [], removed: [] };
+    changedTags.forEach((tag) => (existTags.has(tag) ? changes.added : changes.removed).push(tag));
+    changedTags.clear();
+    return changes;
+}
+
+function countTag(tag: string, count: number) {
+    const total = (existTags.get(tag) ?? 0) + count;
+    if (total > 0) {
+        existTags.set(tag, total);
+    } else {
+        existTags.delete(tag);
+    }
+    changedTags.add(tag);
+}
+
+function countTags(words: Word[], start: number, end: number, count: number) {
+    for (let i = start; i < end; i++) {
+        if (words[i].type !== 'lora') {
+            countTag(words[i].value, count);
+        }
+    }
+}
+
+// The meta keywords become delimiters and the variant counts of dynamic prompts are hidden, keeping every position.
+// A meta keyword depends only on its word, so unless there are dynamic prompts ("$$"), whose matches reach up to the
+// last "}" of the line, only the words around the edit are replaced again.
+function hideMetaSyntax(previous: PromptCache, prompt: string): string {
+    if (prompt.includes('$$') || previous.prompt.includes('$$')) {
+        return replaceMetaKeywords(prompt).replace(dynamicPromptRegex, (_, group1, group2) => {
+            const stars = '\0'.repeat(group1.length);
+            return `{${stars}${group2}}`;
+        });
+    }
+    let start = commonPrefixLength(previous.prompt, prompt);
+    let end = prompt.length - commonSuffixLength(previous.prompt, prompt, start);
+    while (start > 0 && isWordChar(prompt[start - 1])) {
+        start--;
+    }
+    while (end < prompt.length && isWordChar(prompt[end])) {
+        end++;
+    }
+    const oldEnd = end - (prompt.length - previous.prompt.length);
+    return previous.source.substring(0, start) + replaceMetaKeywords(prompt.substring(start, end)) + previous.source.substring(oldEnd);
+}
+
+function replaceMetaKeywords(prompt: string): string {
+    return prompt.replace(matchMetaKeywordRegex, (match) => ','.padEnd(match.length, '\0'));
+}
+
+// the characters that \b separates from the others
+function isWordChar(char: string): boolean {
+    return /\w/.test(char);
+}
+
+function commonPrefixLength(a: string, b: string): number {
+    const maxLength = Math.min(a.length, b.length);
+    let length = 0;
+    while (length + COMPARE_BLOCK <= maxLength && a.substring(length, length + COMPARE_BLOCK) === b.substring(length, length + COMPARE_BLOCK)) {
+        length += COMPARE_BLOCK;
+    }
+    while (length < maxLength && a[length] === b[length]) {
+        length++;
+    }
+    return length;
+}
+
+// length of the common end of `a` and `b`, short enough to leave their first `prefix` characters out
+function commonSuffixLength(a: string, b: string, prefix: number): number {
+    const maxLength = Math.min(a.length, b.length) - prefix;
+    let length = 0;
+    while (
+        length + COMPARE_BLOCK <= maxLength &&
+        a.substring(a.length - length - COMPARE_BLOCK, a.length - length) === b.substring(b.length - length - COMPARE_BLOCK, b.length - length)
+    ) {
+        length += COMPARE_BLOCK;
+    }
+    while (length < maxLength && a[a.length - 1 - length] === b[b.length - 1 - length]) {
+        length++;
+    }
+    return length;
+}
+
+function updateCache(prompt: string): void {
+    const source = hideMetaSyntax(cache, prompt);
+    const { words, checkpoints } = cache;
+    const prefix = commonPrefixLength(cache.source, source);
+    const suffix = commonSuffixLength(cache.source, source, prefix);
+    const editEnd = source.length - suffix;
+    const shift = source.length - cache.source.length;
+
+    const checkpointIndex = findCheckpoint(checkpoints, prefix - PREFIX_LENGTH);
+    const start = checkpoints[checkpointIndex];
+    const newWords: Word[] = [];
+    const newCheckpoints: Checkpoint[] = [];
+    let resumedIndex = -1;
+    const end = scan(source, start, NO_CARET, undefined, undefined, newWords, (checkpoint) => {
+        newCheckpoints.push(checkpoint);
+        if (checkpoint.index < editEnd) {
+            return false;
+        }
+        const oldIndex = findCheckpoint(checkpoints, checkpoint.index - shift);
+        const old = checkpoints[oldIndex];
+        if (old.index === checkpoint.index - shift && isSameState(old, checkpoint, shift)) {
+            resumedIndex = oldIndex;
+            return true;
+        }
+        return false;
     });
 
-    const nestTypes: NestType[] = ['root'];
+    // the words and checkpoints after the one the scan stopped at are moved to where they are now
+    let wordEnd = words.length;
+    let checkpointEnd = checkpoints.length;
+    if (end) {
+        const resumed = checkpoints[resumedIndex];
+        const wordShift = end.wordCount - resumed.wordCount;
+        wordEnd = resumed.wordCount;
+        checkpointEnd = resumedIndex + 1;
+        if (shift !== 0) {
+            for (let i = wordEnd; i < words.length; i++) {
+                words[i] = { ...words[i], position: words[i].position + shift };
+            }
+        }
+        for (let i = checkpointEnd; i < checkpoints.length; i++) {
+            checkpoints[i].index += shift;
+            checkpoints[i].wordCount += wordShift;
+            checkpoints[i].wordPosition += shift;
+        }
+    }
+    countTags(words, start.wordCount, wordEnd, -1);
+    countTags(newWords, 0, newWords.length, 1);
+    replaceRange(words, start.wordCount, wordEnd, newWords);
+    replaceRange(checkpoints, checkpointIndex + 1, checkpointEnd, newCheckpoints);
+    cache.prompt = prompt;
+    cache.source = source;
+}
+
+// replaces array[start] .. array[end - 1] with `items`
+function replaceRange<T>(array: T[], start: number, end: number, items: T[]): void {
+    const rest = array.slice(end);
+    array.length = start;
+    items.forEach((item) => array.push(item));
+    rest.forEach((item) => array.push(item));
+}
+
+function isSameState(old: Checkpoint, checkpoint: Checkpoint, shift: number): boolean {
+    return (
+        old.delimiter === checkpoint.delimiter &&
+        old.isNewLine === checkpoint.isNewLine &&
+        old.wordPosition + shift === checkpoint.wordPosition &&
+        old.nestTypes.length === checkpoint.nestTypes.length &&
+        old.nestTypes.every((nestType, i) => nestType === checkpoint.nestTypes[i])
+    );
+}
+
+// index of the last checkpoint at or before `position`
+function findCheckpoint(checkpoints: Checkpoint[], position: number): number {
+    let low = 1;
+    let high = checkpoints.length;
+    while (low < high) {
+        const middle = (low + high) >>> 1;
+        if (checkpoints[middle].index <= position) {
+            low = middle + 1;
+        } else {
+            high = middle;
+        }
+    }
+    return low - 1;
+}
+
+// Scans `prompt` from `from`, pushing the words it flushes into `words`. After each flush, `stop` is called with the
+// checkpoint there and the scan ends if it returns true; otherwise the last word is flushed at the end of the prompt and
+// undefined is returned. Without a caret (NO_CARET), promptInfo and insertionInfo are not needed.
+function scan(
+    prompt: string,
+    from: Checkpoint,
+    caret: number,
+    promptInfo: PromptInfo | undefined,
+    insertionInfo: InsertionInfo | undefined,
+    words: Word[],
+    stop: (checkpoint: Checkpoint) => boolean,
+): Checkpoint | undefined {
+    let nestTypes = from.nestTypes;
     let isEscaped = false;
-    let delimiter: string | undefined;
-    let isNewLine = true;
+    let delimiter = from.delimiter;
+    let isNewLine = from.isNewLine;
 
-    function flush(word: Word) {
+    function flush(word: Word, replaceUnderscores: boolean) {
         word.value = word.value.trim();
+        if (replaceUnderscores) {
+            word.value = word.value.replace(/_/g, ' ');
+        }
         if (word.isActive || word.value !== '') {
-            promptInfo.words.push(word);
+            words.push(word);
             isNewLine = false;
             delimiter = undefined;
         }
@@ -97,32 +353,44 @@ export function updatePromptState(prompt: string, caret: number): ParseResult {
     }
 
     function updatePrependFlags(word: Word) {
-        if (word.isActive && promptInfo.words.length > 0) {
+        if (word.isActive && from.wordCount + words.length > 0) {
             if (delimiter === undefined) {
-                insertionInfo.needPrependComma = true;
+                insertionInfo!.needPrependComma = true;
                 if (!isNewLine) {
-                    insertionInfo.needPrependSpace = true;
+                    insertionInfo!.needPrependSpace = true;
                 }
             } else if (delimiter === ',') {
-                insertionInfo.needPrependSpace = true;
+                insertionInfo!.needPrependSpace = true;
             }
         }
     }
 
     function setActiveWordData(word: Word) {
         word.isActive = true;
-        let inputtingString = promptInfo.inputtingString;
+        let inputtingString = promptInfo!.inputtingString;
         if (isEscaped) {
             inputtingString += '\\';
-            promptInfo.inputtingString = inputtingString;
+            promptInfo!.inputtingString = inputtingString;
         }
-        promptInfo.inputtingString = word.value.trim();
-        promptInfo.activeWordIndex = promptInfo.words.length;
+        promptInfo!.inputtingString = word.value.trim();
+        promptInfo!.activeWordIndex = from.wordCount + words.length;
     }
 
-    let word: Word = makeWordData('root', 0);
+    function checkpointAt(index: number): Checkpoint {
+        return {
+            index: index,
+            wordCount: from.wordCount + words.length,
+            nestTypes: nestTypes,
+            delimiter: delimiter,
+            isNewLine: isNewLine,
+            wordPosition: word.position,
+        };
+    }
+
+    let word: Word = makeWordData(nestTypes[nestTypes.length - 1], from.wordPosition);
+    let checkpoint: Checkpoint;
 
-    for (let i = 0; i < prompt.length; i++) {
+    for (let i = from.index; i < prompt.length; i++) {
         const char = prompt[i];
         if (i === caret) {
             setActiveWordData(word);
@@ -132,19 +400,22 @@ export function updatePromptState(prompt: string, caret: number): ParseResult {
 
         if (char === '\0') {
             if (word.isActive) {
-                insertionInfo.isMetaBlock = true;
-                insertionInfo.needPrependSpace = true;
+                insertionInfo!.isMetaBlock = true;
+                insertionInfo!.needPrependSpace = true;
             }
             word.position++;
             continue;
         }
         if (char === '\n') {
             updatePrependFlags(word);
-            flush(word);
+            flush(word, true);
             updateContextState(char);
             word = makeWordData(currentNestType, i + 1);
 
             isEscaped = false;
+            if (stop((checkpoint = checkpointAt(i + 1)))) {
+                return checkpoint;
+            }
             continue;
         }
         if (isEscaped) {
@@ -169,22 +440,25 @@ export function updatePromptState(prompt: string, caret: number): ParseResult {
                 }
             }
             if (openerType !== 'root') {
-                nestTypes.push(openerType);
+                nestTypes = [...nestTypes, openerType];
 
                 if (openerType === 'lora') {
                     i += PREFIX_LENGTH;
                     if (i - caret >= 0 && i - caret < PREFIX_LENGTH) {
-                        insertionInfo.isMetaBlock = true;
+                        insertionInfo!.isMetaBlock = true;
                     }
                 }
                 updatePrependFlags(word);
-                flush(word);
+                flush(word, true);
                 updateContextState(char);
                 if (openerType === 'lora') {
                     word = makeWordData(openerType, i + 1);
                 } else {
                     word = makeWordData(openerType, i);
                 }
+                if (stop((checkpoint = checkpointAt(i + 1)))) {
+                    return checkpoint;
+                }
                 continue;
             }
         }
@@ -203,13 +477,13 @@ export function updatePromptState(prompt: string, caret: number): ParseResult {
                     if (isNumber(weightValue)) {
                         word.value = wordValue;
                         if (word.isActive && i - caret <= weightValue!.length) {
-                            insertionInfo.isMetaBlock = true;
+                            insertionInfo!.isMetaBlock = true;
                         }
                     }
                 } else if (currentNestType === 'square') {
                     if (isNumber(word.value)) {
                         if (word.isActive && i - caret <= word.value.length) {
-                            insertionInfo.isMetaBlock = true;
+                            insertionInfo!.isMetaBlock = true;
                         }
                         word.value = '';
                     }
@@ -220,17 +494,20 @@ export function updatePromptState(prompt: string, caret: number): ParseResult {
                     const loraName = word.value.substring(0, colonIndex);
                     const multiplier = word.value.substring(colonIndex + 1);
                     if (word.isActive && i - caret <= multiplier!.length) {
-                        insertionInfo.isMetaBlock = true;
+                        insertionInfo!.isMetaBlock = true;
                     }
                     word.value = loraName;
                 }
             }
-            nestTypes.pop();
+            nestTypes = nestTypes.slice(0, -1);
 
             updatePrependFlags(word);
-            flush(word);
+            flush(word, true);
             updateContextState(char);
             word = makeWordData(nestTypes[nestTypes.length - 1], i + 1);
+            if (stop((checkpoint = checkpointAt(i + 1)))) {
+                return checkpoint;
+            }
             continue;
         }
 
@@ -243,9 +520,12 @@ export function updatePromptState(prompt: string, caret: number): ParseResult {
 
         if (delimiters[currentNestType]?.has(char)) {
             updatePrependFlags(word);
-            flush(word);
+            flush(word, true);
             updateContextState(char);
             word = makeWordData(currentNestType, i + 1);
+            if (stop((checkpoint = checkpointAt(i + 1)))) {
+                return checkpoint;
+            }
             continue;
         }
 
@@ -255,16 +535,13 @@ export function updatePromptState(prompt: string, caret: number): ParseResult {
         word.value += char;
     }
 
-    if (promptInfo.activeWordIndex < 0) {
+    // the last word keeps its underscores
+    if (caret !== NO_CARET && promptInfo!.activeWordIndex < 0) {
         setActiveWordData(word);
     }
-    promptInfo.words.forEach((word) => {
-        word.value = word.value.replace(/_/g, ' ');
-    });
     updatePrependFlags(word);
-    flush(word);
-
-    return { promptInfo: promptInfo, insertionInfo: insertionInfo };
+    flush(word, false);
+    return undefined;
 }
 
 function isNumber(value: string): boolean {
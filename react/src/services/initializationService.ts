@@ -1,27 +1,45 @@
-import { gunzipSync } from 'fflate';
-import * as db_tag from '@/services/tagService';
-import * as db_lora from '@/services/loraService';
-import * as db_sg from '@/services/suggestionService';
+import * as model_worker from '@/services/workerService';
+import { API_PREFIX } from '@/const/common';
+
+let modelVersion = 0;
 
 export const loadModelsData = async () => {
     try {
-        const res = await fetch(`file=extensions/sd-webui-prompt-pilot/models.json.gz`);
-        if (!res.ok) return { success: false };
+        // waits until the server has finished building models.json.gz
+        const versionRes = await fetch(`${API_PREFIX}/version`);
+        if (!versionRes.ok) return { success: false };
+        const { version } = await versionRes.json();
 
-        const buffer = new Uint8Array(await res.arrayBuffer());
-        const decompressedBuffer = gunzipSync(buffer);
-        const jsonString = new TextDecoder('utf-8').decode(decompressedBuffer);
-        const resData = JSON.parse(jsonString);
+        const res = await fetch(`file=extensions/sd-webui-prompt-pilot/models.json.gz?v=${version}`);
+        if (!res.ok) return { success: false };
 
-        return { success: true, data: resData };
+        // decompressed and parsed by the model worker, off the UI thread
+        return { success: true, data: await res.arrayBuffer() };
     } catch (e) {
         console.error(e);
         return { success: false };
     }
 };
 
-export const initializeModels = (data: any) => {
-    db_tag.initializeTagModels(data);
-    db_lora.initializeLoraModels(data);
-    db_sg.initializeSuggestionModels(data);
+export const initializeModels = async (data: ArrayBuffer) => {
+    modelVersion = await model_worker.loadModels(data);
+};
+
+export const syncModels = async () => {
+    await fetchModelDelta(`${API_PREFIX}/models?since=${modelVersion}`, 'GET');
+};
+
+export const refreshModels = async () => {
+    await fetchModelDelta(`${API_PREFIX}/refresh?since=${modelVersion}`, 'POST');
+};
+
+const fetchModelDelta = async (url: string, method: 'GET' | 'POST') => {
+    try {
+        const res = await fetch(url, { method: method });
+        if (!res.ok) return;
+
+        modelVersion = await model_worker.applyModelDelta(await res.arrayBuffer());
+    } catch (e) {
+        console.error(e);
+    }
 };
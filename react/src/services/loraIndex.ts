@@ -0,0 +1,99 @@
+import { LoraModel } from '@/types/model';
+
+// substrings up to this length are indexed; a longer query word is looked up by its substrings of this length
+const GRAM_LENGTH = 3;
+// a substring is keyed by its UTF-16 code units plus one, as digits in this base, which stays exact in a number
+const GRAM_BASE = 0x10001;
+
+// A query word matches a search word with its separators removed, anywhere in it. Lora ids are positions in `loras`;
+// searchTexts[id] holds the flattened search words of a lora, one per line, and postings maps every substring of up to
+// GRAM_LENGTH characters of those words (by gramKey) to the ids of the loras having it, in ascending order. titles[id]
+// are the words of the lora name.
+export interface LoraIndex {
+    loras: LoraModel[];
+    searchTexts: string[];
+    titles: string[][];
+    postings: Map<number, number[]>;
+}
+
+export function createLoraIndex(loras: LoraModel[]): LoraIndex {
+    const postings = new Map<number, number[]>();
+    const searchTexts = loras.map((lora, loraId) => {
+        const flatWords = lora.searchWords.map((word) => word.replace(/[ _-]/g, ''));
+        for (const word of flatWords) {
+            for (let start = 0; start < word.length; start++) {
+                // the keys of the substrings from `start`, one code unit longer each time
+                let key = 0;
+                let digit = 1;
+                for (let end = start; end < Math.min(start + GRAM_LENGTH, word.length); end++) {
+                    key += (word.charCodeAt(end) + 1) * digit;
+                    digit *= GRAM_BASE;
+                    let loraIds = postings.get(key);
+                    if (!loraIds) {
+                        loraIds = [];
+                        postings.set(key, loraIds);
+                    }
+                    if (loraIds[loraIds.length - 1] !== loraId) {
+                        loraIds.push(loraId);
+                    }
+                }
+            }
+        }
+        return flatWords.join('\n');
+    });
+    return {
+        loras: loras,
+        searchTexts: searchTexts,
+        titles: loras.map((lora) => lora.value.split(/[ _-]/g)),
+        postings: postings,
+    };
+}
+
+// Ids of the loras where each query word is part of a search word, in ascending order. The postings of the query
+// words (or of their substrings) are intersected from the shortest one; a query word longer than GRAM_LENGTH is then
+// checked against the search words, as its substrings may come from different words or places.
+export function findLoraIds(index: LoraIndex, queries: string[]): number[] {
+    const lists: number[][] = [];
+    for (const query of queries) {
+        for (let start = 0; start + Math.min(GRAM_LENGTH, query.length) <= query.length; start++) {
+            const loraIds = index.postings.get(gramKey(query.substring(start, start + GRAM_LENGTH)));
+            if (!loraIds) {
+                return [];
+            }
+            lists.push(loraIds);
+        }
+    }
+    if (lists.length === 0) {
+        return index.loras.map((__, loraId) => loraId);
+    }
+    lists.sort((a, b) => a.length - b.length);
+
+    let loraIds = lists[0];
+    for (let i = 1; i < lists.length && loraIds.length > 0; i++) {
+        loraIds = loraIds.filter((loraId) => includes(lists[i], loraId));
+    }
+    const longQueries = queries.filter((query) => query.length > GRAM_LENGTH);
+    return loraIds.filter((loraId) => longQueries.every((query) => index.searchTexts[loraId].includes(query)));
+}
+
+function gramKey(gram: string): number {
+    let key = 0;
+    for (let i = gram.length - 1; i >= 0; i--) {
+        key = key * GRAM_BASE + gram.charCodeAt(i) + 1;
+    }
+    return key;
+}
+
+function includes(sorted: number[], value: number): boolean {
+    let low = 0;
+    let high = sorted.length;
+    while (low < high) {
+        const middle = (low + high) >>> 1;
+        if (sorted[middle] < value) {
+            low = middle + 1;
+        } else {
+            high = middle;
+        }
+    }
+    return sorted[low] === value;
+}
@@ -2,21 +2,35 @@ import { ItemProps } from '@/types/props';
 import { EXTENSION_ID } from '@/const/common';
 import { ResponseData } from '@/types/api';
 import { LoraModel } from '@/types/model';
+import { selectTopResults } from '@/utils/commonUtil';
+import { LoraIndex, createLoraIndex, findLoraIds } from '@/services/loraIndex';
 
-let loraModels: LoraModel[];
+let loraModelMap: Record<string, LoraModel>;
+let loraIndex: LoraIndex;
 
 export function initializeLoraModels(resData: ResponseData | undefined): void {
     if (!resData) {
         return;
     }
-    loraModels = [];
+    loraModelMap = {};
+    updateLoraModels(resData);
+}
+
+export function updateLoraModels(resData: ResponseData | undefined, removed: string[] = []): void {
+    if (!resData || !loraModelMap) {
+        return;
+    }
+    removed.forEach((loraName) => {
+        delete loraModelMap[loraName];
+    });
     Object.entries(resData.loraModels).forEach(([lora_name, data]) => {
-        loraModels.push({
+        loraModelMap[lora_name] = {
             value: lora_name,
             searchWords: data.search_words,
             previewFile: data.preview_file,
-        });
+        };
     });
+    loraIndex = createLoraIndex(Object.values(loraModelMap));
 }
 
 export function searchLora(query: string): ItemProps[] {
@@ -24,64 +38,69 @@ export function searchLora(query: string): ItemProps[] {
         .toLowerCase()
         .split(/[ _-]/g)
         .filter((q) => q.trim() !== '');
+    // a lora matches when every query word is found and each is counted once, so a repeated one matches nothing
+    if (new Set(queries).size !== queries.length) {
+        return [];
+    }
 
-    let resultSet: ItemProps[] = [];
-    loraModels.forEach((lora) => {
-        const matchWordSet = new Set<string>();
-        for (const word of lora.searchWords) {
-            const flatWord = word.replace(/[ _-]/g, '');
-            queries.forEach((q) => {
-                if (flatWord.includes(q)) {
-                    matchWordSet.add(q);
-                }
-            });
-        }
-        if (queries.length === matchWordSet.size) {
-            const props: ItemProps = {
-                ...lora,
-                matchedWords: [...matchWordSet].map((w) => ({ index: 0, word: w })),
-                view: null,
-                isPriority: false,
-                category: '',
-                exists: false,
-                useCount: 0,
-                postCount: 0,
-                consequentTagModel: null,
-                isOfficial: false,
-            };
-            resultSet.push(props);
-        }
-    });
-    resultSet = resultSet.sort((a, b) => compare(a, b, query, queries));
-    let groupCounter = window.opts[`${EXTENSION_ID}_max_results_grouplora`] as number;
-    return resultSet.filter(() => {
-        if (groupCounter > 0) {
-            groupCounter -= 1;
-            return true;
-        }
-        return false;
+    const groupCounter = window.opts[`${EXTENSION_ID}_max_results_grouplora`] as number;
+    if (!(groupCounter > 0)) {
+        return [];
+    }
+
+    const loraIds = findLoraIds(loraIndex, queries);
+    const startsQuery = new Uint8Array(loraIndex.loras.length);
+    loraIds.forEach((loraId) => (startsQuery[loraId] = matchStarts(loraIndex.titles[loraId], queries) ? 1 : 0));
+    const selected = selectTopResults(loraIds, () => 'lora', { lora: groupCounter }, (a, b) => compare(a, b, query, startsQuery));
+    return selected.map((loraId): ItemProps => {
+        const lora = loraIndex.loras[loraId];
+        return {
+            ...lora,
+            matchedWords: matchWords(lora, queries).map((w) => ({ index: 0, word: w })),
+            view: null,
+            isPriority: false,
+            category: '',
+            exists: false,
+            useCount: 0,
+            postCount: 0,
+            consequentTagModel: null,
+            isOfficial: false,
+        };
     });
 }
 
-function compare(self: ItemProps, other: ItemProps, query: string, queries: string[]): number {
-    if (self.value === query) return -1;
-    if (other.value === query) return 1;
-
-    if (other.matchedWords.length !== self.matchedWords.length) {
-        return other.matchedWords.length - self.matchedWords.length;
+// the query words in the order the search words of the lora contain them
+function matchWords(lora: LoraModel, queries: string[]): string[] {
+    const matchWordSet = new Set<string>();
+    for (const word of lora.searchWords) {
+        const flatWord = word.replace(/[ _-]/g, '');
+        queries.forEach((q) => {
+            if (flatWord.includes(q)) {
+                matchWordSet.add(q);
+            }
+        });
     }
+    return [...matchWordSet];
+}
+
+// every lora found matches all query words, so they are ordered by whether a word of the name starts with one of them
+function compare(self: number, other: number, query: string, startsQuery: Uint8Array): number {
+    const selfValue = loraIndex.loras[self].value;
+    const otherValue = loraIndex.loras[other].value;
+    if (selfValue === query) return -1;
+    if (otherValue === query) return 1;
 
-    const thisStartsQuery = matchStarts(self, queries);
-    const otherStartsQuery = matchStarts(other, queries);
+    const thisStartsQuery = startsQuery[self];
+    const otherStartsQuery = startsQuery[other];
     if (thisStartsQuery && !otherStartsQuery) return -1;
     if (!thisStartsQuery && otherStartsQuery) return 1;
 
-    return self.value < other.value ? -1 : 1;
+    return selfValue < otherValue ? -1 : 1;
 }
 
-function matchStarts(obj: ItemProps, queries: string[]): boolean {
+function matchStarts(titles: string[], queries: string[]): boolean {
     for (const q of queries) {
-        for (const title of obj.value.split(/[ _-]/g)) {
+        for (const title of titles) {
             if (title.startsWith(q)) {
                 return true;
             }
@@ -0,0 +1,55 @@
+import { CompactModelData, ResponseData } from '@/types/api';
+
+const COMPACT_FORMAT = 2;
+const CUSTOM_CATEGORY = -1;
+
+export function isCompactModelData(data: any): data is CompactModelData {
+    return data?.format === COMPACT_FORMAT;
+}
+
+// expands the columnar models.json.gz layout (scripts/model_format.py) into the nested models;
+// tag i is strings[i], and row i of a list column is values[offsets[i]] .. values[offsets[i + 1] - 1]
+export function decodeModels(data: CompactModelData): ResponseData {
+    const strings = data.strings;
+    const resData: ResponseData = { version: data.version, tagModels: {}, suggestionModels: {}, loraModels: {} };
+
+    const tags = data.tags;
+    for (let i = 0; i < tags.count; i++) {
+        const category = tags.category[i];
+        resData.tagModels[strings[i]] = {
+            post_count: tags.postCount[i],
+            category: category === CUSTOM_CATEGORY ? 'custom' : String(category),
+            is_deprecated: false,
+            aliases: slice(tags.aliases, tags.aliasOffsets, i, strings),
+            use_count: tags.useCount[i],
+        };
+    }
+
+    const suggestions = data.suggestions;
+    for (let i = 0; i < suggestions.tag.length; i++) {
+        const neighbours: Record<string, number> = {};
+        for (let j = suggestions.offsets[i]; j < suggestions.offsets[i + 1]; j++) {
+            neighbours[strings[suggestions.neighbour[j]]] = suggestions.score[j];
+        }
+        resData.suggestionModels[strings[suggestions.tag[i]]] = neighbours;
+    }
+
+    const loras = data.loras;
+    for (let i = 0; i < loras.name.length; i++) {
+        resData.loraModels[strings[loras.name[i]]] = {
+            search_words: slice(loras.words, loras.wordOffsets, i, strings),
+            preview_file: strings[loras.previewFile[i]],
+        };
+    }
+    return resData;
+}
+
+function slice(values: number[], offsets: number[], row: number, strings: string[]): string[] {
+    const start = offsets[row];
+    const end = offsets[row + 1];
+    const result: string[] = [];
+    for (let j = start; j < end; j++) {
+        result.push(strings[values[j]]);
+    }
+    return result;
+}
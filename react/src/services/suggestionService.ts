@@ -9,6 +9,16 @@ export function initializeSuggestionModels(resData: ResponseData | undefined): v
         return;
     }
     suggestionModels = {};
+    updateSuggestionModels(resData);
+}
+
+export function updateSuggestionModels(resData: ResponseData | undefined, removed: string[] = []): void {
+    if (!resData || !suggestionModels) {
+        return;
+    }
+    removed.forEach((word) => {
+        delete suggestionModels[word];
+    });
     Object.entries(resData.suggestionModels).forEach(([word, record]) => {
         const sorted = Object.entries(record).sort(([, count1], [, count2]) => count2 - count1);
         suggestionModels[word] = sorted.map(([word, count]) => ({
@@ -18,7 +28,7 @@ export function initializeSuggestionModels(resData: ResponseData | undefined): v
     });
 }
 
-export function searchSuggestion(nearestTag: string | undefined, existTags: Set<string>): ItemProps[] {
+export function searchSuggestion(nearestTag: string | undefined, existTags: ReadonlySet<string>): ItemProps[] {
     if (!nearestTag) {
         return [];
     }
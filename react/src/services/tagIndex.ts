@@ -0,0 +1,187 @@
+import { TagModel } from '@/types/model';
+
+// tags added after a build are scanned one by one until they (or the removed ones) exceed
+// this share of the built tags; then the index is built again
+const OVERLAY_RATIO = 1 / 16;
+const MIN_OVERLAY = 256;
+
+// the words of a tag, as the search matches them against the query words
+export const splitTag = (tag: string): string[] => tag.split(/[ _-]/g);
+
+// Tag ids are positions in `tags`. The distinct words of the built tags are sorted in `words`, so the words with a
+// given prefix are one range found by binary search, and the ids of the tags using words[i] are
+// postings[postingOffsets[i]] .. postings[postingOffsets[i + 1] - 1]. The words of built tag t, in order and
+// including empty ones, are words[tagWords[tagWordOffsets[t]]] .. words[tagWords[tagWordOffsets[t + 1] - 1]].
+export interface TagIndex {
+    tags: (TagModel | undefined)[];
+    tagIds: Map<string, number>;
+    words: string[];
+    postingOffsets: Uint32Array;
+    postings: Uint32Array;
+    tagWordOffsets: Uint32Array;
+    tagWords: Uint32Array;
+    builtCount: number;
+    overlayWords: string[][];
+    removedCount: number;
+}
+
+export function createTagIndex(tagModels: Iterable<TagModel>): TagIndex {
+    const tags = [...tagModels];
+    const wordIds = new Map<string, number>();
+    const unsortedWords: string[] = [];
+    const tagWordOffsets = new Uint32Array(tags.length + 1);
+    const tagWordList: number[] = [];
+    tags.forEach((tagModel, tagId) => {
+        for (const word of splitTag(tagModel.value)) {
+            let wordId = wordIds.get(word);
+            if (wordId === undefined) {
+                wordId = unsortedWords.length;
+                wordIds.set(word, wordId);
+                unsortedWords.push(word);
+            }
+            tagWordList.push(wordId);
+        }
+        tagWordOffsets[tagId + 1] = tagWordList.length;
+    });
+
+    const order = unsortedWords.map((__, i) => i).sort((a, b) => (unsortedWords[a] < unsortedWords[b] ? -1 : 1));
+    const rank = new Uint32Array(order.length);
+    order.forEach((wordId, i) => (rank[wordId] = i));
+    const words = order.map((wordId) => unsortedWords[wordId]);
+    const tagWords = Uint32Array.from(tagWordList, (wordId) => rank[wordId]);
+
+    // a tag is posted once per distinct word; empty words are never looked up
+    const lastTag = new Int32Array(words.length).fill(-1);
+    const postingOffsets = new Uint32Array(words.length + 1);
+    const forEachPosting = (visit: (word: number, tagId: number) => void) => {
+        for (let tagId = 0; tagId < tags.length; tagId++) {
+            for (let i = tagWordOffsets[tagId]; i < tagWordOffsets[tagId + 1]; i++) {
+                const word = tagWords[i];
+                if (lastTag[word] !== tagId && words[word] !== '') {
+                    lastTag[word] = tagId;
+                    visit(word, tagId);
+                }
+            }
+        }
+    };
+    forEachPosting((word) => postingOffsets[word + 1]++);
+    for (let i = 0; i < words.length; i++) {
+        postingOffsets[i + 1] += postingOffsets[i];
+    }
+    const postings = new Uint32Array(postingOffsets[words.length]);
+    const fill = postingOffsets.slice(0, words.length);
+    lastTag.fill(-1);
+    forEachPosting((word, tagId) => (postings[fill[word]++] = tagId));
+
+    return {
+        tags: tags,
+        tagIds: new Map(tags.map((tagModel, tagId) => [tagModel.value, tagId])),
+        words: words,
+        postingOffsets: postingOffsets,
+        postings: postings,
+        tagWordOffsets: tagWordOffsets,
+        tagWords: tagWords,
+        builtCount: tags.length,
+        overlayWords: [],
+        removedCount: 0,
+    };
+}
+
+export function addToTagIndex(index: TagIndex, tagModel: TagModel): void {
+    const tagId = index.tagIds.get(tagModel.value);
+    if (tagId !== undefined) {
+        index.tags[tagId] = tagModel;
+        return;
+    }
+    index.tagIds.set(tagModel.value, index.tags.length);
+    index.tags.push(tagModel);
+    index.overlayWords.push(splitTag(tagModel.value));
+    rebuildIfStale(index);
+}
+
+export function removeFromTagIndex(index: TagIndex, tag: string): void {
+    const tagId = index.tagIds.get(tag);
+    if (tagId === undefined) {
+        return;
+    }
+    index.tagIds.delete(tag);
+    index.tags[tagId] = undefined;
+    index.removedCount++;
+    rebuildIfStale(index);
+}
+
+function rebuildIfStale(index: TagIndex): void {
+    if (index.overlayWords.length + index.removedCount > Math.max(MIN_OVERLAY, index.builtCount * OVERLAY_RATIO)) {
+        Object.assign(index, createTagIndex(index.tags.filter((tagModel): tagModel is TagModel => tagModel !== undefined)));
+    }
+}
+
+// ids of the tags having a word that starts with any of `prefixes`, each once
+export function findTagIds(index: TagIndex, prefixes: string[]): number[] {
+    const { words, postingOffsets, postings, tags } = index;
+    const found = new Uint8Array(tags.length);
+    const tagIds: number[] = [];
+    const visit = (tagId: number) => {
+        if (!found[tagId] && tags[tagId]) {
+            found[tagId] = 1;
+            tagIds.push(tagId);
+        }
+    };
+    for (const prefix of prefixes) {
+        const [start, end] = findWordRange(words, prefix);
+        for (let i = postingOffsets[start]; i < postingOffsets[end]; i++) {
+            visit(postings[i]);
+        }
+        index.overlayWords.forEach((overlayWords, i) => {
+            if (overlayWords.some((word) => word.startsWith(prefix))) {
+                visit(index.builtCount + i);
+            }
+        });
+    }
+    return tagIds;
+}
+
+// an upper bound of findTagIds(index, prefixes).length, counted from the posting offsets without visiting any tag
+export function countTagIds(index: TagIndex, prefixes: string[]): number {
+    let count = index.overlayWords.length;
+    for (const prefix of prefixes) {
+        const [start, end] = findWordRange(index.words, prefix);
+        count += index.postingOffsets[end] - index.postingOffsets[start];
+    }
+    return count;
+}
+
+// copies the words of a tag into `out` and returns how many there are
+export function getTagWords(index: TagIndex, tagId: number, out: string[]): number {
+    if (tagId >= index.builtCount) {
+        const overlayWords = index.overlayWords[tagId - index.builtCount];
+        overlayWords.forEach((word, i) => (out[i] = word));
+        return overlayWords.length;
+    }
+    const start = index.tagWordOffsets[tagId];
+    const end = index.tagWordOffsets[tagId + 1];
+    for (let i = start; i < end; i++) {
+        out[i - start] = index.words[index.tagWords[i]];
+    }
+    return end - start;
+}
+
+// the words starting with `prefix` are words[start] .. words[end - 1]
+function findWordRange(words: string[], prefix: string): [number, number] {
+    const start = partitionPoint(words, 0, (word) => word < prefix);
+    return [start, partitionPoint(words, start, (word) => word.startsWith(prefix))];
+}
+
+// the first position from `low` on whose word does not satisfy `predicate`, which holds for a leading run of words
+function partitionPoint(words: string[], low: number, predicate: (word: string) => boolean): number {
+    let high = words.length;
+    while (low < high) {
+        const middle = (low + high) >>> 1;
+        if (predicate(words[middle])) {
+            low = middle + 1;
+        } else {
+            high = middle;
+        }
+    }
+    return low;
+}
@@ -1,94 +1,93 @@
 import { ItemProps } from '@/types/props';
-import { EXTENSION_ID } from '@/const/common';
-import { ResponseData } from '@/types/api';
+import { API_PREFIX, EXTENSION_ID } from '@/const/common';
+import { ResponseData, SearchTagData } from '@/types/api';
 import { TagModel } from '@/types/model';
-import { debounceWithLeadingTrailing } from '@/utils/commonUtil';
+import { selectTopResults } from '@/utils/commonUtil';
+import { TagIndex, addToTagIndex, countTagIds, createTagIndex, findTagIds, getTagWords, removeFromTagIndex } from '@/services/tagIndex';
 
 let tagModels: Record<string, TagModel>;
-let tagIndex: Record<string, Record<string, TagModel>>;
-export let alwaysUnderscoreTags: Set<string>;
-export let alwaysSpaceTags: Set<string>;
+let tagIndex: TagIndex;
+// reused for the words of each candidate tag
+const tagWords: string[] = [];
+// the query words of the last search and the ids of the tags they matched, from which a refining query is searched
+let lastSearch: { queries: string[]; tagIds: number[] } | undefined;
+let searchController: AbortController | undefined;
 
 export function initializeTagModels(resData: ResponseData | undefined): void {
     if (!resData) {
         return;
     }
-    alwaysUnderscoreTags = new Set();
-    (window.opts[`${EXTENSION_ID}_always_underscore_tags`] as string).split(/[\n,]/).forEach((tag: string) => {
-        tag = tag.trim().replace(/_/g, ' ');
-        if (tag) {
-            alwaysUnderscoreTags.add(tag);
-        }
+    tagModels = {};
+    Object.entries(resData.tagModels).forEach(([tag, data]) => {
+        registerTagModel(tag, data);
     });
 
-    alwaysSpaceTags = new Set();
-    (window.opts[`${EXTENSION_ID}_always_space_tags`] as string).split(/[\n,]/).forEach((tag: string) => {
-        tag = tag.trim().replace(/_/g, ' ');
-        if (tag) {
-            alwaysSpaceTags.add(tag);
+    buildTagIndex(tagModels);
+}
+
+export function updateTagModels(resData: ResponseData | undefined, removed: string[] = []): void {
+    if (!resData || !tagModels) {
+        return;
+    }
+    removed.forEach((tag) => {
+        const tagModel = tagModels[tag];
+        if (!tagModel) {
+            return;
+        }
+        unindexTagModel(tagModel);
+        for (const aliasTagModel of Object.values(tagModels)) {
+            if (aliasTagModel.consequentTagModel === tagModel) {
+                unindexTagModel(aliasTagModel);
+            }
         }
     });
-
-    tagModels = {};
     Object.entries(resData.tagModels).forEach(([tag, data]) => {
-        const splitTag = tag.split(/[ _-]/g);
-        const tagModel: TagModel = tagModels[tag] ?? {
-            value: tag,
-            values: tag.split(/[ _-]/g),
-            flatValue: splitTag.join(''),
-            category: data.category,
-            useCount: data.use_count,
-            postCount: data.post_count,
-            consequentTagModel: undefined,
-            isOfficial: true,
-        };
-        tagModel.isOfficial = true;
-        for (const alias of data.aliases) {
-            const splitAlias = alias.split(/[ _-]/g);
-            const aliasTagModel = tagModels[alias] ?? {
-                value: alias,
-                values: alias.split(/[ _-]/g),
-                flatValue: splitAlias.join(''),
-                category: data.category,
-                useCount: data.use_count,
-                postCount: data.post_count,
-                consequentTagModel: tagModel,
-                isOfficial: false,
-            };
-            if (aliasTagModel.isOfficial) {
-                aliasTagModel.consequentTagModel = tagModel;
-            } else {
-                tagModels[alias] = aliasTagModel;
-            }
+        const current = tagModels[tag];
+        if (current && current.isOfficial) {
+            current.category = data.category;
+            current.useCount = data.use_count;
+            current.postCount = data.post_count;
+            return;
         }
-        tagModels[tag] = tagModel;
+        registerTagModel(tag, data).forEach((tagModel) => indexTagModel(tagModel));
     });
-
-    buildTagIndex(tagModels);
 }
 
-function getPrefixes(tag: string, maxLen = 3): Set<string> {
-    const set: Set<string> = new Set();
-    for (const t of tag.split(/[ _-]/g)) {
-        const len = Math.min(maxLen, t.length);
-        for (let i = 1; i <= len; i++) {
-            set.add(t.substring(0, i));
+function registerTagModel(tag: string, data: ResponseData['tagModels'][string]): TagModel[] {
+    const registered: TagModel[] = [];
+    const tagModel: TagModel = tagModels[tag] ?? {
+        value: tag,
+        category: data.category,
+        useCount: data.use_count,
+        postCount: data.post_count,
+        consequentTagModel: undefined,
+        isOfficial: true,
+    };
+    tagModel.isOfficial = true;
+    for (const alias of data.aliases) {
+        const aliasTagModel = tagModels[alias] ?? {
+            value: alias,
+            category: data.category,
+            useCount: data.use_count,
+            postCount: data.post_count,
+            consequentTagModel: tagModel,
+            isOfficial: false,
+        };
+        if (aliasTagModel.isOfficial) {
+            aliasTagModel.consequentTagModel = tagModel;
+        } else {
+            tagModels[alias] = aliasTagModel;
+            registered.push(aliasTagModel);
         }
     }
-    return set;
+    tagModels[tag] = tagModel;
+    registered.push(tagModel);
+    return registered;
 }
 
 export function buildTagIndex(tagModels: Record<string, TagModel>): void {
-    tagIndex = {};
-    for (const tagModel of Object.values(tagModels)) {
-        const prefixes = getPrefixes(tagModel.value, 3);
-        for (const p of prefixes) {
-            if (!(p in tagIndex)) {
-                tagIndex[p] = {};
-            }
-            tagIndex[p][tagModel.value] = tagModel;
-        }
-    }
+    tagIndex = createTagIndex(Object.values(tagModels));
+    lastSearch = undefined;
 }
 
 function appendTagModel(tagModel: TagModel): void {
@@ -96,19 +95,35 @@ function appendTagModel(tagModel: TagModel): void {
         return;
     }
     tagModels[tagModel.value] = tagModel;
-    const prefixes = getPrefixes(tagModel.value, 3);
-    for (const p of prefixes) {
-        if (!(p in tagIndex)) {
-            tagIndex[p] = {};
-        }
-        tagIndex[p][tagModel.value] = tagModel;
-    }
+    indexTagModel(tagModel);
+}
+
+function unindexTagModel(tagModel: TagModel): void {
+    delete tagModels[tagModel.value];
+    removeFromTagIndex(tagIndex, tagModel.value);
+    lastSearch = undefined;
+}
+
+function indexTagModel(tagModel: TagModel): void {
+    addToTagIndex(tagIndex, tagModel);
+    lastSearch = undefined;
 }
 
 export function getTagModel(tag: string): TagModel | undefined {
     return tagModels[tag];
 }
 
+// Matches of the candidate tags of one search, in flat arrays so that no objects are created for the candidates
+// that do not make it into the results: candidate c is tag tagIds[c] with counts[c] matches, and its match j is
+// query queryIndexes[c * stride + j] matching word wordIndexes[c * stride + j] of the tag.
+interface TagMatches {
+    tagIds: number[];
+    counts: Uint16Array;
+    queryIndexes: Uint16Array;
+    wordIndexes: Uint16Array;
+    stride: number;
+}
+
 export function searchTag(query: string, priorityTags: string[]): ItemProps[] {
     const queries = query
         .toLowerCase()
@@ -119,135 +134,294 @@ export function searchTag(query: string, priorityTags: string[]): ItemProps[] {
         joinedQuery = queries.join('');
     }
 
-    const priorityTagSet = new Set(priorityTags);
-    let resultList: ItemProps[] = [];
-    const resultKeySet: Record<string, boolean> = {};
-    queries.forEach((queryForCandidate) => {
-        const prefixKey = queryForCandidate.length > 3 ? queryForCandidate.slice(0, 3) : queryForCandidate;
-        const candidateTagList = tagIndex[prefixKey];
-        for (const key in candidateTagList) {
-            if (key in resultKeySet) {
-                continue;
-            }
-            const tagModel = candidateTagList[key];
+    const prefixes = toPrefixes(queries);
+    // a query refining the last one is matched against the tags that one matched, unless its own prefixes post fewer;
+    // those tags still need a word with one of the new prefixes, as a fresh search only looks at such tags
+    let candidateIds: number[];
+    if (lastSearch && refines(lastSearch.queries, queries) && lastSearch.tagIds.length <= countTagIds(tagIndex, prefixes)) {
+        if (toPrefixes(lastSearch.queries).every((prefix, i) => prefix === prefixes[i])) {
+            candidateIds = lastSearch.tagIds;
+        } else {
+            candidateIds = lastSearch.tagIds.filter((tagId) => hasPrefixedWord(tagId, prefixes));
+        }
+    } else {
+        candidateIds = findTagIds(tagIndex, prefixes);
+    }
+    const matches = matchTags(candidateIds, queries, joinedQuery);
+    const { tagIds, counts, queryIndexes, wordIndexes, stride } = matches;
+    const tags = tagIndex.tags;
+    lastSearch = { queries: queries, tagIds: tagIds.filter((__, c) => counts[c] > 0) };
 
-            const matchedWords: { word: string; index: number }[] = [];
-            if (joinedQuery && tagModel.value.startsWith(joinedQuery)) {
-                for (let i = 0; i < queries.length; i++) {
-                    matchedWords.push({ word: queries[i], index: i });
-                }
-            } else {
-                const matchedQueryIndices: Record<number, boolean> = {};
-                for (const query of queries) {
-                    if (!(0 in matchedQueryIndices) && tagModel.flatValue.startsWith(query)) {
-                        matchedWords.push({ word: query, index: 0 });
-                        matchedQueryIndices[0] = true;
-                        continue;
-                    }
-                    for (let i = 0; i < tagModel.values.length; i++) {
-                        if (!(i in matchedQueryIndices) && tagModel.values[i].startsWith(query)) {
-                            matchedWords.push({ word: query, index: i });
-                            matchedQueryIndices[i] = true;
-                            break;
-                        }
-                    }
-                }
-            }
-            if (matchedWords.length > 0) {
-                const props: ItemProps = {
-                    ...tagModel,
-                    exists: false,
-                    isPriority: priorityTagSet.has(tagModel.value),
-                    matchedWords: matchedWords,
-                    view: null,
-                    previewFile: '',
-                };
-                resultList.push(props);
-                resultKeySet[key] = true;
-            }
+    // an alias is left out when its consequent tag matches at least as many query words
+    const consequentMatchCounts = new Uint16Array(tags.length);
+    tagIds.forEach((tagId, c) => {
+        if (!tags[tagId]!.consequentTagModel) {
+            consequentMatchCounts[tagId] = counts[c];
         }
     });
-
-    const consequentTagMatchCount = resultList
-        .filter((r) => !r.consequentTagModel)
-        .reduce<Record<string, number>>((acc, r) => {
-            acc[r.value] = r.matchedWords.length;
-            return acc;
-        }, {});
-    resultList = resultList.filter((r) => {
-        if (!r.consequentTagModel) return true;
-        const consequentTag = r.consequentTagModel.value;
-        return !(consequentTag in consequentTagMatchCount) || consequentTagMatchCount[consequentTag] < r.matchedWords.length;
+    const candidates: number[] = [];
+    tagIds.forEach((tagId, c) => {
+        const consequentTagModel = tags[tagId]!.consequentTagModel;
+        if (counts[c] > 0) {
+            const consequentId = consequentTagModel ? tagIndex.tagIds.get(consequentTagModel.value) : undefined;
+            if (consequentId === undefined || !consequentMatchCounts[consequentId] || consequentMatchCounts[consequentId] < counts[c]) {
+                candidates.push(c);
+            }
+        }
     });
 
-    const resultTagCount: Record<string, number> = {};
-    const resultCount: Record<string, number> = {};
-    resultList.forEach((r) => {
-        r.matchedWords.forEach((m) => {
-            if (!resultTagCount[m.word]) {
-                resultTagCount[m.word] = 0;
-            }
-            resultTagCount[m.word] += 1;
-        });
+    // how many results each query word matched; equal query words count together
+    const queryKeys = queries.map((q) => queries.indexOf(q));
+    const resultTagCount = new Uint32Array(queries.length);
+    candidates.forEach((c) => {
+        for (let j = 0; j < counts[c]; j++) {
+            resultTagCount[queryKeys[queryIndexes[c * stride + j]]] += 1;
+        }
     });
-    resultList.forEach((r) => {
-        resultCount[r.value] = r.matchedWords.reduce((acc, m) => acc + resultTagCount[m.word], 0);
+    const resultCount = new Uint32Array(tagIds.length);
+    candidates.forEach((c) => {
+        for (let j = 0; j < counts[c]; j++) {
+            resultCount[c] += resultTagCount[queryKeys[queryIndexes[c * stride + j]]];
+        }
     });
 
-    resultList = resultList.sort((a, b) => compare(a, b, query, joinedQuery, queries, resultCount));
+    const priorityTagSet = new Set(priorityTags);
     const groupCounter: Record<string, number> = {};
     for (const key of ['0', '1', '3', '4', '5', 'custom']) {
         groupCounter[key] = window.opts[`${EXTENSION_ID}_max_results_group${key}`] as number;
     }
+    const selected = selectTopResults(
+        candidates,
+        (c) => tags[tagIds[c]]!.category,
+        groupCounter,
+        (a, b) => compare(a, b, matches, priorityTagSet, query, joinedQuery, queries, resultCount),
+    );
 
-    return resultList.filter((r) => {
-        if (groupCounter[r.category] < 0 || groupCounter[r.category] > 0) {
-            groupCounter[r.category] -= 1;
+    return selected.map((c): ItemProps => {
+        const tagModel = tags[tagIds[c]]!;
+        const matchedWords: { word: string; index: number }[] = [];
+        for (let j = 0; j < counts[c]; j++) {
+            matchedWords.push({ word: queries[queryIndexes[c * stride + j]], index: wordIndexes[c * stride + j] });
+        }
+        return {
+            ...tagModel,
+            exists: false,
+            isPriority: priorityTagSet.has(tagModel.value),
+            matchedWords: matchedWords,
+            view: null,
+            previewFile: '',
+        };
+    });
+}
+
+// Whether a search for `queries` only has to look at the tags that `previous` matched: each query word extends the
+// previous one at its position. A tag matching the longer words then matched the shorter ones too, and a tag having a
+// word that starts with a longer word's first three letters has one starting with the shorter word's. The reverse does
+// not hold, so the previous tags are narrowed down to those having a word with a new prefix. An added query word is
+// not a refinement; the search unites the tags of every query word, so it may match tags that the previous words did
+// not.
+function refines(previous: string[], queries: string[]): boolean {
+    return previous.length === queries.length && previous.every((q, i) => queries[i].startsWith(q));
+}
+
+// the first three letters of each query word, by which the tag index is looked up
+function toPrefixes(queries: string[]): string[] {
+    return queries.map((q) => (q.length > 3 ? q.slice(0, 3) : q));
+}
+
+// whether the tag is one that findTagIds(tagIndex, prefixes) returns
+function hasPrefixedWord(tagId: number, prefixes: string[]): boolean {
+    const wordCount = getTagWords(tagIndex, tagId, tagWords);
+    for (let i = 0; i < wordCount; i++) {
+        const word = tagWords[i];
+        if (prefixes.some((prefix) => word.startsWith(prefix))) {
             return true;
         }
-        return false;
+    }
+    return false;
+}
+
+// Which query words match which words of each tag. A query word matches the start of a word, or of the whole tag
+// with its separators removed, and each word of a tag is matched once; a tag starting with all query words joined
+// matches every query word.
+function matchTags(tagIds: number[], queries: string[], joinedQuery: string | undefined): TagMatches {
+    const stride = queries.length;
+    const matches: TagMatches = {
+        tagIds: tagIds,
+        counts: new Uint16Array(tagIds.length),
+        queryIndexes: new Uint16Array(tagIds.length * stride),
+        wordIndexes: new Uint16Array(tagIds.length * stride),
+        stride: stride,
+    };
+    tagIds.forEach((tagId, c) => {
+        const offset = c * stride;
+        let count = 0;
+        const push = (queryIndex: number, wordIndex: number) => {
+            matches.queryIndexes[offset + count] = queryIndex;
+            matches.wordIndexes[offset + count] = wordIndex;
+            count++;
+        };
+        const isMatched = (wordIndex: number) => {
+            for (let j = 0; j < count; j++) {
+                if (matches.wordIndexes[offset + j] === wordIndex) {
+                    return true;
+                }
+            }
+            return false;
+        };
+
+        if (joinedQuery && tagIndex.tags[tagId]!.value.startsWith(joinedQuery)) {
+            for (let i = 0; i < queries.length; i++) {
+                push(i, i);
+            }
+        } else {
+            const wordCount = getTagWords(tagIndex, tagId, tagWords);
+            queries.forEach((query, queryIndex) => {
+                if (!isMatched(0) && flatStartsWith(wordCount, query)) {
+                    push(queryIndex, 0);
+                    return;
+                }
+                for (let i = 0; i < wordCount; i++) {
+                    if (!isMatched(i) && tagWords[i].startsWith(query)) {
+                        push(queryIndex, i);
+                        break;
+                    }
+                }
+            });
+        }
+        matches.counts[c] = count;
     });
+    return matches;
+}
+
+// whether the words of the tag, joined without separators, start with `query`
+function flatStartsWith(wordCount: number, query: string): boolean {
+    let position = 0;
+    for (let i = 0; i < wordCount && position < query.length; i++) {
+        const word = tagWords[i];
+        if (position + word.length > query.length) {
+            return word.startsWith(query.substring(position));
+        }
+        if (!query.startsWith(word, position)) {
+            return false;
+        }
+        position += word.length;
+    }
+    return position >= query.length;
 }
 
 function compare(
-    self: ItemProps,
-    other: ItemProps,
+    self: number,
+    other: number,
+    matches: TagMatches,
+    priorityTagSet: Set<string>,
     query: string,
     joinedQuery: string | undefined,
     queries: string[],
-    resultCount: Record<string, number>,
+    resultCount: Uint32Array,
 ): number {
-    if (self.isPriority && !other.isPriority) return -1;
-    if (!self.isPriority && other.isPriority) return 1;
-
-    if (self.value === query || (joinedQuery && self.value === joinedQuery)) return -1;
-    if (other.value === query || (joinedQuery && other.value === joinedQuery)) return 1;
-
-    if (other.matchedWords.length !== self.matchedWords.length) {
-        return other.matchedWords.length - self.matchedWords.length;
-    } else if (queries.length === self.matchedWords.length) {
-        for (let i = 0; i < self.matchedWords.length; i++) {
-            if (self.matchedWords[i].index !== other.matchedWords[i].index) {
-                return self.matchedWords[i].index - other.matchedWords[i].index;
+    const { tagIds, counts, wordIndexes, stride } = matches;
+    const selfTag = tagIndex.tags[tagIds[self]]!;
+    const otherTag = tagIndex.tags[tagIds[other]]!;
+    const selfIsPriority = priorityTagSet.has(selfTag.value);
+    const otherIsPriority = priorityTagSet.has(otherTag.value);
+    if (selfIsPriority && !otherIsPriority) return -1;
+    if (!selfIsPriority && otherIsPriority) return 1;
+
+    if (selfTag.value === query || (joinedQuery && selfTag.value === joinedQuery)) return -1;
+    if (otherTag.value === query || (joinedQuery && otherTag.value === joinedQuery)) return 1;
+
+    if (counts[other] !== counts[self]) {
+        return counts[other] - counts[self];
+    } else if (queries.length === counts[self]) {
+        for (let j = 0; j < counts[self]; j++) {
+            if (wordIndexes[self * stride + j] !== wordIndexes[other * stride + j]) {
+                return wordIndexes[self * stride + j] - wordIndexes[other * stride + j];
             }
         }
     }
 
-    if (other.useCount !== self.useCount) {
-        return other.useCount - self.useCount;
+    if (otherTag.useCount !== selfTag.useCount) {
+        return otherTag.useCount - selfTag.useCount;
     }
-    const count = resultCount[self.value] - resultCount[other.value];
+    const count = resultCount[self] - resultCount[other];
     if (count !== 0) {
         return count;
     }
-    if (other.postCount !== self.postCount) {
-        return other.postCount - self.postCount;
+    if (otherTag.postCount !== selfTag.postCount) {
+        return otherTag.postCount - selfTag.postCount;
     }
 
-    return self.value < other.value ? -1 : 1;
+    return selfTag.value < otherTag.value ? -1 : 1;
 }
 
-export const debounceSearchWithApi = debounceWithLeadingTrailing((query: string, callback: (results: ItemProps[]) => void): void => {
+export function searchTagOnServer(query: string, priorityTags: string[], callback: (results: ItemProps[]) => void): void {
+    // only the newest keystroke counts; an older request still in flight is abandoned
+    searchController?.abort();
+    const controller = new AbortController();
+    searchController = controller;
+
+    const params = new URLSearchParams({ q: query });
+    priorityTags.forEach((tag) => params.append('priority', tag));
+    fetch(`${API_PREFIX}/search?${params.toString()}`, { signal: controller.signal })
+        .then(async (res) => {
+            if (!res.ok) {
+                console.error('Error searching tags:', res.statusText);
+                callback([]);
+                return;
+            }
+            const json: SearchTagData = await res.json();
+            if (controller.signal.aborted) {
+                return;
+            }
+            const resultSet = json.items.map((item): ItemProps => {
+                let consequentTagModel: TagModel | null = null;
+                if (item.consequent) {
+                    consequentTagModel = tagModels[item.consequent.value] ?? toTagModel(item.consequent, null, true);
+                    appendTagModel(consequentTagModel);
+                }
+                appendTagModel(toTagModel(item, consequentTagModel, item.isOfficial));
+                return {
+                    value: item.value,
+                    category: item.category,
+                    exists: false,
+                    matchedWords: item.matchedWords,
+                    useCount: item.useCount,
+                    postCount: item.postCount,
+                    consequentTagModel: consequentTagModel,
+                    isOfficial: item.isOfficial,
+                    isPriority: item.isPriority,
+                    view: null,
+                    previewFile: '',
+                };
+            });
+            callback(resultSet);
+        })
+        .catch((err) => {
+            // an aborted search is answered by the newer one that replaced it
+            if (err.name !== 'AbortError') {
+                console.error('Error searching tags:', err);
+                callback([]);
+            }
+        });
+}
+
+function toTagModel(
+    item: { value: string; category: string; useCount: number; postCount: number },
+    consequentTagModel: TagModel | null,
+    isOfficial: boolean,
+): TagModel {
+    return {
+        value: item.value,
+        category: item.category,
+        useCount: item.useCount,
+        postCount: item.postCount,
+        consequentTagModel: consequentTagModel,
+        isOfficial: isOfficial,
+    };
+}
+
+export function searchTagWithApi(query: string, callback: (results: ItemProps[]) => void): void {
     const endpoint = 'https://danbooru.donmai.us/autocomplete.json';
     let apiUrl = endpoint;
     apiUrl += `?search[query]=${encodeURIComponent(query)}`;
@@ -288,12 +462,7 @@ export const debounceSearchWithApi = debounceWithLeadingTrailing((query: string,
                 };
             });
             resultSet.forEach((r) => {
-                const splitTag = r.value.split(/[ _-]/g);
-                appendTagModel({
-                    ...r,
-                    values: splitTag,
-                    flatValue: splitTag.join(''),
-                });
+                appendTagModel({ ...r });
             });
             callback(resultSet);
         })
@@ -301,4 +470,4 @@ export const debounceSearchWithApi = debounceWithLeadingTrailing((query: string,
             console.error('Error fetching tag data:', err);
             callback(resultSet);
         });
-}, 1100);
+}
@@ -0,0 +1,114 @@
+import { ItemProps } from '@/types/props';
+import { WorkerRequest, WorkerResponse, WorkerResults } from '@/types/worker';
+import { debounceWithLeadingTrailing } from '@/utils/commonUtil';
+
+// the worker bundle is built next to javascript/ (whose scripts the WebUI runs on the page), so it is
+// located relative to this script, whatever the folder the extension was installed in, and shares its
+// cache-busting query; currentScript is only set while the script first runs
+const WORKER_PATH = '../worker/prompt_pilot_worker.js';
+const scriptUrl = (document.currentScript as HTMLScriptElement | null)?.src;
+
+interface PendingRequest {
+    resolve: (result: any) => void;
+    reject: (reason: Error) => void;
+}
+
+let worker: Worker | undefined;
+let nextRequestId = 0;
+const pendingRequests = new Map<number, PendingRequest>();
+let suggestionCategories: Record<string, string> = {};
+
+function getWorker(): Worker {
+    if (!worker) {
+        if (!scriptUrl) {
+            throw new Error('Failed to locate the model worker: prompt_pilot.js was not loaded by a script element');
+        }
+        const url = new URL(WORKER_PATH, scriptUrl);
+        url.search = new URL(scriptUrl).search;
+        worker = new Worker(url);
+        worker.onmessage = (e: MessageEvent<WorkerResponse>) => {
+            const response = e.data;
+            const pending = pendingRequests.get(response.id);
+            if (!pending) {
+                return;
+            }
+            pendingRequests.delete(response.id);
+            if (response.error !== undefined) {
+                pending.reject(new Error(response.error));
+            } else {
+                pending.resolve(response.cancelled ? undefined : response.result);
+            }
+        };
+        worker.onerror = (e: ErrorEvent) => {
+            pendingRequests.forEach((pending) => pending.reject(new Error(e.message || 'Failed to run the model worker')));
+            pendingRequests.clear();
+        };
+    }
+    return worker;
+}
+
+// resolves to undefined when the request was a search that a newer search replaced
+function request<T extends WorkerRequest>(message: T, transfer: Transferable[] = []): Promise<WorkerResults[T['type']] | undefined> {
+    const id = nextRequestId++;
+    return new Promise((resolve, reject) => {
+        const target = getWorker();
+        pendingRequests.set(id, { resolve, reject });
+        target.postMessage({ ...message, id: id }, transfer);
+    });
+}
+
+export async function setOptions(opts: Window['opts']): Promise<void> {
+    await request({ type: 'options', opts: opts });
+}
+
+// both hand the buffer over to the worker, which decompresses, parses and indexes it there
+export async function loadModels(buffer: ArrayBuffer): Promise<number> {
+    const result = await request({ type: 'load', buffer: buffer }, [buffer]);
+    return result!.version;
+}
+
+export async function applyModelDelta(buffer: ArrayBuffer): Promise<number> {
+    const result = await request({ type: 'delta', buffer: buffer }, [buffer]);
+    return result!.version;
+}
+
+// the worker keeps its own copy of the tags in the prompt, so only what changed is sent
+export async function updateExistTags(changes: { added: string[]; removed: string[] }): Promise<void> {
+    if (changes.added.length > 0 || changes.removed.length > 0) {
+        await request({ type: 'existTags', added: changes.added, removed: changes.removed });
+    }
+}
+
+export function searchTag(query: string, priorityTags: string[]): Promise<ItemProps[] | undefined> {
+    return request({ type: 'searchTag', query: query, priorityTags: priorityTags });
+}
+
+export function searchTagOnServer(query: string, priorityTags: string[]): Promise<ItemProps[] | undefined> {
+    return request({ type: 'searchTagOnServer', query: query, priorityTags: priorityTags });
+}
+
+export const debounceSearchWithApi = debounceWithLeadingTrailing((query: string, callback: (results: ItemProps[]) => void): void => {
+    request({ type: 'searchTagWithApi', query: query }).then((items) => {
+        if (items) {
+            callback(items);
+        }
+    });
+}, 1100);
+
+export function searchLora(query: string): Promise<ItemProps[] | undefined> {
+    return request({ type: 'searchLora', query: query });
+}
+
+export async function searchSuggestion(nearestTag: string | undefined): Promise<ItemProps[] | undefined> {
+    const result = await request({ type: 'searchSuggestion', nearestTag: nearestTag });
+    if (!result) {
+        return undefined;
+    }
+    suggestionCategories = result.categories;
+    return result.items;
+}
+
+// category of a tag from the latest suggestions, which are the only items inserted without one
+export function getSuggestionCategory(tag: string): string {
+    return suggestionCategories[tag] ?? 'custom';
+}
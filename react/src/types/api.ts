@@ -1,4 +1,5 @@
 export interface ResponseData {
+    version?: number;
     suggestionModels: Record<string, Record<string, number>>;
     tagModels: Record<
         string,
@@ -18,3 +19,57 @@ export interface ResponseData {
         }
     >;
 }
+
+export interface CompactModelData {
+    format: 2;
+    version: number;
+    strings: string[];
+    tags: {
+        count: number;
+        category: number[];
+        postCount: number[];
+        useCount: number[];
+        aliasOffsets: number[];
+        aliases: number[];
+    };
+    suggestions: {
+        tag: number[];
+        offsets: number[];
+        neighbour: number[];
+        score: number[];
+    };
+    loras: {
+        name: number[];
+        previewFile: number[];
+        wordOffsets: number[];
+        words: number[];
+    };
+}
+
+export interface ModelDeltaData extends ResponseData {
+    version: number;
+    full: boolean;
+    removed: {
+        suggestionModels: string[];
+        tagModels: string[];
+        loraModels: string[];
+    };
+}
+
+export interface SearchTagData {
+    items: {
+        value: string;
+        category: string;
+        useCount: number;
+        postCount: number;
+        isOfficial: boolean;
+        isPriority: boolean;
+        matchedWords: { word: string; index: number }[];
+        consequent: {
+            value: string;
+            category: string;
+            useCount: number;
+            postCount: number;
+        } | null;
+    }[];
+}
@@ -3,8 +3,6 @@ interface Model {
 }
 
 export interface TagModel extends Model {
-    values: string[];
-    flatValue: string;
     category: string;
     useCount: number;
     postCount: number;
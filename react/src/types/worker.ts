@@ -0,0 +1,34 @@
+import { ItemProps } from '@/types/props';
+
+export type WorkerRequest =
+    | { type: 'options'; opts: Window['opts'] }
+    | { type: 'load'; buffer: ArrayBuffer }
+    | { type: 'delta'; buffer: ArrayBuffer }
+    | { type: 'existTags'; added: string[]; removed: string[] }
+    | { type: 'searchTag'; query: string; priorityTags: string[] }
+    | { type: 'searchTagOnServer'; query: string; priorityTags: string[] }
+    | { type: 'searchTagWithApi'; query: string }
+    | { type: 'searchLora'; query: string }
+    | { type: 'searchSuggestion'; nearestTag: string | undefined };
+
+export type WorkerMessage = WorkerRequest & { id: number };
+
+export interface WorkerResults {
+    options: null;
+    load: { version: number };
+    delta: { version: number };
+    existTags: null;
+    searchTag: ItemProps[];
+    searchTagOnServer: ItemProps[];
+    searchTagWithApi: ItemProps[];
+    searchLora: ItemProps[];
+    searchSuggestion: { items: ItemProps[]; categories: Record<string, string> };
+}
+
+// `cancelled` is set when a newer search replaced this one before it ran
+export interface WorkerResponse {
+    id: number;
+    result?: WorkerResults[keyof WorkerResults];
+    cancelled?: boolean;
+    error?: string;
+}
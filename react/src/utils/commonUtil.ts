@@ -51,3 +51,40 @@ export function formatNumberWithUnits(num: number): string {
         return num.toString();
     }
 }
+
+// The first `limits[category]` candidates of each category in sorted order (-1 = all of them), sorted. This is the
+// same as sorting all candidates and filtering them, but only the candidates that can still make it are kept sorted,
+// so a short query matching most of the candidates costs little more than a long one.
+export function selectTopResults(
+    candidates: number[],
+    categoryOf: (c: number) => string,
+    limits: Record<string, number>,
+    compareFn: (a: number, b: number) => number,
+): number[] {
+    const groups: Record<string, number[]> = {};
+    for (const c of candidates) {
+        const category = categoryOf(c);
+        const limit = limits[category];
+        if (!(limit < 0 || limit > 0)) {
+            continue;
+        }
+        const group = (groups[category] ??= []);
+        if (limit < 0) {
+            group.push(c);
+        } else if (group.length < limit || compareFn(c, group[limit - 1]) < 0) {
+            let low = 0;
+            let high = group.length;
+            while (low < high) {
+                const middle = (low + high) >>> 1;
+                if (compareFn(group[middle], c) < 0) {
+                    low = middle + 1;
+                } else {
+                    high = middle;
+                }
+            }
+            group.splice(low, 0, c);
+            group.length = Math.min(group.length, limit);
+        }
+    }
+    return Object.values(groups).flat().sort(compareFn);
+}
@@ -1,5 +1,5 @@
 import { AppProps, ItemProps } from '@/types/props';
-import * as db_tag from '@/services/tagService';
+import { getSuggestionCategory } from '@/services/workerService';
 import { EXTENSION_ID } from '@/const/common';
 
 interface TextInsertionData {
@@ -78,9 +78,9 @@ function getTagInsertionData(state: AppProps, props: ItemProps): TextInsertionDa
     let insertTag = props.isOfficial ? props.value : props.consequentTagModel!.value;
     const source = (window.opts[`${EXTENSION_ID}_tag_source`] as string).replace(/\./g, '_');
     const delimiter = (window.opts[`${EXTENSION_ID}_${source}_${props.category}_tag_delimiter`] as string) ?? 'auto';
-    if (!db_tag.alwaysSpaceTags.has(insertTag)) {
+    if (!getTagSet('always_space_tags').has(insertTag)) {
         let replaceToUnderscore = false;
-        if (db_tag.alwaysUnderscoreTags.has(insertTag)) {
+        if (getTagSet('always_underscore_tags').has(insertTag)) {
             replaceToUnderscore = true;
         } else if (delimiter === 'underscore') {
             replaceToUnderscore = true;
@@ -126,15 +126,14 @@ function getSuggestionInsertionData(state: AppProps, props: ItemProps): TextInse
 
     const activeWord = promptInfo.words[promptInfo.activeWordIndex];
     const startPosition = activeWord.position;
-    const tag = db_tag.getTagModel(props.value);
-    const category = tag?.category ?? 'custom';
+    const category = getSuggestionCategory(props.value);
     let word = escapePrompt(props.value);
 
     const source = (window.opts[`${EXTENSION_ID}_tag_source`] as string).replace(/\./g, '_');
     const delimiter = (window.opts[`${EXTENSION_ID}_${source}_${category}_tag_delimiter`] as string) ?? 'auto';
-    if (!db_tag.alwaysSpaceTags.has(word)) {
+    if (!getTagSet('always_space_tags').has(word)) {
         let replaceToUnderscore = false;
-        if (db_tag.alwaysUnderscoreTags.has(word)) {
+        if (getTagSet('always_underscore_tags').has(word)) {
             replaceToUnderscore = true;
         } else if (delimiter === 'underscore') {
             replaceToUnderscore = true;
@@ -156,6 +155,17 @@ function getSuggestionInsertionData(state: AppProps, props: ItemProps): TextInse
     return { range: { start: startPosition, end: promptInfo.caretPosition }, insertText: word };
 }
 
+function getTagSet(option: string): Set<string> {
+    const tagSet: Set<string> = new Set();
+    (window.opts[`${EXTENSION_ID}_${option}`] as string).split(/[\n,]/).forEach((tag: string) => {
+        tag = tag.trim().replace(/_/g, ' ');
+        if (tag) {
+            tagSet.add(tag);
+        }
+    });
+    return tagSet;
+}
+
 export function htmlEncode(str: string): string {
     return str.replace(/</g, '&lt;').replace(/>/g, '&gt;');
 }
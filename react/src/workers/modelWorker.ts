@@ -0,0 +1,120 @@
+import { gunzipSync } from 'fflate';
+import * as db_tag from '@/services/tagService';
+import * as db_lora from '@/services/loraService';
+import * as db_sg from '@/services/suggestionService';
+import { decodeModels, isCompactModelData } from '@/services/modelFormat';
+import { ModelDeltaData, ResponseData } from '@/types/api';
+import { ItemProps } from '@/types/props';
+import { WorkerMessage, WorkerResponse, WorkerResults } from '@/types/worker';
+
+// the services read their settings from window.opts, which in the worker is filled by the 'options' message
+const scope = self as unknown as { window: { opts: Window['opts'] } };
+scope.window = { opts: {} };
+
+// the tags already in the prompt, kept up to date by the 'existTags' message
+const existTags = new Set<string>();
+
+// only the newest search is answered; one that is replaced before it runs or while it waits for the network is cancelled
+let activeSearchId: number | undefined;
+
+self.onmessage = (e: MessageEvent<WorkerMessage>) => {
+    const message = e.data;
+    switch (message.type) {
+        case 'options':
+            scope.window.opts = message.opts;
+            respond({ id: message.id, result: null });
+            break;
+        case 'existTags':
+            message.added.forEach((tag) => existTags.add(tag));
+            message.removed.forEach((tag) => existTags.delete(tag));
+            respond({ id: message.id, result: null });
+            break;
+        case 'load':
+        case 'delta':
+            try {
+                respond({ id: message.id, result: message.type === 'load' ? loadModels(message.buffer) : applyDelta(message.buffer) });
+            } catch (err) {
+                respond({ id: message.id, error: String(err) });
+            }
+            break;
+        default:
+            if (activeSearchId !== undefined) {
+                respond({ id: activeSearchId, cancelled: true });
+            }
+            activeSearchId = message.id;
+            setTimeout(() => runSearch(message), 0);
+    }
+};
+
+function respond(response: WorkerResponse) {
+    self.postMessage(response);
+}
+
+function loadModels(buffer: ArrayBuffer): WorkerResults['load'] {
+    const jsonString = new TextDecoder('utf-8').decode(gunzipSync(new Uint8Array(buffer)));
+    const parsed = JSON.parse(jsonString);
+    const resData: ResponseData = isCompactModelData(parsed) ? decodeModels(parsed) : parsed;
+    initializeModels(resData);
+    return { version: resData.version ?? 0 };
+}
+
+function applyDelta(buffer: ArrayBuffer): WorkerResults['delta'] {
+    const resData: ModelDeltaData = JSON.parse(new TextDecoder('utf-8').decode(buffer));
+    if (resData.full) {
+        initializeModels(resData);
+    } else {
+        db_tag.updateTagModels(resData, resData.removed.tagModels);
+        db_lora.updateLoraModels(resData, resData.removed.loraModels);
+        db_sg.updateSuggestionModels(resData, resData.removed.suggestionModels);
+    }
+    return { version: resData.version };
+}
+
+function initializeModels(resData: ResponseData) {
+    db_tag.initializeTagModels(resData);
+    db_lora.initializeLoraModels(resData);
+    db_sg.initializeSuggestionModels(resData);
+}
+
+function runSearch(message: WorkerMessage) {
+    if (message.id !== activeSearchId) {
+        return;
+    }
+    const finish = (result: WorkerResults[keyof WorkerResults]) => {
+        if (message.id === activeSearchId) {
+            activeSearchId = undefined;
+            respond({ id: message.id, result: result });
+        }
+    };
+    try {
+        switch (message.type) {
+            case 'searchTag':
+                finish(db_tag.searchTag(message.query, message.priorityTags));
+                break;
+            case 'searchTagOnServer':
+                db_tag.searchTagOnServer(message.query, message.priorityTags, finish);
+                break;
+            case 'searchTagWithApi':
+                db_tag.searchTagWithApi(message.query, finish);
+                break;
+            case 'searchLora':
+                finish(db_lora.searchLora(message.query));
+                break;
+            case 'searchSuggestion':
+                finish(withCategories(db_sg.searchSuggestion(message.nearestTag, existTags)));
+                break;
+        }
+    } catch (err) {
+        activeSearchId = undefined;
+        respond({ id: message.id, error: String(err) });
+    }
+}
+
+// suggestions are listed without a category, but inserting one needs the delimiter setting of its category
+function withCategories(items: ItemProps[]): WorkerResults['searchSuggestion'] {
+    const categories: Record<string, string> = {};
+    for (const item of items) {
+        categories[item.value] = db_tag.getTagModel(item.value)?.category ?? 'custom';
+    }
+    return { items: items, categories: categories };
+}
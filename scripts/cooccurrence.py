@@ -0,0 +1,117 @@
+import threading
+from typing import Dict, Iterable, List, Union
+import numpy as np
+from scipy import sparse
+
+# window value that pairs every tag with every other tag of the same prompt
+WHOLE_PROMPT = 0
+
+
+class Cooccurrence:
+    """
+    How often two tags appear together in the analyzed images, as a sparse tag-id x tag-id matrix.
+
+    With a window of k, every tag is paired with the tags up to k positions before and after it in the same prompt,
+    counting every occurrence; with WHOLE_PROMPT each pair of distinct tags counts once per image.
+    """
+
+    def __init__(self, window: int = 1):
+        self.window = window
+        self.lock = threading.Lock()
+        self.matrix = sparse.csr_matrix((0, 0), dtype=np.int64)
+        self.tag_counts = np.zeros(0, dtype=np.int64)
+
+    def fit(self, file_ids: np.ndarray, tag_ids: np.ndarray) -> None:
+        """
+        Count the pairs of all images; one (file_ids[i], tag_ids[i]) per tag, grouped by file in prompt order.
+        """
+        size = int(tag_ids.max()) + 1 if len(tag_ids) else 0
+        with self.lock:
+            self.matrix = _count_pairs(file_ids, tag_ids, self.window, size)
+            self.tag_counts = np.bincount(tag_ids, minlength=size).astype(np.int64)
+
+    def add(self, tag_ids: List[int]) -> None:
+        """
+        Count the pairs of one more image.
+        """
+        if not tag_ids:
+            return
+        tag_id_array = np.asarray(tag_ids, dtype=np.int64)
+        with self.lock:
+            size = max(self.matrix.shape[0], int(tag_id_array.max()) + 1)
+            if size > self.matrix.shape[0]:
+                self.matrix.resize((size, size))
+                self.tag_counts = np.concatenate([self.tag_counts, np.zeros(size - len(self.tag_counts), dtype=np.int64)])
+            self.matrix = (self.matrix + _count_pairs(np.zeros(len(tag_id_array), dtype=np.int64), tag_id_array, self.window, size)).tocsr()
+            self.tag_counts += np.bincount(tag_id_array, minlength=size)
+
+    def neighbours(
+        self,
+        tag_ids: Iterable[int],
+        min_tag_count: float = 0,
+        top_n: int = -1,
+        min_count: int = 1,
+        pmi: bool = False
+    ) -> Dict[int, Dict[int, Union[int, float]]]:
+        """
+        Return tag id -> {neighbour id: score} for each of `tag_ids`, scored by pair count or, with `pmi`, by positive
+        pointwise mutual information. Neighbours used less than `min_tag_count` times or paired less than `min_count`
+        times are left out, and only the `top_n` best scores are kept (-1 = all).
+        """
+        with self.lock:
+            matrix = self.matrix
+            allowed = self.tag_counts >= min_tag_count
+            if pmi:
+                totals = np.asarray(matrix.sum(axis=1)).ravel()
+                grand_total = totals.sum()
+            result = {}
+            for tag_id in tag_ids:
+                if tag_id >= matrix.shape[0]:
+                    continue
+                start, end = matrix.indptr[tag_id], matrix.indptr[tag_id + 1]
+                columns = matrix.indices[start:end]
+                scores = matrix.data[start:end]
+                keep = (scores >= min_count) & allowed[columns]
+                columns, scores = columns[keep], scores[keep]
+                if pmi:
+                    scores = np.log(scores * grand_total / (totals[tag_id] * totals[columns]))
+                    keep = scores > 0
+                    columns, scores = columns[keep], np.round(scores[keep], 3)
+                if 0 <= top_n < len(columns):
+                    top = np.argpartition(-scores, top_n)[:top_n] if top_n > 0 else []
+                    columns, scores = columns[top], scores[top]
+                if len(columns):
+                    result[int(tag_id)] = dict(zip(columns.tolist(), scores.tolist()))
+            return result
+
+    def tag_ids(self, min_tag_count: float = 0) -> List[int]:
+        """
+        Ids of the tags used at least `min_tag_count` times that have any neighbour.
+        """
+        with self.lock:
+            has_neighbours = np.diff(self.matrix.indptr) > 0
+            return np.flatnonzero(has_neighbours & (self.tag_counts >= min_tag_count)).tolist()
+
+
+def _count_pairs(file_ids: np.ndarray, tag_ids: np.ndarray, window: int, size: int) -> sparse.csr_matrix:
+    if window == WHOLE_PROMPT:
+        __, rows = np.unique(file_ids, return_inverse=True)
+        incidence = sparse.csr_matrix((np.ones(len(tag_ids), dtype=np.int64), (rows, tag_ids)), shape=(rows.max() + 1 if len(rows) else 0, size))
+        # a tag repeated in one prompt still counts that image once
+        incidence.data[:] = 1
+        matrix = (incidence.T @ incidence).tocsr()
+        matrix = (matrix - sparse.diags(matrix.diagonal(), dtype=matrix.dtype)).tocsr()
+        matrix.eliminate_zeros()
+        return matrix
+
+    lefts = []
+    rights = []
+    for offset in range(1, window + 1):
+        same_file = file_ids[:-offset] == file_ids[offset:]
+        lefts.append(tag_ids[:-offset][same_file])
+        rights.append(tag_ids[offset:][same_file])
+    rows = np.concatenate(lefts + rights)
+    columns = np.concatenate(rights + lefts)
+    distinct = rows != columns
+    rows, columns = rows[distinct], columns[distinct]
+    return sparse.csr_matrix((np.ones(len(rows), dtype=np.int64), (rows, columns)), shape=(size, size))
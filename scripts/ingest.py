@@ -0,0 +1,93 @@
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple
+import scripts.parser as parser
+from scripts.metadata import get_prompt
+
+BATCH_SIZE = 8
+# batches handed to the pool per worker: one being read and one ready to start
+PENDING_BATCHES_PER_WORKER = 2
+
+
+def extract_tags(file: str) -> Tuple[List[str], Optional[str]]:
+    """
+    Read the prompt of `file` and split it into tags. Runs inside a pool worker, so errors are returned instead of raised.
+    """
+    try:
+        prompt = get_prompt(file)
+        if prompt is None:
+            return [], None
+        return parser.get_tags(prompt), None
+    except Exception as e:
+        return [], str(e)
+
+
+def extract_tags_batch(files: List[str]) -> List[Tuple[List[str], Optional[str]]]:
+    """
+    extract_tags() for several files in one pool task, so a process pool pickles one task per batch instead of per file.
+    """
+    prompts: List[Optional[str]] = []
+    errors: List[Optional[str]] = []
+    for file in files:
+        try:
+            prompts.append(get_prompt(file))
+            errors.append(None)
+        except Exception as e:
+            prompts.append(None)
+            errors.append(str(e))
+    try:
+        tags_list = parser.get_tags_batch(prompts)
+    except Exception:
+        return [extract_tags(file) for file in files]
+    return list(zip(tags_list, errors))
+
+
+class IngestPool:
+    """
+    Worker pool that extracts tags from image files in parallel.
+
+    Files are handed to the workers in batches of BATCH_SIZE and at most `workers * PENDING_BATCHES_PER_WORKER` batches,
+    that is `workers * 16` files, are in flight at once, so the caller can consume the results as a single writer
+    without the pool running ahead of it.
+    """
+
+    def __init__(self, workers: int = 0, use_processes: bool = False):
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.use_processes = use_processes
+        self.executor: Optional[Executor] = None
+
+    def __enter__(self) -> "IngestPool":
+        if self.use_processes:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.executor:
+            self.executor.shutdown(wait=True, cancel_futures=exc_type is not None)
+
+    def imap(self, files: Iterable[str]) -> Iterator[Tuple[str, List[str], Optional[str]]]:
+        """
+        Yield (file, tags, error) for each file, in the order given.
+        """
+        max_pending = self.workers * PENDING_BATCHES_PER_WORKER
+        pending: Deque[Tuple[List[str], Future]] = deque()
+        batch: List[str] = []
+        for file in files:
+            batch.append(file)
+            if len(batch) >= BATCH_SIZE:
+                pending.append((batch, self.executor.submit(extract_tags_batch, batch)))
+                batch = []
+            if len(pending) >= max_pending:
+                yield from self._results(*pending.popleft())
+        if batch:
+            pending.append((batch, self.executor.submit(extract_tags_batch, batch)))
+        while pending:
+            yield from self._results(*pending.popleft())
+
+    @staticmethod
+    def _results(batch: List[str], future: Future) -> Iterator[Tuple[str, List[str], Optional[str]]]:
+        for file, (tags, error) in zip(batch, future.result()):
+            yield file, tags, error
@@ -0,0 +1,152 @@
+import json
+import os
+import sqlite3
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+ALLOWED_PREVIEW_EXTENSIONS = ["jpg", "jpeg", "png", "webp", "gif"]
+NO_PREVIEW_FILE = "./file=html/card-no-preview.png"
+
+
+class LoraIndex:
+    """
+    Builds the LoRA models, redoing only the LoRAs whose files changed since the last build.
+
+    Each LoRA directory is listed once per build and previews are resolved from that listing.
+    The fields used from a .civitai.info file are kept in tlora_info keyed by path, mtime and size,
+    so a file is only read again after it changed; those reads run in parallel.
+    """
+
+    def __init__(self, workers: int = 8):
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Tuple[Tuple, Dict[str, Any]]] = {}
+
+    def build(self, cursor: sqlite3.Cursor, networks: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            return self._build(cursor, list(networks))
+
+    def _build(self, cursor: sqlite3.Cursor, networks: List[Any]) -> Dict[str, Dict[str, Any]]:
+        model_paths = [os.path.splitext(lora_obj.filename)[0] if lora_obj.filename else "" for lora_obj in networks]
+        directories = sorted({os.path.dirname(model_path) for model_path in model_paths if model_path})
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            listings = dict(zip(directories, executor.map(_list_directory, directories)))
+
+            keys = []
+            info_stats: Dict[str, Tuple[float, int]] = {}
+            for lora_obj, model_path in zip(networks, model_paths):
+                listing = listings.get(os.path.dirname(model_path), {})
+                base_name = os.path.basename(model_path)
+                info_stat = None
+                if model_path:
+                    info_entry = listing.get(os.path.normcase(f"{base_name}.civitai.info"))
+                    if info_entry is not None:
+                        info_stat = _stat(info_entry)
+                        if info_stat is not None:
+                            info_stats[f"{model_path}.civitai.info"] = info_stat
+                preview_file = _find_preview_file(model_path, listing)
+                keys.append((lora_obj.name, lora_obj.alias, model_path, info_stat, preview_file))
+
+            changed_infos = {
+                f"{key[2]}.civitai.info": info_stats[f"{key[2]}.civitai.info"]
+                for lora_obj, key in zip(networks, keys)
+                if key[3] is not None and self.entries.get(lora_obj.filename, (None,))[0] != key
+            }
+            civitai_infos = _load_civitai_infos(cursor, changed_infos, executor)
+
+        lora_model = {}
+        entries = {}
+        for lora_obj, key in zip(networks, keys):
+            cached = self.entries.get(lora_obj.filename)
+            if cached is not None and cached[0] == key:
+                entry = cached[1]
+            else:
+                name, alias, model_path, info_stat, preview_file = key
+                civitai_info = civitai_infos.get(f"{model_path}.civitai.info", {}) if info_stat is not None else {}
+                entry = {"search_words": _search_words(name, alias, civitai_info), "preview_file": preview_file}
+            entries[lora_obj.filename] = (key, entry)
+            lora_model[lora_obj.alias] = entry
+        self.entries = entries
+        return lora_model
+
+
+def _list_directory(directory: str) -> Dict[str, os.DirEntry]:
+    try:
+        with os.scandir(directory) as it:
+            return {os.path.normcase(entry.name): entry for entry in it}
+    except OSError:
+        return {}
+
+
+def _stat(entry: os.DirEntry) -> Optional[Tuple[float, int]]:
+    try:
+        stat = entry.stat()
+        return stat.st_mtime, stat.st_size
+    except OSError:
+        return None
+
+
+def _find_preview_file(model_path: str, listing: Dict[str, os.DirEntry]) -> str:
+    if model_path:
+        base_name = os.path.basename(model_path)
+        for ext in ALLOWED_PREVIEW_EXTENSIONS:
+            for suffix in [f".{ext}", f".preview.{ext}"]:
+                if os.path.normcase(f"{base_name}{suffix}") in listing:
+                    quoted_filename = urllib.parse.quote(f"{model_path}{suffix}".replace('\\', '/'))
+                    return f"./sd_extra_networks/thumb?filename={quoted_filename}"
+    return NO_PREVIEW_FILE
+
+
+def _load_civitai_infos(cursor: sqlite3.Cursor, info_stats: Dict[str, Tuple[float, int]], executor: ThreadPoolExecutor) -> Dict[str, Dict[str, Any]]:
+    """
+    Return the cached civitai fields for each path, reading (in parallel) and caching the files whose mtime or size changed.
+    """
+    infos = {}
+    misses = []
+    for path, (mtime, size) in info_stats.items():
+        cursor.execute("SELECT mtime, size, info FROM tlora_info WHERE path = ?", (path,))
+        row = cursor.fetchone()
+        if row is not None and row[0] == mtime and row[1] == size:
+            infos[path] = json.loads(row[2])
+        else:
+            misses.append(path)
+
+    for path, info in zip(misses, executor.map(_read_civitai_info, misses)):
+        infos[path] = info
+    cursor.executemany(
+        "INSERT OR REPLACE INTO tlora_info(path, mtime, size, info) VALUES (?, ?, ?, ?)",
+        [(path, *info_stats[path], json.dumps(infos[path])) for path in misses]
+    )
+    return infos
+
+
+def _read_civitai_info(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            civitai_info = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(civitai_info, dict):
+        return {}
+    return {"baseModel": civitai_info.get("baseModel", None), "trainedWords": civitai_info.get("trainedWords") or []}
+
+
+def _search_words(name: str, alias: str, civitai_info: Dict[str, Any]) -> List[str]:
+    lora_name_lower = name.lower().replace("_", " ")
+    lora_alias_lower = alias.lower().replace("_", " ")
+    base_model = civitai_info.get("baseModel", None)
+    trigger_words = civitai_info.get("trainedWords", [])
+
+    search_words = [lora_name_lower]
+    if lora_name_lower != lora_alias_lower:
+        search_words.append(lora_alias_lower)
+    if base_model:
+        search_words.append(base_model.lower().strip())
+    if len(trigger_words) > 0:
+        trigger_words = ",".join(trigger_words).split(",")
+        for trigger_word in [w.lower().strip() for w in trigger_words]:
+            if trigger_word != "":
+                search_words.append(trigger_word)
+    return search_words
@@ -1,29 +1,37 @@
-import functools
 import gzip
-from itertools import repeat
+import threading
 import json
 import os
 import sqlite3
-from typing import Any, List, Tuple, Dict
+from typing import Any, List, Optional, Tuple, Dict
 import gradio as gr
 import importlib
 import asyncio
-from fastapi import FastAPI
-from heapq import nlargest
-import piexif
-import piexif.helper
-from PIL import Image, UnidentifiedImageError
+from fastapi import FastAPI, Query
 from pathlib import Path
 from tqdm import tqdm
-from collections import defaultdict, Counter
+from collections import Counter
 from concurrent.futures import ThreadPoolExecutor, Future
-import urllib
+import numpy as np
 import polars as pl
-import subprocess
+import heapq
+from itertools import repeat
+from operator import itemgetter
 from modules.options import OptionHTML
 from contextlib import suppress
 from modules import script_callbacks, shared, ui_components
+import scripts.model_format as model_format
 import scripts.parser as parser
+from scripts.cooccurrence import Cooccurrence, WHOLE_PROMPT
+import scripts.retention as retention
+import scripts.scanner as scanner
+import scripts.tag_repository as tag_repository
+from scripts.ingest import IngestPool
+from scripts.metadata import EXTENSIONS, extract_prompt
+from scripts.lora_index import LoraIndex
+from scripts.model_store import MODEL_NAMES, ModelStore
+from scripts.stats import Stats
+import scripts.tag_dictionary as tag_dictionary
 from scripts.database import DBManager
 
 EXTENSION_ID = "prompt_pilot"
@@ -31,11 +39,6 @@ EXTENSION_NAME = "Prompt Pilot"
 API_PREFIX = f"/{EXTENSION_ID}/v1"
 TAGS_REPOSITORY = "https://github.com/nihedon/prompt-tags.git"
 
-PNG = ".png"
-WEBP = ".webp"
-EXTENSIONS = [PNG, WEBP]
-ALLOWED_PREVIEW_EXTENSIONS = ["jpg", "jpeg", "png", "webp", "gif"]
-
 analysis_directory_choices = [
     "<samples>",
     "<txt2img_samples>",
@@ -48,11 +51,29 @@ tag_source_default = "danbooru.donmai.us"
 analysis_directory_default = ["<save>"]
 analysis_image_count_default = 2000
 low_frequency_threshold_per_default = 1
+ingest_workers_default = 0
+tag_sync_timeout_default = 60
+suggest_window_default = 1
+suggest_max_neighbours_default = 50
+suggest_min_count_default = 1
+cache_retention_margin_default = 1000
+cache_vacuum_threshold_default = 25
+max_results_group_defaults = {"0": 30, "1": 10, "3": 10, "4": 10, "5": 10, "custom": 20}
 always_underscore_tags_default = "score_9, score_8_up, score_8, score_7_up, score_7, score_6_up, score_6, score_5_up, score_5, score_4_up, score_4"
 always_underscore_tags_default += "\nsource_pony, source_furry, source_cartoon, source_anime"
 always_underscore_tags_default += "\nrating_safe, rating_questionable, rating_explicit"
 
 extension_dir = str(Path(__file__).parents[1])
+model_store = ModelStore()
+lora_index = LoraIndex()
+cooccurrence = Cooccurrence()
+build_stats = Stats()
+models_lock = threading.Lock()
+models_future: Future = None
+# version of the models written to models.json.gz, handed out by /version
+written_version = 0
+build_executor = ThreadPoolExecutor(max_workers=1)
+live_executor = ThreadPoolExecutor(max_workers=1)
 
 try:
     from modules_forge import forge_version as _  # noqa: F401
@@ -78,15 +99,193 @@ def create_table() -> None:
         """)
         cursor.execute("CREATE INDEX IF NOT EXISTS tfiles_directory_name ON tfiles(directory, name)")
         cursor.execute("CREATE INDEX IF NOT EXISTS tfiles_directory_timestamp ON tfiles(directory, timestamp DESC);")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ttag_names (
+                id INTEGER PRIMARY KEY,
+                tag TEXT UNIQUE
+            )
+        """)
+        ttags_columns = [row[1] for row in cursor.execute("PRAGMA table_info(ttags)")]
+        if "tag" in ttags_columns:
+            cursor.execute("ALTER TABLE ttags RENAME TO ttags_text")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS ttags (
-                id INTEGER,
-                tag TEXT,
-                tag_order INTEGER
+                file_id INTEGER,
+                tag_id INTEGER,
+                tag_order INTEGER,
+                PRIMARY KEY (file_id, tag_order)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ttags_text'")
+        if cursor.fetchone():
+            _migrate_text_tags(cursor)
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(tfiles)")]
+        if "counted" not in columns:
+            cursor.execute("ALTER TABLE tfiles ADD COLUMN counted INTEGER DEFAULT 0")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ttag_counts (
+                tag TEXT PRIMARY KEY,
+                use_count INTEGER
+            ) WITHOUT ROWID
+        """)
+        # neighbour counts are computed from ttags on every build since the co-occurrence engine
+        cursor.execute("DROP TABLE IF EXISTS tsuggest_counts")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tscan_dirs (
+                root TEXT,
+                path TEXT,
+                parent TEXT,
+                mtime REAL,
+                PRIMARY KEY (root, path)
             )
         """)
-        cursor.execute("CREATE INDEX IF NOT EXISTS ttags_tag ON ttags(tag)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS ttags_id_order ON ttags(id, tag_order);")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tscan_files (
+                root TEXT,
+                path TEXT,
+                parent TEXT,
+                timestamp REAL,
+                size INTEGER,
+                PRIMARY KEY (root, path)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS tscan_files_root_parent ON tscan_files(root, parent)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS tscan_files_root_timestamp ON tscan_files(root, timestamp DESC)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tlora_info (
+                path TEXT PRIMARY KEY,
+                mtime REAL,
+                size INTEGER,
+                info TEXT
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tmeta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            ) WITHOUT ROWID
+        """)
+
+
+def _migrate_text_tags(cursor: sqlite3.Cursor) -> None:
+    """
+    Move the rows of the old ttags layout (id, tag TEXT, tag_order) into ttag_names and the integer-keyed ttags.
+    """
+    print(f"{EXTENSION_NAME}: migrating cache.db to integer tag ids")
+    cursor.execute("INSERT OR IGNORE INTO ttag_names(tag) SELECT DISTINCT tag FROM ttags_text")
+    cursor.execute("""
+        INSERT OR IGNORE INTO ttags(file_id, tag_id, tag_order)
+        SELECT o.id, n.id, o.tag_order
+        FROM   ttags_text o
+               INNER JOIN ttag_names n ON o.tag = n.tag
+        """)
+    cursor.execute("DROP TABLE ttags_text")
+    cursor.connection.commit()
+    # give the space of the text rows and their indexes back to the file system
+    cursor.execute("VACUUM")
+
+
+def get_models_future() -> Future:
+    """
+    Return the shared model build. The first call starts it in the background; every later call gets the same future.
+    """
+    global models_future
+    with models_lock:
+        if models_future is None:
+            models_future = build_executor.submit(_build_models)
+        return models_future
+
+
+def _build_models() -> Dict[str, Any]:
+    build_stats.reset()
+    with build_stats.stage("total"):
+        with build_stats.stage("create_table"):
+            create_table()
+        models = init()
+        models["version"] = model_store.reset(models)
+        if _is_server_search():
+            with build_stats.stage("build_search_index"):
+                model_store.build_tag_index()
+        with build_stats.stage("write_models"):
+            output_path = _write_models(models)
+
+    for name in ["tagModels", "suggestionModels", "loraModels"]:
+        build_stats.set(f"{name}_size", len(models[name]))
+    build_stats.set("payload_bytes", os.path.getsize(output_path))
+    if shared.opts.data.get(f'{EXTENSION_ID}_log_stats', False):
+        print(f"{EXTENSION_NAME} stats: {json.dumps(build_stats.snapshot(), separators=(',', ':'))}")
+    if shared.opts.data.get(f'{EXTENSION_ID}_cache_retention_enabled', True):
+        # queued behind the build on the same executor, so it never delays the first models
+        build_executor.submit(_collect_cache_garbage)
+    return models
+
+
+def _collect_cache_garbage() -> None:
+    """
+    Drop the cache rows of images that were deleted or fell far out of the analysis window, then compact cache.db.
+    """
+    db_path = os.path.join(extension_dir, "cache.db")
+    image_count = shared.opts.data.get(f'{EXTENSION_ID}_analysis_image_count', analysis_image_count_default)
+    margin = shared.opts.data.get(f'{EXTENSION_ID}_cache_retention_margin', cache_retention_margin_default)
+    threshold = shared.opts.data.get(f'{EXTENSION_ID}_cache_vacuum_threshold', cache_vacuum_threshold_default)
+    directories = [(directory, str(img_dir.absolute())) for directory, img_dir in _get_analysis_directories()]
+    try:
+        result = retention.collect(db_path, directories, image_count + int(margin) if image_count >= 0 else -1, threshold / 100)
+        with DBManager(db_path) as conn:
+            conn.execute("INSERT OR REPLACE INTO tmeta(key, value) VALUES ('retention', ?)", (json.dumps(result),))
+    except sqlite3.Error as e:
+        print(f"{EXTENSION_NAME}: cache cleanup failed: {e}")
+        return
+    print(f"{EXTENSION_NAME}: {_format_retention(result)}")
+
+
+def _load_retention_result() -> Optional[Dict[str, Any]]:
+    db_path = os.path.join(extension_dir, "cache.db")
+    try:
+        with DBManager(db_path) as conn:
+            row = conn.execute("SELECT value FROM tmeta WHERE key = 'retention'").fetchone()
+    except sqlite3.Error:
+        return None
+    return json.loads(row[0]) if row else None
+
+
+def _format_retention(result: Optional[Dict[str, Any]]) -> str:
+    if result is None:
+        return "The cache has not been cleaned up yet."
+    return (
+        f"cache cleanup removed {result['removed_files']} files and {result['removed_tag_names']} tag names, "
+        f"vacuum: {result['vacuum']}, {result['db_bytes_before'] / 2**20:.1f} MB -> {result['db_bytes_after'] / 2**20:.1f} MB "
+        f"in {result['seconds']:.1f}s"
+    )
+
+
+def _write_models(models: Dict[str, Any]) -> str:
+    global written_version
+    output_path = os.path.join(extension_dir, "models.json.gz")
+    with gzip.open(output_path, "wt", encoding="utf-8") as f:
+        json.dump(model_format.encode(_client_models(models)), f, ensure_ascii=True, separators=(',', ':'))
+    written_version = models.get("version", 0)
+    return output_path
+
+
+def _is_server_search() -> bool:
+    return shared.opts.data.get(f'{EXTENSION_ID}_server_search', False)
+
+
+def _client_models(models: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    In server search mode the browser only needs the tags the user has actually used
+    (for suggestions and delimiters); the dictionary itself is searched through /search.
+    A delta also removes the tags that are no longer used, which the browser may still hold.
+    """
+    if not _is_server_search():
+        return models
+    tag_models = {tag: data for tag, data in models["tagModels"].items() if data["use_count"] > 0}
+    client_models = {**models, "tagModels": tag_models}
+    if "removed" in models and not models["full"]:
+        unused_tags = [tag for tag in models["tagModels"] if tag not in tag_models]
+        client_models["removed"] = {**models["removed"], "tagModels": models["removed"]["tagModels"] + unused_tags}
+    return client_models
 
 
 def init() -> Dict[str, Any]:
@@ -97,7 +296,10 @@ def init() -> Dict[str, Any]:
         cursor.execute("PRAGMA journal_mode = WAL;")
         cursor.execute("PRAGMA temp_store = MEMORY;")
         cursor.execute("PRAGMA cache_size = -200000;")
-        tag_models, suggestion_models = _build_tag_models(cursor)
+        with build_stats.stage("build_tag_models"):
+            tag_models, suggestion_models = _build_tag_models(cursor)
+    # after the tag transaction is committed, since the LoRA build writes to cache.db on its own connection
+    with build_stats.stage("build_lora_models"):
         lora_models = _build_lora_models()
 
     return {
@@ -107,52 +309,47 @@ def init() -> Dict[str, Any]:
     }
 
 
-def _load_tag_data_from_csv_file() -> Tuple[Dict]:
-    all_tags = {}
-    tag_source = shared.opts.data.get(f'{EXTENSION_ID}_tag_source', tag_source_default)
-
-    tags_csv_path = os.path.join(extension_dir, "tags", tag_source, "tags.csv")
-    if os.path.exists(tags_csv_path):
-        df = pl.read_csv(tags_csv_path, columns=["name", "category", "post_count"])
-        for row in df.rows():
-            tag = row[0].replace("_", " ")
-            post_count = int(row[2])
-            all_tags[tag] = {
-                "post_count": post_count,
-                "category": int(row[1]),
-                "aliases": []
-            }
-
-        aliases_csv_path = os.path.join(extension_dir, "tags", tag_source, "tag_aliases.csv")
-        if os.path.exists(aliases_csv_path):
-            df = pl.read_csv(aliases_csv_path, columns=["antecedent_name", "consequent_name"])
-            for row in df.rows():
-                antecedent_name = row[0].replace("_", " ")
-                consequent_name = row[1].replace("_", " ")
-                if consequent_name in all_tags:
-                    all_tags[consequent_name]["aliases"].append(antecedent_name)
-
-    return all_tags
-
-
 def _build_tag_models(cursor: sqlite3.Cursor) -> Tuple[Dict, Dict]:
-    suggest_counter = defaultdict(Counter)
-    tag_counter = Counter()
+    tag_counter = {}
+    suggest_counter = {}
 
     if shared.opts.data.get(f'{EXTENSION_ID}_suggest_enabled', True):
-        process_ai_illust_files(cursor, tag_counter, suggest_counter)
+        with build_stats.stage("process_files"):
+            process_ai_illust_files(cursor)
+        with build_stats.stage("fetch_tag_counts"):
+            tag_counter, suggest_counter = _fetch_tag_counts(cursor)
 
-    tag_counter, suggest_counter = remove_low_count_tags(tag_counter, suggest_counter)
+    tag_source = shared.opts.data.get(f'{EXTENSION_ID}_tag_source', tag_source_default)
+    with build_stats.stage("load_dictionary"):
+        tag_frame = tag_dictionary.load(os.path.join(extension_dir, "tags", tag_source), os.path.join(extension_dir, "tags_cache"))
+    if tag_frame is None:
+        tag_frame = pl.DataFrame(schema={"tag": pl.Utf8, "category": pl.Int64, "post_count": pl.Int64, "aliases": pl.List(pl.Utf8)})
 
-    tag_model = _load_tag_data_from_csv_file()
+    use_counts = {tag.replace("_", " "): use_count for tag, use_count in tag_counter.items()}
+    known_tags = set(tag_frame.filter(pl.col("tag").is_in(pl.Series(list(use_counts), dtype=pl.Utf8))).get_column("tag").to_list())
     alias_to_tag = {}
-    for k, v in tag_model.items():
-        for alias in v["aliases"]:
-            alias_to_tag.setdefault(alias, []).append(k)
-        v["use_count"] = 0
+    alias_rows = (
+        tag_frame.select("tag", "aliases")
+        .explode("aliases")
+        .filter(pl.col("aliases").is_in(pl.Series([tag for tag in use_counts if tag not in known_tags], dtype=pl.Utf8)))
+    )
+    for tag, alias in alias_rows.iter_rows():
+        alias_to_tag.setdefault(alias, []).append(tag)
+
+    used_tags = known_tags.union(*alias_to_tag.values())
+    post_count_threshold = shared.opts.data.get(f"{EXTENSION_ID}_post_count_threshold", post_count_threshold_default)
+    tag_frame = tag_frame.filter((pl.col("post_count") >= post_count_threshold) | pl.col("tag").is_in(pl.Series(list(used_tags), dtype=pl.Utf8)))
+
+    tag_model = {}
+    for tag, category, post_count, aliases in zip(*(tag_frame.get_column(name).to_list() for name in ["tag", "category", "post_count", "aliases"])):
+        tag_model[tag] = {
+            "post_count": post_count,
+            "category": category,
+            "aliases": aliases or [],
+            "use_count": 0
+        }
 
-    for tag, use_count in tag_counter.items():
-        tag = tag.replace("_", " ")
+    for tag, use_count in use_counts.items():
         if tag in tag_model:
             tag_model[tag]["use_count"] = use_count
         elif tag in alias_to_tag:
@@ -166,20 +363,113 @@ def _build_tag_models(cursor: sqlite3.Cursor) -> Tuple[Dict, Dict]:
                 "aliases": []
             }
 
-    post_count_threshold = shared.opts.data.get(f"{EXTENSION_ID}_post_count_threshold", post_count_threshold_default)
-    for tag in list(tag_model.keys()):
-        data = tag_model[tag]
-        if data["post_count"] < post_count_threshold and data["use_count"] == 0:
-            del tag_model[tag]
+    return tag_model, suggest_counter
 
-    suggest_model = {tag: dict(nexts) for tag, nexts in suggest_counter.items()}
 
-    return tag_model, suggest_model
+def process_ai_illust_files(cursor: sqlite3.Cursor) -> None:
+    """
+    Bring ttag_counts in line with the newest images of the analysis directories.
+
+    The directories are walked concurrently, so a slow one (e.g. a network share) no longer adds its time to the others.
+    The newest `analysis_image_count` images over all directories form the analysis window; only files that entered or
+    left it since the last run are added to or subtracted from the counts.
+    """
+    workers = shared.opts.data.get(f'{EXTENSION_ID}_ingest_workers', ingest_workers_default)
+    use_processes = shared.opts.data.get(f'{EXTENSION_ID}_ingest_use_processes', False)
+    image_count = shared.opts.data.get(f'{EXTENSION_ID}_analysis_image_count', analysis_image_count_default)
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS twindow (id INTEGER PRIMARY KEY)")
+    cursor.execute("DELETE FROM twindow")
+
+    directories = [(directory, str(img_dir.absolute())) for directory, img_dir in _get_analysis_directories()]
+    window_by_directory: Dict[Tuple[str, str], List[Tuple[str, float]]] = {key: [] for key in directories}
+    for directory, root, file, timestamp in _get_window_files(cursor, directories, image_count):
+        window_by_directory[(directory, root)].append((file, timestamp))
+
+    uncached_files: List[Tuple[str, str, str, float]] = []
+    window_ids: List[int] = []
+    entered_ids: List[int] = []
+    for (directory, root), window in window_by_directory.items():
+        _lookup_window_files(directory, root, window, cursor, uncached_files, window_ids, entered_ids)
+    # newest first over all directories, so reads from a slow and a fast directory overlap in the pool
+    uncached_files.sort(key=itemgetter(3), reverse=True)
+
+    entered_tags = list(_fetch_tags_by_ids(cursor, entered_ids).values()) if entered_ids else []
+    with IngestPool(workers, use_processes) as pool:
+        insert_tags_data: List[Tuple[int, str, int]] = []
+        results = pool.imap(file for file, __, __, __ in uncached_files)
+        for (file, directory, name, timestamp), (__, tags, error) in tqdm(zip(uncached_files, results), desc=f"{EXTENSION_NAME}", total=len(uncached_files)):
+            if error is not None:
+                build_stats.count("parse_errors")
+                print(f"Error parsing prompt for {file}: {error}")
+                continue
 
+            # files without tags are recorded too, so they are not read again on the next start
+            cursor.execute(
+                "INSERT INTO tfiles(directory, name, timestamp, counted) VALUES (?, ?, ?, 0)",
+                (directory, name, timestamp)
+            )
+            file_id = cursor.lastrowid
+            window_ids.append(file_id)
+            entered_ids.append(file_id)
+            entered_tags.append(tags)
+            insert_tags_data.extend((file_id, tag, i) for i, tag in enumerate(tags, 1))
+            if len(insert_tags_data) >= 10000:
+                _insert_tags(cursor, insert_tags_data)
+                insert_tags_data.clear()
+
+        if insert_tags_data:
+            _insert_tags(cursor, insert_tags_data)
+
+    cursor.executemany("INSERT OR IGNORE INTO twindow(id) VALUES (?)", [(file_id,) for file_id in window_ids])
+    build_stats.count("files_entered_window", len(entered_ids))
+    if entered_ids:
+        _update_tag_counts(cursor, entered_tags, 1)
+        cursor.executemany("UPDATE tfiles SET counted = 1 WHERE id = ?", [(file_id,) for file_id in entered_ids])
+
+    cursor.execute("SELECT id FROM tfiles WHERE counted = 1 AND id NOT IN (SELECT id FROM twindow)")
+    left_ids = [row[0] for row in cursor.fetchall()]
+    build_stats.count("files_left_window", len(left_ids))
+    if left_ids:
+        _update_tag_counts(cursor, _fetch_tags_by_ids(cursor, left_ids).values(), -1)
+        cursor.executemany("UPDATE tfiles SET counted = 0 WHERE id = ?", [(file_id,) for file_id in left_ids])
+
+
+def _get_window_files(cursor: sqlite3.Cursor, directories: List[Tuple[str, str]], image_count: int) -> List[Tuple[str, str, str, float]]:
+    """
+    Scan every analysis directory and return (directory, root, file, timestamp) of the newest `image_count` images
+    over all of them, newest first.
 
-def process_ai_illust_files(cursor: sqlite3.Cursor, tag_counter, suggest_counter) -> None:
+    Each root is walked in its own thread on state loaded from tscan_*; only the loading and writing back of the scan
+    index use the cursor. Files of directories the walk skipped keep the timestamps stored in tscan_files, so the
+    files are only stat-ed where a directory changed.
+    """
+    states = {root: scanner.ScanState(cursor, root) for __, root in directories}
+    with build_stats.stage("scan"):
+        with ThreadPoolExecutor(max_workers=max(len(states), 1)) as executor:
+            newest_by_root = dict(zip(states, executor.map(_scan_directory, states.values(), repeat(image_count))))
+    for state in states.values():
+        scanner.apply(cursor, state)
+        build_stats.count("files_scanned", state.file_count())
+
+    candidates = [
+        (directory, root, file, timestamp)
+        for directory, root in dict.fromkeys(directories)
+        for file, timestamp in newest_by_root[root]
+    ]
+    if image_count < 0:
+        return sorted(candidates, key=itemgetter(3), reverse=True)
+    return heapq.nlargest(image_count, candidates, key=itemgetter(3))
+
+
+def _scan_directory(state: scanner.ScanState, image_count: int) -> List[Tuple[str, float]]:
+    changed_files = scanner.walk(state, EXTENSIONS)
+    build_stats.count("files_changed", len(changed_files))
+    return scanner.newest(state, image_count)
+
+
+def _get_analysis_directories() -> List[Tuple[str, Path]]:
     directories = shared.opts.data.get(f'{EXTENSION_ID}_analysis_directory', analysis_directory_default)
-    files_buffer: List[Tuple[str, float]] = []
+    result = []
     for directory in directories:
         if directory in analysis_directory_choices:
             outdir = shared.opts.data.get(f'outdir_{directory[1:-1]}', "")
@@ -188,254 +478,351 @@ def process_ai_illust_files(cursor: sqlite3.Cursor, tag_counter, suggest_counter
             img_dir = Path(outdir).absolute()
         else:
             img_dir = Path(directory)
+        result.append((directory, img_dir))
+    return result
+
+
+def _lookup_window_files(
+    directory: str,
+    root: str,
+    window: List[Tuple[str, float]],
+    cursor: sqlite3.Cursor,
+    uncached_files: List[Tuple[str, str, str, float]],
+    window_ids: List[int],
+    entered_ids: List[int]
+) -> None:
+    """
+    Look up the (file, timestamp) window files of one analysis directory in tfiles with a single join. Cached files go to
+    `window_ids` (and `entered_ids` when they were not counted yet); files that are new or whose timestamp changed are
+    added to `uncached_files` as (file, directory, name, timestamp).
 
-        for img_file, img_timestamp in tqdm(_get_image_files(img_dir), desc=f"{EXTENSION_NAME}"):
-            files_buffer.append((img_file, img_timestamp))
-            if len(files_buffer) >= 500:
-                _process_ai_illust_files(directory, files_buffer, cursor, tag_counter, suggest_counter)
-                files_buffer.clear()
-
-    if files_buffer:
-        _process_ai_illust_files(directory, files_buffer, cursor, tag_counter, suggest_counter)
-
-
-def _process_ai_illust_files(directory: str, file_list: List[Tuple[str, float]], cursor: sqlite3.Cursor,
-                             tag_counter: Counter, suggest_counter: Dict[str, Counter]) -> None:
-    file_info_map = _fetch_db_tags_for_files(directory, file_list, cursor)
-
-    insert_tags_data = []
-    for filename, file_info in file_info_map.items():
-        if not file_info["tags"]:
-            try:
-                prompt = _get_prompt(file_info["file"])
-                tags = parser.get_tags(prompt)
-            except Exception as e:
-                print(f"Error parsing prompt for {filename}: {e}")
-                tags = []
-
-            if tags:
-                cursor.execute(
-                    "INSERT INTO tfiles(directory, name, timestamp) VALUES (?, ?, ?)",
-                    (directory, filename, file_info["timestamp"])
-                )
-                file_id = cursor.lastrowid
-                for i, tag in enumerate(tags, 1):
-                    insert_tags_data.append((file_id, tag, i))
-                file_info["tags"] = tags
-
-    if insert_tags_data:
-        cursor.executemany(
-            "INSERT INTO ttags(id, tag, tag_order) VALUES (?, ?, ?)",
-            insert_tags_data
-        )
+    Files are keyed by their path relative to the directory, so same-named files in different subfolders stay apart.
+    """
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS tlookup (name TEXT PRIMARY KEY, file TEXT, timestamp REAL)")
+    cursor.execute("DELETE FROM tlookup")
+    cursor.executemany(
+        "INSERT OR REPLACE INTO tlookup(name, file, timestamp) VALUES (?, ?, ?)",
+        [(scanner.relative_name(file, root), file, timestamp) for file, timestamp in window]
+    )
+    cursor.execute("""
+        SELECT l.name, l.file, l.timestamp, f.id, f.timestamp, f.counted
+        FROM   tlookup l
+               LEFT JOIN tfiles f ON f.directory = ? AND f.name = l.name
+        """, (directory,))
+    rows_by_name: Dict[str, List[Tuple]] = {}
+    for row in cursor.fetchall():
+        rows_by_name.setdefault(row[0], []).append(row)
+
+    stale_rows: List[Tuple[int, int]] = []
+    misses = 0
+    for name, rows in rows_by_name.items():
+        __, file, timestamp = rows[0][:3]
+        current = next((row for row in rows if row[3] is not None and row[4] == timestamp), None)
+        stale_rows.extend((row[3], row[5]) for row in rows if row[3] is not None and row is not current)
+        if current is None:
+            uncached_files.append((file, directory, name, timestamp))
+            misses += 1
+        else:
+            window_ids.append(current[3])
+            if not current[5]:
+                entered_ids.append(current[3])
 
-    for file_info in file_info_map.values():
-        tags = file_info["tags"]
-        if tags:
-            tag_counter.update(tags)
-            for i, tag in enumerate(tags):
-                if i > 0:
-                    prev_word = tags[i - 1]
-                    suggest_counter[tag][prev_word] += 1
-                if i < len(tags) - 1:
-                    next_word = tags[i + 1]
-                    suggest_counter[tag][next_word] += 1
-
-
-def _fetch_db_tags_for_files(directory: str, file_list: List[Tuple[str, float]], cursor: sqlite3.Cursor) -> Dict[str, Dict]:
-    file_dict: Dict[str, Dict] = {}
-    for file, timestamp in file_list:
-        filename_only = os.path.basename(file)
-        file_dict[filename_only] = {
-            "file": file,
-            "timestamp": timestamp,
-            "tags": []
-        }
+    build_stats.count("files_in_window", len(rows_by_name))
+    build_stats.count("cache_hits", len(rows_by_name) - misses)
+    build_stats.count("cache_misses", misses)
+    build_stats.count("stale_files", len(stale_rows))
+    if stale_rows:
+        _remove_files(cursor, stale_rows)
 
-    placeholders = ",".join(repeat("?", len(file_dict)))
-    image_count = shared.opts.data.get(f'{EXTENSION_ID}_analysis_image_count', analysis_image_count_default)
-    query = f"""
-            SELECT name, tag
-            FROM ( SELECT id, name, timestamp, directory
-                   FROM   tfiles
-                   WHERE  directory = ?
-                          AND name IN ({placeholders})
-                   LIMIT {image_count}
-                ) f
-                INNER JOIN ttags ON f.id = ttags.id
-            ORDER BY
-                timestamp DESC, directory, name, tag_order
-            """
-    cursor.execute(query, (directory,) + tuple(file_dict.keys()))
-
-    before_name = None
-    tags = []
-    for row in cursor:
-        name = row[0]
-        tag = row[1]
-        if before_name is not None and name != before_name:
-            if before_name in file_dict:
-                file_dict[before_name]["tags"] = tags
-            tags = []
-        tags.append(tag)
-        before_name = name
-    if before_name in file_dict:
-        file_dict[before_name]["tags"] = tags
-
-    return file_dict
-
-
-def remove_low_count_tags(tag_counter, suggest_counter) -> tuple[dict, dict]:
+
+def _remove_files(cursor: sqlite3.Cursor, rows: List[Tuple[int, int]]) -> None:
+    """
+    Delete (file_id, counted) rows from tfiles / ttags, first taking counted files back out of the counts.
+    """
+    counted_ids = [file_id for file_id, counted in rows if counted]
+    if counted_ids:
+        _update_tag_counts(cursor, _fetch_tags_by_ids(cursor, counted_ids).values(), -1)
+    cursor.executemany("DELETE FROM ttags WHERE file_id = ?", [(file_id,) for file_id, __ in rows])
+    cursor.executemany("DELETE FROM tfiles WHERE id = ?", [(file_id,) for file_id, __ in rows])
+
+
+def _fetch_tags_by_ids(cursor: sqlite3.Cursor, file_ids: List[int]) -> Dict[int, List[str]]:
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS tdelta (id INTEGER PRIMARY KEY)")
+    cursor.execute("DELETE FROM tdelta")
+    cursor.executemany("INSERT OR IGNORE INTO tdelta(id) VALUES (?)", [(file_id,) for file_id in file_ids])
+    cursor.execute("""
+        SELECT t.file_id, n.tag
+        FROM   tdelta d
+               INNER JOIN ttags t ON d.id = t.file_id
+               INNER JOIN ttag_names n ON t.tag_id = n.id
+        ORDER  BY t.file_id, t.tag_order
+        """)
+    tags_by_id: Dict[int, List[str]] = {}
+    for file_id, tag in cursor:
+        tags_by_id.setdefault(file_id, []).append(tag)
+    return tags_by_id
+
+
+def _insert_tags(cursor: sqlite3.Cursor, rows: List[Tuple[int, str, int]]) -> None:
+    """
+    Insert (file_id, tag, tag_order) rows into ttags, registering new tags in ttag_names.
+    """
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS tnew_names (tag TEXT PRIMARY KEY)")
+    cursor.execute("DELETE FROM tnew_names")
+    cursor.executemany("INSERT OR IGNORE INTO tnew_names(tag) VALUES (?)", [(tag,) for __, tag, __ in rows])
+    cursor.execute("INSERT OR IGNORE INTO ttag_names(tag) SELECT tag FROM tnew_names")
+    cursor.execute("SELECT n.tag, n.id FROM tnew_names t INNER JOIN ttag_names n ON t.tag = n.tag")
+    tag_ids = dict(cursor.fetchall())
+    cursor.executemany(
+        "INSERT OR REPLACE INTO ttags(file_id, tag_id, tag_order) VALUES (?, ?, ?)",
+        [(file_id, tag_ids[tag], tag_order) for file_id, tag, tag_order in rows]
+    )
+
+
+def _update_tag_counts(cursor: sqlite3.Cursor, tags_list, sign: int) -> None:
+    """
+    Add (sign=1) or subtract (sign=-1) the tags of each file to the use counts.
+    """
+    tag_counter = Counter()
+    for tags in tags_list:
+        tag_counter.update(tags)
+
+    cursor.executemany(
+        """
+        INSERT INTO ttag_counts(tag, use_count) VALUES (?, ?)
+        ON CONFLICT(tag) DO UPDATE SET use_count = use_count + excluded.use_count
+        """,
+        [(tag, count * sign) for tag, count in tag_counter.items()]
+    )
+    if sign < 0:
+        cursor.execute("DELETE FROM ttag_counts WHERE use_count <= 0")
+
+
+def _get_low_frequency_threshold() -> float:
     frequency_threshold_per = shared.opts.data.get(f'{EXTENSION_ID}_low_frequency_threshold_per', low_frequency_threshold_per_default)
     image_count = shared.opts.data.get(f'{EXTENSION_ID}_analysis_image_count', analysis_image_count_default)
+    return image_count * frequency_threshold_per / 100
 
-    threshold = image_count * frequency_threshold_per / 100
 
-    low_tags = {tag for tag, c in tag_counter.items() if c < threshold}
+def _fetch_tag_counts(cursor: sqlite3.Cursor) -> Tuple[Dict[str, int], Dict[str, Dict[str, int]]]:
+    """
+    Read the materialized counts, dropping tags used in less than the configured share of the analyzed images.
+    """
+    threshold = _get_low_frequency_threshold()
 
-    filtered_tag_counter = {t: c for t, c in tag_counter.items() if t not in low_tags}
+    cursor.execute("SELECT tag, use_count FROM ttag_counts WHERE use_count >= ?", (threshold,))
+    tag_counter = dict(cursor.fetchall())
 
-    filtered_suggest = {}
-    for tag, nexts in suggest_counter.items():
-        if tag not in low_tags:
-            new_nexts = {nx_tag: cnt for nx_tag, cnt in nexts.items() if nx_tag not in low_tags}
-            filtered_suggest[tag] = new_nexts
+    with build_stats.stage("cooccurrence"):
+        cursor.execute("""
+            SELECT t.file_id, t.tag_id
+            FROM   tfiles f
+                   INNER JOIN ttags t ON t.file_id = f.id
+            WHERE  f.counted = 1
+            ORDER  BY t.file_id, t.tag_order
+            """)
+        rows = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 2)
+        cooccurrence.window = int(shared.opts.data.get(f'{EXTENSION_ID}_suggest_window', suggest_window_default))
+        cooccurrence.fit(rows[:, 0], rows[:, 1])
+        suggest_counter = _fetch_suggestions(cursor, cooccurrence.tag_ids(threshold), threshold)
+    build_stats.set("suggestion_pairs", sum(len(neighbours) for neighbours in suggest_counter.values()))
+
+    return tag_counter, suggest_counter
+
+
+def _fetch_suggestions(cursor: sqlite3.Cursor, tag_ids: List[int], threshold: float) -> Dict[str, Dict[str, Any]]:
+    """
+    The pruned neighbours of `tag_ids` by tag name, as the suggestion model sends them.
+    """
+    neighbours = cooccurrence.neighbours(
+        tag_ids,
+        min_tag_count=threshold,
+        top_n=int(shared.opts.data.get(f'{EXTENSION_ID}_suggest_max_neighbours', suggest_max_neighbours_default)),
+        min_count=int(shared.opts.data.get(f'{EXTENSION_ID}_suggest_min_count', suggest_min_count_default)),
+        pmi=shared.opts.data.get(f'{EXTENSION_ID}_suggest_normalization', "count") == "pmi"
+    )
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS tname_ids (id INTEGER PRIMARY KEY)")
+    cursor.execute("DELETE FROM tname_ids")
+    name_ids = set(neighbours)
+    for row in neighbours.values():
+        name_ids.update(row)
+    cursor.executemany("INSERT INTO tname_ids(id) VALUES (?)", [(tag_id,) for tag_id in name_ids])
+    cursor.execute("SELECT n.id, n.tag FROM tname_ids i INNER JOIN ttag_names n ON n.id = i.id")
+    names = dict(cursor.fetchall())
+    return {names[tag_id]: {names[neighbour]: score for neighbour, score in row.items()} for tag_id, row in neighbours.items()}
+
+
+def on_image_saved(params: script_callbacks.ImageSaveParams) -> None:
+    if not shared.opts.data.get(f'{EXTENSION_ID}_enabled', True) or not shared.opts.data.get(f'{EXTENSION_ID}_suggest_enabled', True):
+        return
+    parameters = (params.pnginfo or {}).get("parameters")
+    if not parameters or not params.filename:
+        return
+    live_executor.submit(_ingest_saved_image, os.path.abspath(params.filename), parameters)
+
+
+def _ingest_saved_image(file: str, parameters: str) -> None:
+    """
+    Add a freshly generated image to cache.db and apply the resulting changes to model_store.
+    """
+    get_models_future().result()
 
-    return filtered_tag_counter, filtered_suggest
+    directory = None
+    for analysis_directory, img_dir in _get_analysis_directories():
+        if Path(file).is_relative_to(img_dir.absolute()):
+            directory = analysis_directory
+            name = scanner.relative_name(file, str(img_dir.absolute()))
+            break
+    if directory is None:
+        return
 
+    try:
+        prompt = extract_prompt(parameters)
+        tags = parser.get_tags(prompt) if prompt is not None else []
+    except Exception as e:
+        build_stats.count("live_parse_errors")
+        print(f"Error parsing prompt for {file}: {e}")
+        return
+    if not tags:
+        return
 
-def _build_lora_models() -> Dict:
-    lora_model = {}
-    global network_lora
-    for lora_obj in network_lora.available_networks.values():
-        model_path, __ = os.path.splitext(lora_obj.filename)
-        lora_name_lower = lora_obj.name.lower().replace("_", " ")
-        lora_alias_lower = lora_obj.alias.lower().replace("_", " ")
-
-        civitai_info = _find_civitai_info(model_path)
-        base_model = civitai_info.get("baseModel", None)
-        trigger_words = civitai_info.get("trainedWords", [])
-
-        preview_file = _find_preview_file(model_path)
-
-        search_words = [lora_name_lower]
-        if lora_name_lower != lora_alias_lower:
-            search_words.append(lora_alias_lower)
-        if base_model:
-            search_words.append(base_model.lower().strip())
-        if len(trigger_words) > 0:
-            trigger_words = ",".join(trigger_words).split(",")
-            for trigger_word in [w.lower().strip() for w in trigger_words]:
-                if trigger_word != "":
-                    search_words.append(trigger_word)
-
-        lora_model[lora_obj.alias] = {'search_words': search_words, 'preview_file': preview_file}
-    return lora_model
-
-
-@functools.cache
-def _find_civitai_info(path) -> dict[str, Any]:
-    if path:
-        civitai_info = f"{path}.civitai.info"
-        if os.path.exists(civitai_info):
-            try:
-                with open(civitai_info, "r", encoding="utf-8", errors="replace") as f:
-                    return json.load(f)
-            except OSError:
-                pass
-    return {}
-
-
-def _find_preview_file(path) -> str:
-    if path:
-        potential_files = sum([[f"{path}.{ext}", f"{path}.preview.{ext}"] for ext in ALLOWED_PREVIEW_EXTENSIONS], [])
-        for file in potential_files:
-            if os.path.exists(file):
-                quoted_filename = urllib.parse.quote(file.replace('\\', '/'))
-                return f"./sd_extra_networks/thumb?filename={quoted_filename}"
-    return "./file=html/card-no-preview.png"
-
-
-def _get_image_files(directory: Path) -> List[Tuple[str, float]]:
-    files = []
-    for root, __, filenames in os.walk(directory):
-        for filename in filenames:
-            ext = "." + filename.split(".")[-1].lower()
-            filepath = os.path.join(root, filename)
-            if ext in EXTENSIONS:
-                files.append((filepath, os.path.getmtime(filepath)))
-    image_count = shared.opts.data.get(f'{EXTENSION_ID}_analysis_image_count', analysis_image_count_default)
-    return nlargest(image_count, files, key=lambda x: x[1])
+    db_path = os.path.join(extension_dir, "cache.db")
+    with DBManager(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM tfiles WHERE directory = ? AND name = ?", (directory, name))
+        if cursor.fetchone():
+            return
+        cursor.execute(
+            "INSERT INTO tfiles(directory, name, timestamp, counted) VALUES (?, ?, ?, 1)",
+            (directory, name, os.path.getmtime(file))
+        )
+        file_id = cursor.lastrowid
+        _insert_tags(cursor, [(file_id, tag, i) for i, tag in enumerate(tags, 1)])
+        _update_tag_counts(cursor, [tags], 1)
+        cursor.execute("SELECT tag_id FROM ttags WHERE file_id = ? ORDER BY tag_order", (file_id,))
+        cooccurrence.add([row[0] for row in cursor.fetchall()])
+        tag_updates, suggestion_updates = _collect_live_updates(cursor, tags)
 
+    model_store.update("tagModels", tag_updates)
+    model_store.update("suggestionModels", suggestion_updates)
+    build_stats.count("live_images")
 
-def _get_prompt(file: str) -> str:
-    try:
-        with Image.open(file) as image:
-            img_info = image.info
-    except (FileNotFoundError, UnidentifiedImageError) as e:
-        print(f"Error opening image {file}: {e}")
-        return None
 
-    if not img_info:
-        return None
+def _collect_live_updates(cursor: sqlite3.Cursor, tags: List[str]) -> Tuple[Dict, Dict]:
+    """
+    Work out which tag and suggestion entries change after the counts of `tags` were increased,
+    following the same rules as _build_tag_models.
+    """
+    threshold = _get_low_frequency_threshold()
+    tag_models = model_store.models["tagModels"]
+    tag_updates = {}
+    suggested_tags = []
+    for tag, count in Counter(tags).items():
+        cursor.execute("SELECT use_count FROM ttag_counts WHERE tag = ?", (tag,))
+        new_count = cursor.fetchone()[0]
+        old_count = new_count - count
+        delta = (new_count if new_count >= threshold else 0) - (old_count if old_count >= threshold else 0)
+        if delta == 0:
+            continue
+
+        name = tag.replace("_", " ")
+        if name in tag_models:
+            targets = [name]
+        else:
+            targets = [consequent for consequent in model_store.consequents(name) if consequent in tag_models]
+            if not targets and not model_store.consequents(name):
+                tag_updates[name] = {
+                    "post_count": 0,
+                    "use_count": 0,
+                    "category": "custom",
+                    "aliases": []
+                }
+                targets = [name]
+        for target in targets:
+            entry = dict(tag_updates.get(target) or tag_models[target])
+            entry["use_count"] += delta
+            tag_updates[target] = entry
+
+        if new_count >= threshold:
+            suggested_tags.append(tag)
+
+    cursor.execute(f"SELECT id FROM ttag_names WHERE tag IN ({','.join('?' * len(suggested_tags))})", suggested_tags)
+    suggestion_updates = _fetch_suggestions(cursor, [row[0] for row in cursor.fetchall()], threshold)
+    return tag_updates, suggestion_updates
 
-    metadata = ""
-    ext = "." + file.split(".")[-1].lower()
-    if ext == WEBP:
-        if "exif" not in img_info:
-            return None
-        try:
-            uc_byte = piexif.load(img_info["exif"]).get("Exif", {}).get(piexif.ExifIFD.UserComment, None)
-        except Exception as e:
-            print(f"Error reading EXIF data from {file}: {e}")
-            return None
-        if uc_byte is None:
-            return None
-        metadata = piexif.helper.UserComment.load(uc_byte)
-    elif ext == PNG:
-        for key, value in img_info.items():
-            if key == 'parameters':
-                # WebUI
-                metadata += f"{value}\n"
-            else:
-                # NAI
-                metadata += f"{key}: {value}\n"
-        metadata = metadata.rstrip()
-
-    prompts = metadata.split("Steps:")
-    if len(prompts) <= 1:
-        return None
-    prompts = prompts[0]
-    parts = prompts.split("Negative prompt:")
-    if len(parts) <= 1:
-        return None
-    return parts[0]
+
+def _build_lora_models() -> Dict:
+    global network_lora
+    db_path = os.path.join(extension_dir, "cache.db")
+    with DBManager(db_path) as conn:
+        return lora_index.build(conn.cursor(), network_lora.available_networks.values())
 
 
 def on_app_started(__: gr.Blocks, app: FastAPI) -> None:
     enabled = shared.opts.data.get(f'{EXTENSION_ID}_enabled', True)
-    if enabled:
-        executor = ThreadPoolExecutor()
-        future: Future = executor.submit(init)
 
     @app.post(f"{API_PREFIX}/init")
     async def api_init() -> Any:
         if enabled:
-            return await asyncio.to_thread(future.result)
+            await asyncio.wrap_future(get_models_future())
+            # a copy taken under the store lock; the stored models keep changing with live updates
+            return _client_models(model_store.get_since(0))
         else:
             return {"tagSuggestModel": {}, "tagAcModel": {}, "loraAcModel": {}}
 
+    @app.get(f"{API_PREFIX}/version")
+    async def api_version() -> Any:
+        if enabled:
+            await asyncio.wrap_future(get_models_future())
+            return {"version": written_version}
+        else:
+            return {"version": 0}
+
+    @app.get(f"{API_PREFIX}/models")
+    async def api_models(since: int = 0) -> Any:
+        if enabled:
+            await asyncio.wrap_future(get_models_future())
+            return _client_models(model_store.get_since(since))
+        else:
+            return _empty_delta()
+
+    @app.get(f"{API_PREFIX}/stats")
+    async def api_stats() -> Any:
+        return {**build_stats.snapshot(), "retention": await asyncio.to_thread(_load_retention_result)}
+
     @app.post(f"{API_PREFIX}/refresh")
-    async def api_refresh() -> Any:
+    async def api_refresh(since: int = 0) -> Any:
         if enabled:
-            lora_models = _build_lora_models()
-            return {
-                "suggestionModels": None,
-                "tagModels": None,
-                "loraModels": lora_models
+            await asyncio.wrap_future(get_models_future())
+            lora_models = await asyncio.to_thread(_build_lora_models)
+            model_store.replace("loraModels", lora_models)
+            return _client_models(model_store.get_since(since))
+        else:
+            return _empty_delta()
+
+    @app.get(f"{API_PREFIX}/search")
+    async def api_search(q: str, priority: List[str] = Query([])) -> Any:
+        if enabled:
+            await asyncio.wrap_future(get_models_future())
+            limits = {
+                key: int(shared.opts.data.get(f'{EXTENSION_ID}_max_results_group{key}', default))
+                for key, default in max_results_group_defaults.items()
             }
+            items = await asyncio.to_thread(model_store.search_tags, q, priority, limits)
+            return {"items": items}
         else:
-            return {"tagSuggestModel": {}, "tagAcModel": {}, "loraAcModel": {}}
+            return {"items": []}
+
+
+def _empty_delta() -> Dict[str, Any]:
+    return {
+        "version": 0,
+        "full": False,
+        "suggestionModels": {},
+        "tagModels": {},
+        "loraModels": {},
+        "removed": {"suggestionModels": [], "tagModels": [], "loraModels": []}
+    }
 
 
 def on_ui_settings() -> None:
@@ -448,10 +835,19 @@ def on_ui_settings() -> None:
     opts[f"{EXTENSION_ID}_enabled"] = shared.OptionInfo(True, "Enabled").needs_reload_ui()
 
     opts[f"{EXTENSION_ID}_tag_source"] = \
-        shared.OptionInfo(tag_source_default, "Source for tag autocompletion", gr.Dropdown, {"choices": tag_sources}).needs_reload_ui()
+        shared.OptionInfo(tag_source_default, "Source for tag autocompletion", gr.Dropdown, lambda: {"choices": _list_tag_sources()}).needs_reload_ui()
+
+    opts[f"{EXTENSION_ID}_tag_sync_timeout"] = \
+        shared.OptionInfo(tag_sync_timeout_default, "Timeout in seconds for updating the tag dictionary from its repository",
+                          gr.Slider, {"minimum": 0, "maximum": 600, "step": 10})\
+        .info("Runs in the background at startup; 0 = never update").needs_reload_ui()
 
     opts[f"{EXTENSION_ID}_suggest_enabled"] = shared.OptionInfo(True, "Enable tag suggestion").needs_reload_ui()
 
+    opts[f"{EXTENSION_ID}_server_search"] = \
+        shared.OptionInfo(False, "Search tags on the server instead of in the browser")\
+        .info("The tag dictionary is no longer sent to each browser tab; useful for thin clients and shared WebUIs").needs_reload_ui()
+
     opts[f"{EXTENSION_ID}_max_results_group0"] = \
         shared.OptionInfo(30, "Maximum results (General tag)", gr.Slider, maximumLimitSliderOpts)\
         .info("-1 = unlimited")
@@ -481,7 +877,7 @@ def on_ui_settings() -> None:
     opts[f"{EXTENSION_ID}_post_count_threshold"] = \
         shared.OptionInfo(post_count_threshold_default, "Threshold for post count", gr.Slider, {"minimum": 0, "maximum": 1000, "step": 1}).needs_reload_ui()
 
-    for tag_source in tag_sources:
+    for tag_source in _list_tag_sources():
         replaced_tag_source = tag_source.replace(".", "_")
         opts[f"{EXTENSION_ID}_group_{replaced_tag_source}"] = OptionHTML(
             f"""<div style='font-size: var(--text-xl); font-weight: var(--prose-header-text-weight);'>{tag_source}</div>
@@ -507,43 +903,100 @@ def on_ui_settings() -> None:
                           ui_components.DropdownMulti, {"choices": analysis_directory_choices}).needs_reload_ui()
     opts[f"{EXTENSION_ID}_analysis_image_count"] = \
         shared.OptionInfo(analysis_image_count_default, "Number of images to analyze for suggestions",
-                          gr.Slider, {"minimum": -1, "maximum": 100000, "step": 1}).info("-1 = unlimited").needs_reload_ui()
+                          gr.Slider, {"minimum": -1, "maximum": 100000, "step": 1})\
+        .info("-1 = unlimited; the newest images over all analysis directories").needs_reload_ui()
     opts[f"{EXTENSION_ID}_low_frequency_threshold_per"] = \
         shared.OptionInfo(low_frequency_threshold_per_default, "Threshold(percentage) for discarding low-frequency tags",
                           gr.Slider, {"minimum": 0, "maximum": 99, "step": 1}).needs_reload_ui()
+    opts[f"{EXTENSION_ID}_suggest_window"] = \
+        shared.OptionInfo(suggest_window_default, "Distance between tags that count as neighbours for suggestions",
+                          gr.Slider, {"minimum": WHOLE_PROMPT, "maximum": 10, "step": 1})\
+        .info("1 = adjacent tags only; 0 = any two tags of the same prompt").needs_reload_ui()
+    opts[f"{EXTENSION_ID}_suggest_normalization"] = \
+        shared.OptionInfo("count", "Rank suggestions by", gr.Radio, {"choices": ["count", "pmi"]})\
+        .info("pmi = how much more often two tags appear together than by chance; favours specific pairings over common tags")\
+        .needs_reload_ui()
+    opts[f"{EXTENSION_ID}_suggest_max_neighbours"] = \
+        shared.OptionInfo(suggest_max_neighbours_default, "Maximum suggestions kept per tag",
+                          gr.Slider, {"minimum": -1, "maximum": 500, "step": 1}).info("-1 = unlimited").needs_reload_ui()
+    opts[f"{EXTENSION_ID}_suggest_min_count"] = \
+        shared.OptionInfo(suggest_min_count_default, "Minimum number of times two tags appear together to be suggested",
+                          gr.Slider, {"minimum": 1, "maximum": 100, "step": 1}).needs_reload_ui()
+    opts[f"{EXTENSION_ID}_ingest_workers"] = \
+        shared.OptionInfo(ingest_workers_default, "Number of workers for reading image prompts",
+                          gr.Slider, {"minimum": 0, "maximum": 64, "step": 1}).info("0 = number of CPU cores").needs_reload_ui()
+    opts[f"{EXTENSION_ID}_ingest_use_processes"] = \
+        shared.OptionInfo(False, "Read image prompts in separate processes instead of threads").needs_reload_ui()
+
+    opts[f"{EXTENSION_ID}_log_stats"] = \
+        shared.OptionInfo(False, "Log build timings and counters to the console")\
+        .info(f"One JSON line per model build; the same numbers are served from {API_PREFIX}/stats")
+
+    opts[f"{EXTENSION_ID}_cache_retention_enabled"] = \
+        shared.OptionInfo(True, "Clean up cache.db after each model build")\
+        .info("Removes images that no longer exist or are far outside the analysis window, in small batches in the background")
+    opts[f"{EXTENSION_ID}_cache_retention_margin"] = \
+        shared.OptionInfo(cache_retention_margin_default, "Images kept in the cache beyond the analysis window",
+                          gr.Slider, {"minimum": 0, "maximum": 100000, "step": 100})\
+        .info("Per analysis directory; avoids parsing them again when the number of images to analyze is raised")
+    opts[f"{EXTENSION_ID}_cache_vacuum_threshold"] = \
+        shared.OptionInfo(cache_vacuum_threshold_default, "Compact cache.db when this percentage of it is free space",
+                          gr.Slider, {"minimum": 1, "maximum": 100, "step": 1})
+    opts[f"{EXTENSION_ID}_cache_retention_result"] = OptionHTML(
+        f"""<span class="settings-comment"><span class="info">Last cleanup: {_format_retention(_load_retention_result())}</span></span>""")
 
     shared.options_templates.update(shared.options_section(section, opts))
 
 
-def get_tags_from_repository():
+def _list_tag_sources() -> List[str]:
     tags_dir = os.path.join(extension_dir, "tags")
-    if not os.path.exists(tags_dir):
-        os.makedirs(tags_dir, exist_ok=True)
-    if not os.listdir(tags_dir):
-        subprocess.run(
-            ["git", "clone", "--depth=1", TAGS_REPOSITORY, tags_dir],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-    elif os.path.exists(os.path.join(tags_dir, ".git")):
-        with suppress(subprocess.CalledProcessError):
-            subprocess.run(
-                ["git", "pull"],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                cwd=tags_dir)
-
-
-get_tags_from_repository()
-tag_sources = []
-for dir in os.listdir(os.path.join(extension_dir, "tags")):
-    if dir != ".git":
-        tag_sources.append(dir)
-
-create_table()
-output_path = os.path.join(extension_dir, "models.json.gz")
-with gzip.open(output_path, "wt", encoding="utf-8") as f:
-    json.dump(init(), f, ensure_ascii=True, separators=(',', ':'))
+    tag_sources = [name for name in os.listdir(tags_dir) if name != ".git"] if os.path.isdir(tags_dir) else []
+    # the dictionary of a first start may still be downloading
+    return tag_sources or [tag_source_default]
+
+
+def _sync_tag_repository() -> None:
+    """
+    Update the tag dictionary without holding up the WebUI start, then rebuild the tag models when a new revision
+    came in. Clients pick the changes up with their next /models poll.
+    """
+    timeout = shared.opts.data.get(f'{EXTENSION_ID}_tag_sync_timeout', tag_sync_timeout_default)
+    if timeout <= 0:
+        return
+    enabled = shared.opts.data.get(f'{EXTENSION_ID}_enabled', True)
+    if enabled:
+        # the first build reads the installed dictionary; git must not rewrite the CSV files under it
+        with suppress(Exception):
+            get_models_future().result()
+    if tag_repository.sync(os.path.join(extension_dir, "tags"), TAGS_REPOSITORY, timeout) and enabled:
+        print(f"{EXTENSION_NAME}: tag dictionary updated, rebuilding the tag models")
+        build_executor.submit(_rebuild_tag_models)
+
+
+def _rebuild_tag_models() -> None:
+    """
+    Build the tag and suggestion models again and swap them into model_store as a delta.
+    """
+    db_path = os.path.join(extension_dir, "cache.db")
+    try:
+        with DBManager(db_path) as conn:
+            with build_stats.stage("rebuild_tag_models"):
+                tag_models, suggestion_models = _build_tag_models(conn.cursor())
+    except Exception as e:
+        print(f"{EXTENSION_NAME}: rebuilding the tag models failed: {e}")
+        return
+    model_store.replace("tagModels", tag_models)
+    model_store.replace("suggestionModels", suggestion_models)
+
+    snapshot = model_store.get_since(0)
+    # /version hands out the version of models.json.gz, so new page loads fetch the rewritten file
+    _write_models({"version": snapshot["version"], **{name: snapshot[name] for name in MODEL_NAMES}})
+
+
+if shared.opts.data.get(f'{EXTENSION_ID}_enabled', True):
+    get_models_future()
+threading.Thread(target=_sync_tag_repository, name=f"{EXTENSION_ID}_tag_sync", daemon=True).start()
 
 script_callbacks.on_ui_settings(on_ui_settings)
 script_callbacks.on_app_started(on_app_started)
+script_callbacks.on_image_saved(on_image_saved)
@@ -0,0 +1,277 @@
+import struct
+import zlib
+from typing import Dict, Optional
+import piexif
+import piexif.helper
+from PIL import Image, UnidentifiedImageError
+
+PNG = ".png"
+WEBP = ".webp"
+EXTENSIONS = [PNG, WEBP]
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# (bit depth, color type) pairs that PIL can open
+PNG_MODES = {(1, 0), (2, 0), (4, 0), (8, 0), (16, 0), (8, 2), (16, 2), (1, 3), (2, 3), (4, 3), (8, 3), (8, 4), (16, 4), (8, 6), (16, 6)}
+# chunks that PIL turns into image.info entries other than text
+PNG_INFO_CHUNKS = {b"tRNS", b"gAMA", b"cHRM", b"sRGB", b"pHYs", b"eXIf", b"iCCP", b"acTL", b"fcTL", b"fdAT"}
+# same limit as PIL's MAX_TEXT_CHUNK
+MAX_TEXT_CHUNK = 1024 * 1024
+
+EXIF_IFD_POINTER = 0x8769
+USER_COMMENT = 0x9286
+LONG = 4
+UNDEFINED = 7
+
+
+class _Fallback(Exception):
+    """
+    Raised when the header reader meets something it does not reproduce exactly; the PIL path takes over.
+    """
+
+
+def get_prompt(file: str) -> str:
+    """
+    Read the positive prompt from the metadata of a PNG or WebP file without decoding the image.
+
+    Only the chunk headers and the text / EXIF chunks are read. Returns exactly what get_prompt_pil returns,
+    and defers to it for anything unusual (broken files, interlaced PNGs, extra info chunks, ...).
+    """
+    ext = "." + file.split(".")[-1].lower()
+    try:
+        with open(file, "rb") as f:
+            if ext == PNG:
+                metadata = _read_png_metadata(f)
+            elif ext == WEBP:
+                metadata = _read_webp_metadata(f)
+            else:
+                raise _Fallback()
+    except (OSError, _Fallback, struct.error):
+        return get_prompt_pil(file)
+
+    if metadata is None:
+        return None
+    return extract_prompt(metadata)
+
+
+def get_prompt_pil(file: str) -> str:
+    try:
+        with Image.open(file) as image:
+            img_info = image.info
+    except (FileNotFoundError, UnidentifiedImageError) as e:
+        print(f"Error opening image {file}: {e}")
+        return None
+
+    if not img_info:
+        return None
+
+    metadata = ""
+    ext = "." + file.split(".")[-1].lower()
+    if ext == WEBP:
+        if "exif" not in img_info:
+            return None
+        try:
+            uc_byte = piexif.load(img_info["exif"]).get("Exif", {}).get(piexif.ExifIFD.UserComment, None)
+        except Exception as e:
+            print(f"Error reading EXIF data from {file}: {e}")
+            return None
+        if uc_byte is None:
+            return None
+        metadata = piexif.helper.UserComment.load(uc_byte)
+    elif ext == PNG:
+        for key, value in img_info.items():
+            if key == 'parameters':
+                # WebUI
+                metadata += f"{value}\n"
+            else:
+                # NAI
+                metadata += f"{key}: {value}\n"
+        metadata = metadata.rstrip()
+
+    return extract_prompt(metadata)
+
+
+def extract_prompt(metadata: str) -> str:
+    prompts = metadata.split("Steps:")
+    if len(prompts) <= 1:
+        return None
+    prompts = prompts[0]
+    parts = prompts.split("Negative prompt:")
+    if len(parts) <= 1:
+        return None
+    return parts[0]
+
+
+def _read_png_metadata(f) -> Optional[str]:
+    if f.read(8) != PNG_SIGNATURE:
+        raise _Fallback()
+
+    texts: Dict[str, str] = {}
+    is_first = True
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise _Fallback()
+        length, cid = struct.unpack(">I4s", header)
+        if cid == b"IDAT":
+            break
+        if is_first != (cid == b"IHDR") or cid in PNG_INFO_CHUNKS:
+            raise _Fallback()
+        is_first = False
+
+        data = f.read(length)
+        crc = f.read(4)
+        if len(data) < length or len(crc) < 4 or struct.unpack(">I", crc)[0] != zlib.crc32(data, zlib.crc32(cid)):
+            raise _Fallback()
+
+        if cid == b"IHDR":
+            if length < 13 or (data[8], data[9]) not in PNG_MODES or data[11] or data[12]:
+                raise _Fallback()
+        elif cid == b"tEXt":
+            key, __, value = data.partition(b"\0")
+            if key:
+                key = key.decode("latin-1")
+                if key == "exif":
+                    raise _Fallback()
+                texts[key] = value.decode("latin-1", "replace")
+        elif cid == b"zTXt":
+            key, __, value = data.partition(b"\0")
+            if value and value[0] != 0:
+                raise _Fallback()
+            try:
+                value = _decompress(value[1:])
+            except zlib.error:
+                value = b""
+            if key:
+                texts[key.decode("latin-1")] = value.decode("latin-1", "replace")
+        elif cid == b"iTXt":
+            _read_itxt(data, texts)
+        elif cid == b"IEND":
+            raise _Fallback()
+
+    if not texts:
+        return None
+
+    metadata = ""
+    for key, value in texts.items():
+        if key == 'parameters':
+            # WebUI
+            metadata += f"{value}\n"
+        else:
+            # NAI
+            metadata += f"{key}: {value}\n"
+    return metadata.rstrip()
+
+
+def _read_itxt(data: bytes, texts: Dict[str, str]) -> None:
+    key, sep, rest = data.partition(b"\0")
+    if not sep or len(rest) < 2:
+        return
+    if key == b"XML:com.adobe.xmp":
+        raise _Fallback()
+    compressed, method, rest = rest[0], rest[1], rest[2:]
+    try:
+        lang, translated_key, value = rest.split(b"\0", 2)
+    except ValueError:
+        return
+    if compressed:
+        if method != 0:
+            return
+        try:
+            value = _decompress(value)
+        except zlib.error:
+            return
+    try:
+        key = key.decode("latin-1")
+        lang.decode("utf-8")
+        translated_key.decode("utf-8")
+        texts[key] = value.decode("utf-8")
+    except UnicodeError:
+        return
+
+
+def _decompress(data: bytes) -> bytes:
+    decompressor = zlib.decompressobj()
+    plaintext = decompressor.decompress(data, MAX_TEXT_CHUNK)
+    if decompressor.unconsumed_tail:
+        raise _Fallback()
+    return plaintext
+
+
+def _read_webp_metadata(f) -> Optional[str]:
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:] != b"WEBP":
+        raise _Fallback()
+
+    chunk = f.read(8)
+    if len(chunk) < 8 or chunk[:4] != b"VP8X":
+        raise _Fallback()
+    size = struct.unpack("<I", chunk[4:])[0]
+    f.seek(size + (size & 1), 1)
+
+    while True:
+        chunk = f.read(8)
+        if len(chunk) == 0:
+            return None
+        if len(chunk) < 8:
+            raise _Fallback()
+        cid, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+        if cid == b"EXIF":
+            exif = f.read(size)
+            if len(exif) < size:
+                raise _Fallback()
+            break
+        f.seek(size + (size & 1), 1)
+
+    if not exif:
+        return None
+    uc_byte = _find_user_comment(exif)
+    if uc_byte is None:
+        return None
+    return piexif.helper.UserComment.load(uc_byte)
+
+
+def _find_user_comment(exif: bytes) -> Optional[bytes]:
+    if exif[:6] == b"Exif\x00\x00":
+        exif = exif[6:]
+    if exif[:2] == b"II":
+        endian = "<"
+    elif exif[:2] == b"MM":
+        endian = ">"
+    else:
+        raise _Fallback()
+
+    ifd0 = struct.unpack_from(endian + "I", exif, 4)[0]
+    exif_ifd = _find_ifd_entry(exif, endian, ifd0, EXIF_IFD_POINTER)
+    if exif_ifd is None:
+        return None
+    value_type, __, exif_ifd_offset = exif_ifd
+    if value_type != LONG:
+        raise _Fallback()
+    entry = _find_ifd_entry(exif, endian, exif_ifd_offset, USER_COMMENT)
+    if entry is None:
+        return None
+    value_type, count, offset = entry
+    if value_type != UNDEFINED:
+        raise _Fallback()
+    if count <= 4:
+        return exif[offset:offset + count]
+    offset = struct.unpack_from(endian + "I", exif, offset)[0]
+    if offset + count > len(exif):
+        raise _Fallback()
+    return exif[offset:offset + count]
+
+
+def _find_ifd_entry(exif: bytes, endian: str, ifd_offset: int, tag: int):
+    """
+    Return (type, count, value) of `tag` in the IFD at `ifd_offset`. For UNDEFINED values `value` is the
+    position of the inline value field; otherwise it is the LONG stored there.
+    """
+    count = struct.unpack_from(endian + "H", exif, ifd_offset)[0]
+    for i in range(count):
+        entry_offset = ifd_offset + 2 + i * 12
+        entry_tag, value_type, value_count = struct.unpack_from(endian + "HHI", exif, entry_offset)
+        if entry_tag == tag:
+            if value_type == UNDEFINED:
+                return value_type, value_count, entry_offset + 8
+            return value_type, value_count, struct.unpack_from(endian + "I", exif, entry_offset + 8)[0]
+    return None
@@ -0,0 +1,67 @@
+from typing import Any, Dict, List
+
+FORMAT_VERSION = 2
+# category of tags that are used but not in the dictionary ("custom" in the nested models)
+CUSTOM_CATEGORY = -1
+
+
+class StringTable:
+    def __init__(self):
+        self.indexes: Dict[str, int] = {}
+
+    def ref(self, value: str) -> int:
+        index = self.indexes.get(value)
+        if index is None:
+            index = self.indexes[value] = len(self.indexes)
+        return index
+
+    def strings(self) -> List[str]:
+        return list(self.indexes)
+
+
+def encode(models: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn the nested models into the columnar layout of models.json.gz (format 2).
+
+    Every string is stored once in `strings` and referred to by index; the first `tags.count` strings are the tag
+    names, so tag i is strings[i]. Per-tag values are parallel arrays, and the variable-length lists (aliases,
+    suggestion neighbours, LoRA search words) are one flat array each, where the entries of row i are
+    values[offsets[i]:offsets[i + 1]].
+    """
+    table = StringTable()
+    tag_models = models["tagModels"]
+    for tag in tag_models:
+        table.ref(tag)
+
+    tags: Dict[str, List[int]] = {"category": [], "postCount": [], "useCount": [], "aliasOffsets": [0], "aliases": []}
+    for data in tag_models.values():
+        category = data["category"]
+        tags["category"].append(CUSTOM_CATEGORY if category == "custom" else category)
+        tags["postCount"].append(data["post_count"])
+        tags["useCount"].append(data["use_count"])
+        tags["aliases"].extend(table.ref(alias) for alias in data["aliases"])
+        tags["aliasOffsets"].append(len(tags["aliases"]))
+
+    suggestions: Dict[str, List] = {"tag": [], "offsets": [0], "neighbour": [], "score": []}
+    for tag, neighbours in models["suggestionModels"].items():
+        suggestions["tag"].append(table.ref(tag))
+        for neighbour, score in neighbours.items():
+            suggestions["neighbour"].append(table.ref(neighbour))
+            suggestions["score"].append(score)
+        suggestions["offsets"].append(len(suggestions["neighbour"]))
+
+    loras: Dict[str, List[int]] = {"name": [], "previewFile": [], "wordOffsets": [0], "words": []}
+    for name, data in models["loraModels"].items():
+        loras["name"].append(table.ref(name))
+        loras["previewFile"].append(table.ref(data["preview_file"]))
+        loras["words"].extend(table.ref(word) for word in data["search_words"])
+        loras["wordOffsets"].append(len(loras["words"]))
+
+    return {
+        "format": FORMAT_VERSION,
+        "version": models.get("version", 0),
+        "strings": table.strings(),
+        "tags": {"count": len(tag_models), **tags},
+        "suggestions": suggestions,
+        "loras": loras,
+    }
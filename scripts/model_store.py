@@ -0,0 +1,114 @@
+import threading
+import time
+from typing import Any, Dict, Iterable, List
+from scripts.tag_search import TagIndex
+
+MODEL_NAMES = ["tagModels", "suggestionModels", "loraModels"]
+
+
+class ModelStore:
+    """
+    Holds the models served to the browser and remembers in which version each entry last changed,
+    so clients can fetch only what changed since the version they already have.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # start from the clock so versions handed out before a restart are always older than the new base
+        self.version = int(time.time() * 1000)
+        self.base_version = self.version
+        self.models: Dict[str, Dict[str, Any]] = {name: {} for name in MODEL_NAMES}
+        self.changes: Dict[str, Dict[str, int]] = {name: {} for name in MODEL_NAMES}
+        self.removals: Dict[str, Dict[str, int]] = {name: {} for name in MODEL_NAMES}
+        self._alias_to_tag = None
+        self._tag_index = None
+
+    def reset(self, models: Dict[str, Dict[str, Any]]) -> int:
+        with self.lock:
+            self.version += 1
+            self.base_version = self.version
+            # copied: later updates change the stored models in place, while the caller may still read `models`
+            self.models = {name: dict(models.get(name) or {}) for name in MODEL_NAMES}
+            self.changes = {name: {} for name in MODEL_NAMES}
+            self.removals = {name: {} for name in MODEL_NAMES}
+            self._alias_to_tag = None
+            self._tag_index = None
+            return self.version
+
+    def update(self, name: str, entries: Dict[str, Any], removed: Iterable[str] = ()) -> int:
+        with self.lock:
+            return self._apply(name, entries, removed)
+
+    def replace(self, name: str, new_model: Dict[str, Any]) -> int:
+        """
+        Swap in a freshly built model, recording only the entries that were added, changed or removed.
+        """
+        with self.lock:
+            model = self.models[name]
+            entries = {key: value for key, value in new_model.items() if model.get(key) != value}
+            removed = [key for key in model if key not in new_model]
+            return self._apply(name, entries, removed)
+
+    def _apply(self, name: str, entries: Dict[str, Any], removed: Iterable[str]) -> int:
+        model = self.models[name]
+        removed = [key for key in removed if key in model]
+        if not entries and not removed:
+            return self.version
+        self.version += 1
+        model.update(entries)
+        for key in entries:
+            self.changes[name][key] = self.version
+            self.removals[name].pop(key, None)
+        for key in removed:
+            del model[key]
+            self.changes[name].pop(key, None)
+            self.removals[name][key] = self.version
+        if name == "tagModels":
+            self._alias_to_tag = None
+            if self._tag_index is not None:
+                self._tag_index.update(entries, removed)
+        return self.version
+
+    def get_since(self, since: int) -> Dict[str, Any]:
+        with self.lock:
+            if since < self.base_version:
+                return {
+                    "version": self.version,
+                    "full": True,
+                    **{name: dict(self.models[name]) for name in MODEL_NAMES},
+                    "removed": {name: [] for name in MODEL_NAMES}
+                }
+            delta = {"version": self.version, "full": False, "removed": {}}
+            for name in MODEL_NAMES:
+                model = self.models[name]
+                delta[name] = {key: model[key] for key, version in self.changes[name].items() if version > since}
+                delta["removed"][name] = [key for key, version in self.removals[name].items() if version > since]
+            return delta
+
+    def consequents(self, tag: str) -> List[str]:
+        """
+        Return the tags that have `tag` as an alias.
+        """
+        with self.lock:
+            if self._alias_to_tag is None:
+                self._alias_to_tag = {}
+                for consequent, data in self.models["tagModels"].items():
+                    for alias in data.get("aliases", []):
+                        self._alias_to_tag.setdefault(alias, []).append(consequent)
+            return self._alias_to_tag.get(tag, [])
+
+    def build_tag_index(self) -> None:
+        with self.lock:
+            self._get_tag_index()
+
+    def search_tags(self, query: str, priority_tags: Iterable[str], limits: Dict[str, int]) -> List[Dict[str, Any]]:
+        """
+        Rank the tag model against `query`; the prefix index is built on first use and then kept up to date with every change.
+        """
+        with self.lock:
+            return self._get_tag_index().search(query, priority_tags, limits)
+
+    def _get_tag_index(self) -> TagIndex:
+        if self._tag_index is None:
+            self._tag_index = TagIndex(self.models["tagModels"])
+        return self._tag_index
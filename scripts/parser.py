@@ -1,5 +1,6 @@
 import re
 from enum import Enum
+from typing import Iterable, List, Optional
 
 
 class NestType(Enum):
@@ -71,72 +72,85 @@ def is_number(value):
         return False
 
 
+def _plain_run_regex(nest_type: NestType) -> re.Pattern:
+    specials = "\n\\" + "".join(opener_to_type) + "".join(closer_to_type) + "".join(delimiters[nest_type])
+    return re.compile("[^" + re.escape(specials) + "]+")
+
+
+# characters that need no handling in a given nesting level are consumed as one slice
+plain_run_regexes = {nest_type: _plain_run_regex(nest_type) for nest_type in NestType}
+
+
 def get_tags(prompt: str) -> list:
     # Replace meta keywords
     prompt = match_meta_keyword_regex.sub(
         lambda match: ",".ljust(len(match.group()), " "), prompt)
 
     # Replace dynamic prompt patterns
-    prompt = dynamic_prompt_regex.sub(
-        lambda match: "{" + " " * len(match.group(1)) + match.group(2) + "}", prompt)
+    if "$$" in prompt:
+        prompt = dynamic_prompt_regex.sub(
+            lambda match: "{" + " " * len(match.group(1)) + match.group(2) + "}", prompt)
 
-    is_escaped = False
     nest_types = [NestType.ROOT]
 
-    tag = ""
+    # the current tag is collected as a list of slices and joined once per flush
+    tag_parts = []
     tokens = []
 
-    def flush(token):
-        token = token.replace("_", " ").strip()
+    def flush():
+        token = "".join(tag_parts).replace("_", " ").strip()
+        tag_parts.clear()
         if token != "":
             tokens.append(token)
 
-    skip_counter = 0
-    for i in range(len(prompt)):
-        if skip_counter > 0:
-            skip_counter -= 1
+    i = 0
+    length = len(prompt)
+    while i < length:
+        current_nest_type = nest_types[-1]
+
+        match = plain_run_regexes[current_nest_type].match(prompt, i)
+        if match:
+            run = match.group()
+            if current_nest_type == NestType.LORA and not tag_parts:
+                run = run.lstrip(" ")
+            if run:
+                tag_parts.append(run)
+            i = match.end()
             continue
-        char = prompt[i]
 
-        current_nest_type = nest_types[-1]
+        char = prompt[i]
+        i += 1
 
         if char == "\n":
-            flush(tag)
-            tag = ""
-            is_escaped = False
-            continue
-        if is_escaped:
-            tag += char
-            is_escaped = False
+            flush()
             continue
         if char == "\\":
-            is_escaped = True
+            # an escaped character is taken literally; a newline still ends the tag
+            if i < length and prompt[i] != "\n":
+                tag_parts.append(prompt[i])
+                i += 1
             continue
 
         if char in opener_to_type:
             opener_type = opener_to_type[char]
             if opener_type == NestType.ANGLE:
-                if len(prompt) - i > PREFIX_LENGTH:
-                    lora_prefix = prompt[i+1:i+PREFIX_LENGTH+1]
-                    if lora_prefix == "lora:" or lora_prefix == "lyco:":
-                        opener_type = NestType.LORA
+                lora_prefix = prompt[i:i+PREFIX_LENGTH]
+                if length - i >= PREFIX_LENGTH and (lora_prefix == "lora:" or lora_prefix == "lyco:"):
+                    opener_type = NestType.LORA
+                    i += PREFIX_LENGTH
 
             nest_types.append(opener_type)
-
-            if opener_type == NestType.LORA:
-                skip_counter = PREFIX_LENGTH
-
-            flush(tag)
-            tag = ""
+            flush()
             continue
 
         if char in closer_to_type:
             expected_closer = closer_for_type[current_nest_type]
             if char != expected_closer:
-                tag += char
+                tag_parts.append(char)
                 continue
 
             if current_nest_type == NestType.PAREN or current_nest_type == NestType.SQUARE:
+                tag = "".join(tag_parts)
                 colon_index = tag.rfind(":")
                 if colon_index >= 0:
                     word = tag[:colon_index]
@@ -146,29 +160,23 @@ def get_tags(prompt: str) -> list:
                 elif current_nest_type == NestType.SQUARE:
                     if is_number(tag):
                         tag = ""
+                tag_parts[:] = [tag]
             elif current_nest_type == NestType.LORA:
-                tag = ""
+                tag_parts.clear()
 
             nest_types.pop()
-
-            flush(tag)
-            tag = ""
+            flush()
             continue
 
-        if current_nest_type == NestType.LORA:
-            if tag != "" or char != " ":
-                tag += char
-            continue
+        # a delimiter of the current nesting level
+        flush()
 
-        if char in delimiters.get(current_nest_type, set()):
-            flush(tag)
-            tag = ""
-            continue
-
-        tag += char
+    flush()
+    return tokens
 
-    tag = tag.replace("_", " ").strip()
-    if tag != "":
-        tokens.append(tag)
 
-    return tokens
+def get_tags_batch(prompts: Iterable[Optional[str]]) -> List[list]:
+    """
+    Split several prompts at once; a missing prompt (None) gives an empty tag list.
+    """
+    return [get_tags(prompt) if prompt is not None else [] for prompt in prompts]
@@ -0,0 +1,117 @@
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Tuple
+import scripts.scanner as scanner
+from scripts.database import DBManager
+
+BATCH_SIZE = 2000
+# pause between batches so live ingestion and the WebUI get the database in between
+BATCH_PAUSE_SECONDS = 0.05
+
+
+def collect(db_path: str, directories: List[Tuple[str, str]], keep: int, vacuum_threshold: float) -> Dict[str, Any]:
+    """
+    Remove cache rows that can no longer be used and compact cache.db when enough of it is free pages.
+
+    `directories` are the configured (key, root) pairs and `keep` is the number of newest images per
+    directory to keep cached (-1 = all). Only files that are not counted (outside the analysis window)
+    are removed: those of unconfigured directories, those missing on disk and those beyond `keep`.
+    Deletion runs in transactions of BATCH_SIZE files.
+    """
+    start = time.perf_counter()
+    result: Dict[str, Any] = {"finished_at": None, "removed_files": 0, "removed_tag_names": 0, "removed_lora_infos": 0, "vacuum": "none"}
+    result["db_bytes_before"] = _db_size(db_path)
+
+    with DBManager(db_path) as conn:
+        cursor = conn.cursor()
+        file_ids = _find_garbage_files(cursor, directories, keep)
+        roots = [root for __, root in directories]
+        cursor.execute(f"DELETE FROM tscan_dirs WHERE root NOT IN ({','.join('?' * len(roots))})", roots)
+        cursor.execute(f"DELETE FROM tscan_files WHERE root NOT IN ({','.join('?' * len(roots))})", roots)
+
+    for i in range(0, len(file_ids), BATCH_SIZE):
+        with DBManager(db_path) as conn:
+            cursor = conn.cursor()
+            batch = [(file_id,) for file_id in file_ids[i:i + BATCH_SIZE]]
+            # a file counted again in the meantime (e.g. by a rebuild) is left alone
+            cursor.executemany("DELETE FROM tfiles WHERE id = ? AND counted = 0", batch)
+            result["removed_files"] += cursor.rowcount
+            cursor.executemany("DELETE FROM ttags WHERE file_id = ? AND NOT EXISTS (SELECT 1 FROM tfiles WHERE id = ?)", [row * 2 for row in batch])
+        time.sleep(BATCH_PAUSE_SECONDS)
+
+    with DBManager(db_path) as conn:
+        cursor = conn.cursor()
+        if result["removed_files"]:
+            cursor.execute("DELETE FROM ttag_names WHERE id NOT IN (SELECT tag_id FROM ttags)")
+            result["removed_tag_names"] = cursor.rowcount
+        cursor.execute("SELECT path FROM tlora_info")
+        missing = [(path,) for (path,) in cursor.fetchall() if not os.path.exists(path)]
+        cursor.executemany("DELETE FROM tlora_info WHERE path = ?", missing)
+        result["removed_lora_infos"] = len(missing)
+
+    result["vacuum"] = _compact(db_path, vacuum_threshold)
+    result["db_bytes_after"] = _db_size(db_path)
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    result["finished_at"] = time.time()
+    return result
+
+
+def _find_garbage_files(cursor: sqlite3.Cursor, directories: List[Tuple[str, str]], keep: int) -> List[int]:
+    keys = [key for key, __ in directories]
+    cursor.execute(f"SELECT id FROM tfiles WHERE counted = 0 AND directory NOT IN ({','.join('?' * len(keys))})", keys)
+    file_ids = [row[0] for row in cursor.fetchall()]
+
+    for key, root in directories:
+        # an unmounted or not yet scanned directory would look empty; leave its rows alone
+        cursor.execute("SELECT 1 FROM tscan_dirs WHERE root = ? AND path = ?", (root, root))
+        if not os.path.isdir(root) or cursor.fetchone() is None:
+            continue
+        cursor.execute("SELECT path FROM tscan_files WHERE root = ?", (root,))
+        present = {scanner.relative_name(path, root) for (path,) in cursor.fetchall()}
+
+        cursor.execute("SELECT id, name, counted FROM tfiles WHERE directory = ? ORDER BY timestamp DESC", (key,))
+        position = 0
+        for file_id, name, counted in cursor.fetchall():
+            if name not in present:
+                if not counted:
+                    file_ids.append(file_id)
+                continue
+            if keep >= 0 and position >= keep and not counted:
+                file_ids.append(file_id)
+            position += 1
+    return file_ids
+
+
+def _compact(db_path: str, vacuum_threshold: float) -> str:
+    """
+    Return the pages freed by the deletions to the file system once they exceed `vacuum_threshold` of the file.
+
+    The first time this switches cache.db to incremental auto-vacuum, which needs one full VACUUM;
+    after that the free pages are released in small steps.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        page_count = cursor.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+        vacuum = "none"
+        if page_count and freelist_count / page_count >= vacuum_threshold:
+            if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                cursor.execute("VACUUM")
+                vacuum = "full"
+            else:
+                while cursor.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+                    cursor.execute("PRAGMA incremental_vacuum(500)").fetchall()
+                    time.sleep(BATCH_PAUSE_SECONDS)
+                vacuum = "incremental"
+        cursor.execute("PRAGMA optimize")
+        cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return vacuum
+    finally:
+        conn.close()
+
+
+def _db_size(db_path: str) -> int:
+    return sum(os.path.getsize(path) for path in [db_path, f"{db_path}-wal"] if os.path.exists(path))
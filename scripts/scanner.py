@@ -0,0 +1,124 @@
+import heapq
+import os
+import sqlite3
+from operator import itemgetter
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class ScanState:
+    """
+    The tscan_dirs / tscan_files rows of one root, loaded up front so that walk() needs no database access
+    and can run in a worker thread. walk() updates the state in place and records what apply() writes back.
+    """
+
+    def __init__(self, cursor: sqlite3.Cursor, root: str):
+        self.root = root
+        cursor.execute("SELECT path, parent, mtime FROM tscan_dirs WHERE root = ?", (root,))
+        self.dirs: Dict[str, Tuple[Optional[str], float]] = {path: (parent, mtime) for path, parent, mtime in cursor.fetchall()}
+        cursor.execute("SELECT path, parent, timestamp, size FROM tscan_files WHERE root = ?", (root,))
+        self.files: Dict[str, Dict[str, Tuple[float, int]]] = {}
+        for path, parent, timestamp, size in cursor.fetchall():
+            self.files.setdefault(parent, {})[path] = (timestamp, size)
+
+        self.changed_dirs: List[Tuple[str, Optional[str], float]] = []
+        self.removed_dirs: List[str] = []
+        self.changed_files: List[Tuple[str, str, float, int]] = []
+        self.removed_files: List[str] = []
+
+    def file_count(self) -> int:
+        return sum(len(files) for files in self.files.values())
+
+
+def walk(state: ScanState, extensions: List[str]) -> List[Tuple[str, float]]:
+    """
+    Walk the root of `state` and return (path, timestamp) for image files that are new or modified since the last scan.
+
+    A directory whose mtime is unchanged is not listed again; only its known subdirectories are visited. Files and
+    directories that disappeared are dropped from `state`.
+    """
+    children: Dict[str, List[str]] = {}
+    for path, (parent, __) in state.dirs.items():
+        if parent is not None:
+            children.setdefault(parent, []).append(path)
+
+    seen_dirs: Set[str] = set()
+    stack = [(state.root, None)]
+    while stack:
+        path, parent = stack.pop()
+        try:
+            dir_mtime = os.stat(path).st_mtime
+        except OSError:
+            continue
+        seen_dirs.add(path)
+
+        cached_dir = state.dirs.get(path)
+        if cached_dir is not None and cached_dir[1] == dir_mtime:
+            stack.extend((child, path) for child in children.get(path, []))
+            continue
+
+        known_files = state.files.get(path, {})
+        subdirs = []
+        present_files: Dict[str, Tuple[float, int]] = {}
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            if not entry.is_symlink():
+                                subdirs.append(entry.path)
+                            continue
+                        ext = "." + entry.name.split(".")[-1].lower()
+                        if ext not in extensions:
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    present_files[entry.path] = (stat.st_mtime, stat.st_size)
+        except OSError:
+            seen_dirs.discard(path)
+            continue
+
+        state.removed_files.extend(file for file in known_files if file not in present_files)
+        state.changed_files.extend(
+            (file, path, timestamp, size) for file, (timestamp, size) in present_files.items() if known_files.get(file) != (timestamp, size)
+        )
+        state.files[path] = present_files
+        state.changed_dirs.append((path, parent, dir_mtime))
+        stack.extend((subdir, path) for subdir in subdirs)
+
+    state.removed_dirs = [path for path in state.dirs if path not in seen_dirs]
+    for path in state.removed_dirs:
+        state.files.pop(path, None)
+    return [(file, timestamp) for file, __, timestamp, __ in state.changed_files]
+
+
+def apply(cursor: sqlite3.Cursor, state: ScanState) -> None:
+    """
+    Write the changes walk() recorded in `state` to tscan_dirs / tscan_files.
+    """
+    root = state.root
+    cursor.executemany("DELETE FROM tscan_files WHERE root = ? AND path = ?", [(root, file) for file in state.removed_files])
+    cursor.executemany(
+        "INSERT OR REPLACE INTO tscan_files(root, path, parent, timestamp, size) VALUES (?, ?, ?, ?, ?)",
+        [(root, *row) for row in state.changed_files]
+    )
+    cursor.executemany("INSERT OR REPLACE INTO tscan_dirs(root, path, parent, mtime) VALUES (?, ?, ?, ?)", [(root, *row) for row in state.changed_dirs])
+    cursor.executemany("DELETE FROM tscan_dirs WHERE root = ? AND path = ?", [(root, path) for path in state.removed_dirs])
+    cursor.executemany("DELETE FROM tscan_files WHERE root = ? AND parent = ?", [(root, path) for path in state.removed_dirs])
+
+
+def newest(state: ScanState, image_count: int) -> List[Tuple[str, float]]:
+    """
+    Return the newest `image_count` files of a walked state (-1 = unlimited), newest first.
+    """
+    files = ((path, timestamp) for by_path in state.files.values() for path, (timestamp, __) in by_path.items())
+    if image_count < 0:
+        return sorted(files, key=itemgetter(1), reverse=True)
+    return heapq.nlargest(image_count, files, key=itemgetter(1))
+
+
+def relative_name(file: str, root: str) -> str:
+    """
+    Key of `file` under `root` as stored in tfiles: its relative path with forward slashes.
+    """
+    return os.path.relpath(file, root).replace(os.sep, "/")
@@ -0,0 +1,48 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+
+class Stats:
+    """
+    Durations and counters of the last model build, plus counters of the work done since.
+
+    Stages that run more than once (e.g. the scan of each analysis directory) accumulate their time.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.started_at = time.time()
+            self.stages: Dict[str, float] = {}
+            self.counters: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name: str, value: Any) -> None:
+        with self.lock:
+            self.counters[name] = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "started_at": self.started_at,
+                "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+                "counters": dict(self.counters),
+            }
@@ -0,0 +1,78 @@
+import glob
+import hashlib
+import os
+from contextlib import suppress
+from typing import Optional
+import polars as pl
+
+CACHE_FORMAT_VERSION = 1
+
+
+def load(tags_dir: str, cache_dir: str) -> Optional[pl.DataFrame]:
+    """
+    Return the normalised tag dictionary of one tag source as a frame with the columns
+    tag (underscores replaced by spaces), category, post_count and aliases (list of alias names, null if none).
+
+    The frame is compiled from tags.csv / tag_aliases.csv once and kept as an Arrow IPC file in `cache_dir`,
+    keyed by the content hash of the CSV files, so later starts only memory-map it.
+    Returns None when the source has no tags.csv.
+    """
+    tags_csv_path = os.path.join(tags_dir, "tags.csv")
+    if not os.path.exists(tags_csv_path):
+        return None
+    aliases_csv_path = os.path.join(tags_dir, "tag_aliases.csv")
+    if not os.path.exists(aliases_csv_path):
+        aliases_csv_path = None
+
+    source = os.path.basename(os.path.normpath(tags_dir))
+    digest = hashlib.sha256(f"{CACHE_FORMAT_VERSION}".encode())
+    for path in [tags_csv_path, aliases_csv_path]:
+        if path:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+    cache_path = os.path.join(cache_dir, f"{source}-{digest.hexdigest()[:16]}.arrow")
+
+    if os.path.exists(cache_path):
+        try:
+            # memory-mapped by default; polars 2 no longer takes the memory_map argument
+            return pl.read_ipc(cache_path)
+        except Exception as e:
+            print(f"Error reading tag cache {cache_path}: {e}")
+
+    frame = _compile(tags_csv_path, aliases_csv_path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    for stale_path in glob.glob(os.path.join(glob.escape(cache_dir), f"{glob.escape(source)}-*.arrow")):
+        with suppress(OSError):
+            os.remove(stale_path)
+    tmp_path = f"{cache_path}.tmp"
+    frame.write_ipc(tmp_path)
+    os.replace(tmp_path, cache_path)
+    return frame
+
+
+def _compile(tags_csv_path: str, aliases_csv_path: Optional[str]) -> pl.DataFrame:
+    tags = (
+        pl.read_csv(tags_csv_path, columns=["name", "category", "post_count"])
+        .select(
+            pl.col("name").cast(pl.Utf8).str.replace_all("_", " ", literal=True).alias("tag"),
+            pl.col("category").cast(pl.Int64),
+            pl.col("post_count").cast(pl.Int64),
+        )
+        .unique(subset="tag", keep="last", maintain_order=True)
+    )
+
+    if aliases_csv_path is None:
+        return tags.with_columns(pl.lit(None, dtype=pl.List(pl.Utf8)).alias("aliases"))
+
+    aliases = (
+        pl.read_csv(aliases_csv_path, columns=["antecedent_name", "consequent_name"])
+        .select(
+            pl.col("consequent_name").cast(pl.Utf8).str.replace_all("_", " ", literal=True).alias("tag"),
+            pl.col("antecedent_name").cast(pl.Utf8).str.replace_all("_", " ", literal=True).alias("alias"),
+        )
+        .group_by("tag", maintain_order=True)
+        .agg(pl.col("alias").alias("aliases"))
+    )
+    return tags.join(aliases, on="tag", how="left")
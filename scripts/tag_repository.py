@@ -0,0 +1,55 @@
+import os
+import shutil
+import subprocess
+from typing import List, Optional
+
+# never wait for credentials on a terminal nobody is looking at
+GIT_ENV = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+
+
+def sync(tags_dir: str, repository: str, timeout: float) -> bool:
+    """
+    Clone `repository` into `tags_dir`, or pull it when it is already a checkout, giving up after `timeout` seconds.
+
+    A clone goes to a sibling directory first and is moved into place only when it completed, so an interrupted
+    clone never leaves a half-filled tags directory behind. A directory that is neither empty nor a checkout
+    (e.g. a manually installed dictionary) is left alone. Returns True when a new revision was checked out.
+    """
+    os.makedirs(tags_dir, exist_ok=True)
+    if not os.listdir(tags_dir):
+        clone_dir = f"{tags_dir}.clone"
+        shutil.rmtree(clone_dir, ignore_errors=True)
+        if _git(["clone", "--depth=1", repository, clone_dir], None, timeout) is None:
+            shutil.rmtree(clone_dir, ignore_errors=True)
+            return False
+        os.rmdir(tags_dir)
+        os.replace(clone_dir, tags_dir)
+        return True
+
+    if not os.path.exists(os.path.join(tags_dir, ".git")):
+        return False
+    before = _git(["rev-parse", "HEAD"], tags_dir, timeout)
+    if _git(["pull", "--ff-only"], tags_dir, timeout) is None:
+        return False
+    return _git(["rev-parse", "HEAD"], tags_dir, timeout) != before
+
+
+def _git(args: List[str], cwd: Optional[str], timeout: float) -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            env=GIT_ENV,
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=True
+        )
+    except subprocess.TimeoutExpired:
+        print(f"git {args[0]} of the tag repository timed out after {timeout}s")
+        return None
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"git {args[0]} of the tag repository failed: {getattr(e, 'stderr', None) or e}")
+        return None
+    return result.stdout.strip()
@@ -0,0 +1,248 @@
+import heapq
+import re
+from bisect import bisect_left, bisect_right
+from functools import cmp_to_key
+from typing import Any, Dict, Iterable, List, Optional
+
+WORD_SEPARATOR = re.compile(r"[ _-]")
+PREFIX_LENGTH = 3
+
+
+class _Entry:
+    __slots__ = ("value", "values", "flat_value", "category", "use_count", "post_count", "consequent", "is_official")
+
+    def __init__(self, value: str):
+        self.value = value
+        self.values = WORD_SEPARATOR.split(value)
+        self.flat_value = "".join(self.values)
+        self.category = "custom"
+        self.use_count = 0
+        self.post_count = 0
+        self.consequent: Optional[str] = None
+        self.is_official = False
+
+
+class TagIndex:
+    """
+    Server-side counterpart of the browser's tag search (react/src/services/tagService.ts).
+
+    Every word of every tag and alias is kept in one sorted array with a parallel array of entry ids,
+    so the candidates for a query word are a single bisect range. Matching, alias collapsing, ranking
+    and the per-category limits follow searchTag() so both modes return the same list.
+    """
+
+    def __init__(self, tag_models: Dict[str, Dict[str, Any]]):
+        self.entries: List[Optional[_Entry]] = []
+        self.ids: Dict[str, int] = {}
+        self.words: List[str] = []
+        self.postings: List[int] = []
+
+        pairs = []
+        for tag, data in tag_models.items():
+            for entry in self._register(tag, data):
+                entry_id = self.ids[entry.value]
+                pairs.extend((word, entry_id) for word in set(entry.values) if word)
+        pairs.sort()
+        self.words = [word for word, __ in pairs]
+        self.postings = [entry_id for __, entry_id in pairs]
+
+    def update(self, tag_models: Dict[str, Dict[str, Any]], removed: Iterable[str] = ()) -> None:
+        """
+        Apply a model delta: drop removed tags (and the aliases pointing at them), then add or refresh the changed ones.
+        """
+        for tag in removed:
+            entry = self._get(tag)
+            if entry is None:
+                continue
+            self._unindex(entry)
+            for alias_entry in self.entries:
+                if alias_entry is not None and alias_entry.consequent == tag and not alias_entry.is_official:
+                    self._unindex(alias_entry)
+        for tag, data in tag_models.items():
+            for entry in self._register(tag, data):
+                self._index(entry)
+
+    def search(self, query: str, priority_tags: Iterable[str], limits: Dict[str, int]) -> List[Dict[str, Any]]:
+        """
+        Return the ranked results for `query`, at most `limits[category]` per category (-1 = unlimited).
+        """
+        queries = [q for q in WORD_SEPARATOR.split(query.lower()) if q.strip() != ""]
+        joined_query = "".join(queries) if len(queries) > 1 else None
+        priority_tags = set(priority_tags)
+
+        results = []
+        seen = set()
+        for query_for_candidate in queries:
+            prefix_key = query_for_candidate[:PREFIX_LENGTH]
+            start = bisect_left(self.words, prefix_key)
+            end = bisect_left(self.words, prefix_key + "\U0010ffff", start)
+            for entry_id in dict.fromkeys(self.postings[start:end]):
+                if entry_id in seen:
+                    continue
+                entry = self.entries[entry_id]
+                matched_words = _match(entry, queries, joined_query)
+                if matched_words:
+                    results.append({
+                        "entry": entry,
+                        "isPriority": entry.value in priority_tags,
+                        "matchedWords": matched_words,
+                    })
+                    seen.add(entry_id)
+
+        consequent_match_count = {r["entry"].value: len(r["matchedWords"]) for r in results if not r["entry"].consequent}
+        results = [
+            r for r in results
+            if not r["entry"].consequent
+            or r["entry"].consequent not in consequent_match_count
+            or consequent_match_count[r["entry"].consequent] < len(r["matchedWords"])
+        ]
+
+        result_tag_count: Dict[str, int] = {}
+        for r in results:
+            for matched in r["matchedWords"]:
+                result_tag_count[matched["word"]] = result_tag_count.get(matched["word"], 0) + 1
+        for r in results:
+            r["resultCount"] = sum(result_tag_count[matched["word"]] for matched in r["matchedWords"])
+
+        sort_key = cmp_to_key(lambda a, b: _compare(a, b, query, joined_query, queries))
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for r in results:
+            groups.setdefault(str(r["entry"].category), []).append(r)
+        ranked_groups = []
+        for category, group in groups.items():
+            limit = limits.get(category, 0)
+            if limit < 0:
+                ranked_groups.append(sorted(group, key=sort_key))
+            elif limit > 0:
+                ranked_groups.append(heapq.nsmallest(limit, group, key=sort_key))
+
+        return [self._to_item(r) for r in heapq.merge(*ranked_groups, key=sort_key)]
+
+    def _get(self, tag: str) -> Optional[_Entry]:
+        entry_id = self.ids.get(tag)
+        return None if entry_id is None else self.entries[entry_id]
+
+    def _new_entry(self, tag: str) -> _Entry:
+        entry = _Entry(tag)
+        self.ids[tag] = len(self.entries)
+        self.entries.append(entry)
+        return entry
+
+    def _register(self, tag: str, data: Dict[str, Any]) -> List[_Entry]:
+        """
+        Create or refresh the entry for `tag` and its aliases; returns the entries that are new and still need indexing.
+        """
+        registered = []
+        entry = self._get(tag)
+        if entry is None:
+            entry = self._new_entry(tag)
+            registered.append(entry)
+        entry.is_official = True
+        entry.category = data["category"]
+        entry.use_count = data["use_count"]
+        entry.post_count = data["post_count"]
+        for alias in data.get("aliases", []):
+            alias_entry = self._get(alias)
+            if alias_entry is None:
+                alias_entry = self._new_entry(alias)
+                registered.append(alias_entry)
+            alias_entry.consequent = tag
+            if not alias_entry.is_official:
+                alias_entry.category = entry.category
+                alias_entry.use_count = entry.use_count
+                alias_entry.post_count = entry.post_count
+        return registered
+
+    def _index(self, entry: _Entry) -> None:
+        entry_id = self.ids[entry.value]
+        for word in set(entry.values):
+            if word:
+                position = bisect_right(self.words, word)
+                self.words.insert(position, word)
+                self.postings.insert(position, entry_id)
+
+    def _unindex(self, entry: _Entry) -> None:
+        entry_id = self.ids.pop(entry.value)
+        self.entries[entry_id] = None
+        for word in set(entry.values):
+            if word:
+                start = bisect_left(self.words, word)
+                end = bisect_right(self.words, word, start)
+                for position in range(start, end):
+                    if self.postings[position] == entry_id:
+                        del self.words[position]
+                        del self.postings[position]
+                        break
+
+    def _to_item(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        entry = result["entry"]
+        consequent = self._get(entry.consequent) if entry.consequent else None
+        return {
+            "value": entry.value,
+            "category": entry.category,
+            "useCount": entry.use_count,
+            "postCount": entry.post_count,
+            "isOfficial": entry.is_official,
+            "isPriority": result["isPriority"],
+            "matchedWords": result["matchedWords"],
+            "consequent": consequent and {
+                "value": consequent.value,
+                "category": consequent.category,
+                "useCount": consequent.use_count,
+                "postCount": consequent.post_count,
+            },
+        }
+
+
+def _match(entry: _Entry, queries: List[str], joined_query: Optional[str]) -> List[Dict[str, Any]]:
+    matched_words = []
+    if joined_query and entry.value.startswith(joined_query):
+        for i, query in enumerate(queries):
+            matched_words.append({"word": query, "index": i})
+        return matched_words
+
+    matched_indices = set()
+    for query in queries:
+        if 0 not in matched_indices and entry.flat_value.startswith(query):
+            matched_words.append({"word": query, "index": 0})
+            matched_indices.add(0)
+            continue
+        for i, value in enumerate(entry.values):
+            if i not in matched_indices and value.startswith(query):
+                matched_words.append({"word": query, "index": i})
+                matched_indices.add(i)
+                break
+    return matched_words
+
+
+def _compare(this: Dict[str, Any], other: Dict[str, Any], query: str, joined_query: Optional[str], queries: List[str]) -> int:
+    if this["isPriority"] and not other["isPriority"]:
+        return -1
+    if not this["isPriority"] and other["isPriority"]:
+        return 1
+
+    this_entry = this["entry"]
+    other_entry = other["entry"]
+    if this_entry.value == query or (joined_query and this_entry.value == joined_query):
+        return -1
+    if other_entry.value == query or (joined_query and other_entry.value == joined_query):
+        return 1
+
+    this_words = this["matchedWords"]
+    other_words = other["matchedWords"]
+    if len(other_words) != len(this_words):
+        return len(other_words) - len(this_words)
+    elif len(queries) == len(this_words):
+        for this_word, other_word in zip(this_words, other_words):
+            if this_word["index"] != other_word["index"]:
+                return this_word["index"] - other_word["index"]
+
+    if other_entry.use_count != this_entry.use_count:
+        return other_entry.use_count - this_entry.use_count
+    count = this["resultCount"] - other["resultCount"]
+    if count != 0:
+        return count
+    if other_entry.post_count != this_entry.post_count:
+        return other_entry.post_count - this_entry.post_count
+
+    return -1 if this_entry.value < other_entry.value else 1
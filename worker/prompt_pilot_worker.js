@@ -0,0 +1,3 @@
+"use strict";(()=>{var I=Uint8Array,k=Uint16Array,he=Int32Array,xt=new I([0,0,0,0,0,0,0,0,1,1,1,1,2,2,2,2,3,3,3,3,4,4,4,4,5,5,5,5,0,0,0,0]),Tt=new I([0,0,0,0,1,1,2,2,3,3,4,4,5,5,6,6,7,7,8,8,9,9,10,10,11,11,12,12,13,13,0,0]),ge=new I([16,17,18,0,8,7,9,6,10,5,11,4,12,3,13,2,14,1,15]),Mt=function(t,e){for(var r=new k(31),n=0;n<31;++n)r[n]=e+=1<<t[n-1];for(var o=new he(r[30]),n=1;n<30;++n)for(var i=r[n];i<r[n+1];++i)o[i]=i-r[n]<<5|n;return{b:r,r:o}},bt=Mt(xt,2),It=bt.b,ve=bt.r;It[28]=258,ve[258]=28;var Ct=Mt(Tt,0),pe=Ct.b,He=Ct.r,ot=new k(32768);for(d=0;d<32768;++d)O=(d&43690)>>1|(d&21845)<<1,O=(O&52428)>>2|(O&13107)<<2,O=(O&61680)>>4|(O&3855)<<4,ot[d]=((O&65280)>>8|(O&255)<<8)>>1;var O,d,G=(function(t,e,r){for(var n=t.length,o=0,i=new k(e);o<n;++o)t[o]&&++i[t[o]-1];var s=new k(e);for(o=1;o<e;++o)s[o]=s[o-1]+i[o-1]<<1;var u;if(r){u=new k(1<<e);var l=15-e;for(o=0;o<n;++o)if(t[o])for(var c=o<<4|t[o],v=e-t[o],a=s[t[o]-1]++<<v,f=a|(1<<v)-1;a<=f;++a)u[ot[a]>>l]=c}else for(u=new k(n),o=0;o<n;++o)t[o]&&(u[o]=ot[s[t[o]-1]++]>>15-t[o]);return u}),N=new I(288);for(d=0;d<144;++d)N[d]=8;var d;for(d=144;d<256;++d)N[d]=9;var d;for(d=256;d<280;++d)N[d]=7;var d;for(d=280;d<288;++d)N[d]=8;var d,zt=new I(32);for(d=0;d<32;++d)zt[d]=5;var d;var de=G(N,9,1);var me=G(zt,5,1),rt=function(t){for(var e=t[0],r=1;r<t.length;++r)t[r]>e&&(e=t[r]);return e},S=function(t,e,r){var n=e/8|0;return(t[n]|t[n+1]<<8)>>(e&7)&r},nt=function(t,e){var r=e/8|0;return(t[r]|t[r+1]<<8|t[r+2]<<16)>>(e&7)},ye=function(t){return(t+7)/8|0},we=function(t,e,r){return(e==null||e<0)&&(e=0),(r==null||r>t.length)&&(r=t.length),new I(t.subarray(e,r))};var xe=["unexpected EOF","invalid block type","invalid length/literal","invalid distance","stream finished","no stream handler",,"no callback","invalid UTF-8 data","extra field too long","date not in range 1980-2099","filename too long","stream finishing","invalid zip data"],E=function(t,e,r){var n=new Error(e||xe[t]);if(n.code=t,Error.captureStackTrace&&Error.captureStackTrace(n,E),!r)throw n;return n},Te=function(t,e,r,n){var o=t.length,i=n?n.length:0;if(!o||e.f&&!e.l)return r||new I(0);var s=!r,u=s||e.i!=2,l=e.i;s&&(r=new I(o*3));var c=function(mt){var yt=r.length;if(mt>yt){var wt=new I(Math.max(yt*2,mt));wt.set(r),r=wt}},v=e.f||0,a=e.p||0,f=e.b||0,m=e.l,w=e.d,g=e.m,p=e.n,x=o*8;do{if(!m){v=S(t,a,1);var T=S(t,a+1,3);if(a+=3,T)if(T==1)m=de,w=me,g=9,p=5;else if(T==2){var y=S(t,a,31)+257,D=S(t,a+10,15)+4,A=y+S(t,a+5,31)+1;a+=14;for(var j=new I(A),Q=new I(19),C=0;C<D;++C)Q[ge[C]]=S(t,a+C*3,7);a+=D*3;for(var ct=rt(Q),ae=(1<<ct)-1,ue=G(Q,ct,1),C=0;C<A;){var ht=ue[S(t,a,ae)];a+=ht&15;var b=ht>>4;if(b<16)j[C++]=b;else{var F=0,H=0;for(b==16?(H=3+S(t,a,3),a+=2,F=j[C-1]):b==17?(H=3+S(t,a,7),a+=3):b==18&&(H=11+S(t,a,127),a+=7);H--;)j[C++]=F}}var gt=j.subarray(0,y),R=j.subarray(y);g=rt(gt),p=rt(R),m=G(gt,g,1),w=G(R,p,1)}else E(1);else{var b=ye(a)+4,V=t[b-4]|t[b-3]<<8,h=b+V;if(h>o){l&&E(0);break}u&&c(f+V),r.set(t.subarray(b,h),f),e.b=f+=V,e.p=a=h*8,e.f=v;continue}if(a>x){l&&E(0);break}}u&&c(f+131072);for(var le=(1<<g)-1,fe=(1<<p)-1,_=a;;_=a){var F=m[nt(t,a)&le],q=F>>4;if(a+=F&15,a>x){l&&E(0);break}if(F||E(2),q<256)r[f++]=q;else if(q==256){_=a,m=null;break}else{var vt=q-254;if(q>264){var C=q-257,B=xt[C];vt=S(t,a,(1<<B)-1)+It[C],a+=B}var tt=w[nt(t,a)&fe],et=tt>>4;tt||E(3),a+=tt&15;var R=pe[et];if(et>3){var B=Tt[et];R+=nt(t,a)&(1<<B)-1,a+=B}if(a>x){l&&E(0);break}u&&c(f+131072);var pt=f+vt;if(f<R){var dt=i-R,ce=Math.min(R,pt);for(dt+f<0&&E(3);f<ce;++f)r[f]=n[dt+f]}for(;f<pt;++f)r[f]=r[f-R]}}e.l=m,e.p=_,e.b=f,e.f=v,m&&(v=1,e.m=g,e.d=w,e.n=p)}while(!v);return f!=r.length&&s?we(r,0,f):r.subarray(0,f)};var Me=new I(0);var be=function(t){(t[0]!=31||t[1]!=139||t[2]!=8)&&E(6,"invalid gzip data");var e=t[3],r=10;e&4&&(r+=(t[10]|t[11]<<8)+2);for(var n=(e>>3&1)+(e>>4&1);n>0;n-=!t[r++]);return r+(e&2)},Ie=function(t){var e=t.length;return(t[e-4]|t[e-3]<<8|t[e-2]<<16|t[e-1]<<24)>>>0};function At(t,e){var r=be(t);return r+8>t.length&&E(6,"invalid gzip data"),Te(t.subarray(r,-8),{i:2},e&&e.out||new I(Ie(t)),e&&e.dictionary)}var Ce=typeof TextDecoder<"u"&&new TextDecoder,ze=0;try{Ce.decode(Me,{stream:!0}),ze=1}catch{}var Z="prompt_pilot",St=`/${Z}/v1`;function K(t,e,r,n){let o={};for(let i of t){let s=e(i),u=r[s];if(!(u<0||u>0))continue;let l=o[s]??=[];if(u<0)l.push(i);else if(l.length<u||n(i,l[u-1])<0){let c=0,v=l.length;for(;c<v;){let a=c+v>>>1;n(l[a],i)<0?c=a+1:v=a}l.splice(c,0,i),l.length=Math.min(l.length,u)}}return Object.values(o).flat().sort(n)}var Ae=1/16,Se=256,Wt=t=>t.split(/[ _-]/g);function it(t){let e=[...t],r=new Map,n=[],o=new Uint32Array(e.length+1),i=[];e.forEach((g,p)=>{for(let x of Wt(g.value)){let T=r.get(x);T===void 0&&(T=n.length,r.set(x,T),n.push(x)),i.push(T)}o[p+1]=i.length});let s=n.map((g,p)=>p).sort((g,p)=>n[g]<n[p]?-1:1),u=new Uint32Array(s.length);s.forEach((g,p)=>u[g]=p);let l=s.map(g=>n[g]),c=Uint32Array.from(i,g=>u[g]),v=new Int32Array(l.length).fill(-1),a=new Uint32Array(l.length+1),f=g=>{for(let p=0;p<e.length;p++)for(let x=o[p];x<o[p+1];x++){let T=c[x];v[T]!==p&&l[T]!==""&&(v[T]=p,g(T,p))}};f(g=>a[g+1]++);for(let g=0;g<l.length;g++)a[g+1]+=a[g];let m=new Uint32Array(a[l.length]),w=a.slice(0,l.length);return v.fill(-1),f((g,p)=>m[w[g]++]=p),{tags:e,tagIds:new Map(e.map((g,p)=>[g.value,p])),words:l,postingOffsets:a,postings:m,tagWordOffsets:o,tagWords:c,builtCount:e.length,overlayWords:[],removedCount:0}}function Ot(t,e){let r=t.tagIds.get(e.value);if(r!==void 0){t.tags[r]=e;return}t.tagIds.set(e.value,t.tags.length),t.tags.push(e),t.overlayWords.push(Wt(e.value)),Rt(t)}function Dt(t,e){let r=t.tagIds.get(e);r!==void 0&&(t.tagIds.delete(e),t.tags[r]=void 0,t.removedCount++,Rt(t))}function Rt(t){t.overlayWords.length+t.removedCount>Math.max(Se,t.builtCount*Ae)&&Object.assign(t,it(t.tags.filter(e=>e!==void 0)))}function Ut(t,e){let{words:r,postingOffsets:n,postings:o,tags:i}=t,s=new Uint8Array(i.length),u=[],l=c=>{!s[c]&&i[c]&&(s[c]=1,u.push(c))};for(let c of e){let[v,a]=Lt(r,c);for(let f=n[v];f<n[a];f++)l(o[f]);t.overlayWords.forEach((f,m)=>{f.some(w=>w.startsWith(c))&&l(t.builtCount+m)})}return u}function Pt(t,e){let r=t.overlayWords.length;for(let n of e){let[o,i]=Lt(t.words,n);r+=t.postingOffsets[i]-t.postingOffsets[o]}return r}function st(t,e,r){if(e>=t.builtCount){let i=t.overlayWords[e-t.builtCount];return i.forEach((s,u)=>r[u]=s),i.length}let n=t.tagWordOffsets[e],o=t.tagWordOffsets[e+1];for(let i=n;i<o;i++)r[i-n]=t.words[t.tagWords[i]];return o-n}function Lt(t,e){let r=Et(t,0,n=>n<e);return[r,Et(t,r,n=>n.startsWith(e))]}function Et(t,e,r){let n=t.length;for(;e<n;){let o=e+n>>>1;r(t[o])?e=o+1:n=o}return e}var M,z,$=[],W,Ft;function Bt(t){t&&(M={},Object.entries(t.tagModels).forEach(([e,r])=>{Nt(e,r)}),Ee(M))}function Gt(t,e=[]){!t||!M||(e.forEach(r=>{let n=M[r];if(n){qt(n);for(let o of Object.values(M))o.consequentTagModel===n&&qt(o)}}),Object.entries(t.tagModels).forEach(([r,n])=>{let o=M[r];if(o&&o.isOfficial){o.category=n.category,o.useCount=n.use_count,o.postCount=n.post_count;return}Nt(r,n).forEach(i=>Zt(i))}))}function Nt(t,e){let r=[],n=M[t]??{value:t,category:e.category,useCount:e.use_count,postCount:e.post_count,consequentTagModel:void 0,isOfficial:!0};n.isOfficial=!0;for(let o of e.aliases){let i=M[o]??{value:o,category:e.category,useCount:e.use_count,postCount:e.post_count,consequentTagModel:n,isOfficial:!1};i.isOfficial?i.consequentTagModel=n:(M[o]=i,r.push(i))}return M[t]=n,r.push(n),r}function Ee(t){z=it(Object.values(t)),W=void 0}function at(t){t.value&&t.value in M||(M[t.value]=t,Zt(t))}function qt(t){delete M[t.value],Dt(z,t.value),W=void 0}function Zt(t){Ot(z,t),W=void 0}function $t(t){return M[t]}function Xt(t,e){let r=t.toLowerCase().split(/[ _-]/g).filter(h=>h.trim()!==""),n;r.length>1&&(n=r.join(""));let o=kt(r),i;W&&We(W.queries,r)&&W.tagIds.length<=Pt(z,o)?kt(W.queries).every((h,y)=>h===o[y])?i=W.tagIds:i=W.tagIds.filter(h=>Oe(h,o)):i=Ut(z,o);let s=De(i,r,n),{tagIds:u,counts:l,queryIndexes:c,wordIndexes:v,stride:a}=s,f=z.tags;W={queries:r,tagIds:u.filter((h,y)=>l[y]>0)};let m=new Uint16Array(f.length);u.forEach((h,y)=>{f[h].consequentTagModel||(m[h]=l[y])});let w=[];u.forEach((h,y)=>{let D=f[h].consequentTagModel;if(l[y]>0){let A=D?z.tagIds.get(D.value):void 0;(A===void 0||!m[A]||m[A]<l[y])&&w.push(y)}});let g=r.map(h=>r.indexOf(h)),p=new Uint32Array(r.length);w.forEach(h=>{for(let y=0;y<l[h];y++)p[g[c[h*a+y]]]+=1});let x=new Uint32Array(u.length);w.forEach(h=>{for(let y=0;y<l[h];y++)x[h]+=p[g[c[h*a+y]]]});let T=new Set(e),b={};for(let h of["0","1","3","4","5","custom"])b[h]=window.opts[`${Z}_max_results_group${h}`];return K(w,h=>f[u[h]].category,b,(h,y)=>Ue(h,y,s,T,t,n,r,x)).map(h=>{let y=f[u[h]],D=[];for(let A=0;A<l[h];A++)D.push({word:r[c[h*a+A]],index:v[h*a+A]});return{...y,exists:!1,isPriority:T.has(y.value),matchedWords:D,view:null,previewFile:""}})}function We(t,e){return t.length===e.length&&t.every((r,n)=>e[n].startsWith(r))}function kt(t){return t.map(e=>e.length>3?e.slice(0,3):e)}function Oe(t,e){let r=st(z,t,$);for(let n=0;n<r;n++){let o=$[n];if(e.some(i=>o.startsWith(i)))return!0}return!1}function De(t,e,r){let n=e.length,o={tagIds:t,counts:new Uint16Array(t.length),queryIndexes:new Uint16Array(t.length*n),wordIndexes:new Uint16Array(t.length*n),stride:n};return t.forEach((i,s)=>{let u=s*n,l=0,c=(a,f)=>{o.queryIndexes[u+l]=a,o.wordIndexes[u+l]=f,l++},v=a=>{for(let f=0;f<l;f++)if(o.wordIndexes[u+f]===a)return!0;return!1};if(r&&z.tags[i].value.startsWith(r))for(let a=0;a<e.length;a++)c(a,a);else{let a=st(z,i,$);e.forEach((f,m)=>{if(!v(0)&&Re(a,f)){c(m,0);return}for(let w=0;w<a;w++)if(!v(w)&&$[w].startsWith(f)){c(m,w);break}})}o.counts[s]=l}),o}function Re(t,e){let r=0;for(let n=0;n<t&&r<e.length;n++){let o=$[n];if(r+o.length>e.length)return o.startsWith(e.substring(r));if(!e.startsWith(o,r))return!1;r+=o.length}return r>=e.length}function Ue(t,e,r,n,o,i,s,u){let{tagIds:l,counts:c,wordIndexes:v,stride:a}=r,f=z.tags[l[t]],m=z.tags[l[e]],w=n.has(f.value),g=n.has(m.value);if(w&&!g)return-1;if(!w&&g)return 1;if(f.value===o||i&&f.value===i)return-1;if(m.value===o||i&&m.value===i)return 1;if(c[e]!==c[t])return c[e]-c[t];if(s.length===c[t]){for(let x=0;x<c[t];x++)if(v[t*a+x]!==v[e*a+x])return v[t*a+x]-v[e*a+x]}if(m.useCount!==f.useCount)return m.useCount-f.useCount;let p=u[t]-u[e];return p!==0?p:m.postCount!==f.postCount?m.postCount-f.postCount:f.value<m.value?-1:1}function Yt(t,e,r){Ft?.abort();let n=new AbortController;Ft=n;let o=new URLSearchParams({q:t});e.forEach(i=>o.append("priority",i)),fetch(`${St}/search?${o.toString()}`,{signal:n.signal}).then(async i=>{if(!i.ok){console.error("Error searching tags:",i.statusText),r([]);return}let s=await i.json();if(n.signal.aborted)return;let u=s.items.map(l=>{let c=null;return l.consequent&&(c=M[l.consequent.value]??jt(l.consequent,null,!0),at(c)),at(jt(l,c,l.isOfficial)),{value:l.value,category:l.category,exists:!1,matchedWords:l.matchedWords,useCount:l.useCount,postCount:l.postCount,consequentTagModel:c,isOfficial:l.isOfficial,isPriority:l.isPriority,view:null,previewFile:""}});r(u)}).catch(i=>{i.name!=="AbortError"&&(console.error("Error searching tags:",i),r([]))})}function jt(t,e,r){return{value:t.value,category:t.category,useCount:t.useCount,postCount:t.postCount,consequentTagModel:e,isOfficial:r}}function Vt(t,e){let n="https://danbooru.donmai.us/autocomplete.json";n+=`?search[query]=${encodeURIComponent(t)}`,n+="&search[type]=tag",n+="&limit=50",n+="&version=1";let o=[];fetch(n).then(async i=>{if(!i.ok){console.error("Error fetching tag data:",i.statusText),e(o);return}o=(await i.json()).map(u=>{let l,c=null;return u.antecedent?(l=u.antecedent,c=M[u.label]):l=u.label,{value:l,category:u.category.toString(),exists:!1,matchedWords:[],useCount:0,postCount:u.post_count,consequentTagModel:c,isOfficial:c===void 0,isPriority:!1,view:null,previewFile:null}}),o.forEach(u=>{at({...u})}),e(o)}).catch(i=>{console.error("Error fetching tag data:",i),e(o)})}var J=3,Ht=65537;function Kt(t){let e=new Map,r=t.map((n,o)=>{let i=n.searchWords.map(s=>s.replace(/[ _-]/g,""));for(let s of i)for(let u=0;u<s.length;u++){let l=0,c=1;for(let v=u;v<Math.min(u+J,s.length);v++){l+=(s.charCodeAt(v)+1)*c,c*=Ht;let a=e.get(l);a||(a=[],e.set(l,a)),a[a.length-1]!==o&&a.push(o)}}return i.join(`
+`)});return{loras:t,searchTexts:r,titles:t.map(n=>n.value.split(/[ _-]/g)),postings:e}}function Jt(t,e){let r=[];for(let i of e)for(let s=0;s+Math.min(J,i.length)<=i.length;s++){let u=t.postings.get(Le(i.substring(s,s+J)));if(!u)return[];r.push(u)}if(r.length===0)return t.loras.map((i,s)=>s);r.sort((i,s)=>i.length-s.length);let n=r[0];for(let i=1;i<r.length&&n.length>0;i++)n=n.filter(s=>Fe(r[i],s));let o=e.filter(i=>i.length>J);return n.filter(i=>o.every(s=>t.searchTexts[i].includes(s)))}function Le(t){let e=0;for(let r=t.length-1;r>=0;r--)e=e*Ht+t.charCodeAt(r)+1;return e}function Fe(t,e){let r=0,n=t.length;for(;r<n;){let o=r+n>>>1;t[o]<e?r=o+1:n=o}return t[r]===e}var X,U;function Qt(t){t&&(X={},ut(t))}function ut(t,e=[]){!t||!X||(e.forEach(r=>{delete X[r]}),Object.entries(t.loraModels).forEach(([r,n])=>{X[r]={value:r,searchWords:n.search_words,previewFile:n.preview_file}}),U=Kt(Object.values(X)))}function _t(t){let e=t.toLowerCase().split(/[ _-]/g).filter(s=>s.trim()!=="");if(new Set(e).size!==e.length)return[];let r=window.opts[`${Z}_max_results_grouplora`];if(!(r>0))return[];let n=Jt(U,e),o=new Uint8Array(U.loras.length);return n.forEach(s=>o[s]=je(U.titles[s],e)?1:0),K(n,()=>"lora",{lora:r},(s,u)=>ke(s,u,t,o)).map(s=>{let u=U.loras[s];return{...u,matchedWords:qe(u,e).map(l=>({index:0,word:l})),view:null,isPriority:!1,category:"",exists:!1,useCount:0,postCount:0,consequentTagModel:null,isOfficial:!1}})}function qe(t,e){let r=new Set;for(let n of t.searchWords){let o=n.replace(/[ _-]/g,"");e.forEach(i=>{o.includes(i)&&r.add(i)})}return[...r]}function ke(t,e,r,n){let o=U.loras[t].value,i=U.loras[e].value;if(o===r)return-1;if(i===r)return 1;let s=n[t],u=n[e];return s&&!u?-1:!s&&u?1:o<i?-1:1}function je(t,e){for(let r of e)for(let n of t)if(n.startsWith(r))return!0;return!1}var Y;function te(t){t&&(Y={},lt(t))}function lt(t,e=[]){!t||!Y||(e.forEach(r=>{delete Y[r]}),Object.entries(t.suggestionModels).forEach(([r,n])=>{let o=Object.entries(n).sort(([,i],[,s])=>s-i);Y[r]=o.map(([i,s])=>({value:i,count:s}))}))}function ee(t,e){if(!t)return[];let r=Y[t];if(!r)return[];let n=[];for(let o of r)e.has(o.value)||n.push({...o,view:null,isPriority:!1,matchedWords:[],category:"",exists:!1,useCount:0,postCount:0,consequentTagModel:null,isOfficial:!1,previewFile:null});return n}var Ne=2,Ze=-1;function ne(t){return t?.format===Ne}function oe(t){let e=t.strings,r={version:t.version,tagModels:{},suggestionModels:{},loraModels:{}},n=t.tags;for(let s=0;s<n.count;s++){let u=n.category[s];r.tagModels[e[s]]={post_count:n.postCount[s],category:u===Ze?"custom":String(u),is_deprecated:!1,aliases:re(n.aliases,n.aliasOffsets,s,e),use_count:n.useCount[s]}}let o=t.suggestions;for(let s=0;s<o.tag.length;s++){let u={};for(let l=o.offsets[s];l<o.offsets[s+1];l++)u[e[o.neighbour[l]]]=o.score[l];r.suggestionModels[e[o.tag[s]]]=u}let i=t.loras;for(let s=0;s<i.name.length;s++)r.loraModels[e[i.name[s]]]={search_words:re(i.words,i.wordOffsets,s,e),preview_file:e[i.previewFile[s]]};return r}function re(t,e,r,n){let o=e[r],i=e[r+1],s=[];for(let u=o;u<i;u++)s.push(n[t[u]]);return s}var ie=self;ie.window={opts:{}};var ft=new Set,L;self.onmessage=t=>{let e=t.data;switch(e.type){case"options":ie.window.opts=e.opts,P({id:e.id,result:null});break;case"existTags":e.added.forEach(r=>ft.add(r)),e.removed.forEach(r=>ft.delete(r)),P({id:e.id,result:null});break;case"load":case"delta":try{P({id:e.id,result:e.type==="load"?$e(e.buffer):Xe(e.buffer)})}catch(r){P({id:e.id,error:String(r)})}break;default:L!==void 0&&P({id:L,cancelled:!0}),L=e.id,setTimeout(()=>Ye(e),0)}};function P(t){self.postMessage(t)}function $e(t){let e=new TextDecoder("utf-8").decode(At(new Uint8Array(t))),r=JSON.parse(e),n=ne(r)?oe(r):r;return se(n),{version:n.version??0}}function Xe(t){let e=JSON.parse(new TextDecoder("utf-8").decode(t));return e.full?se(e):(Gt(e,e.removed.tagModels),ut(e,e.removed.loraModels),lt(e,e.removed.suggestionModels)),{version:e.version}}function se(t){Bt(t),Qt(t),te(t)}function Ye(t){if(t.id!==L)return;let e=r=>{t.id===L&&(L=void 0,P({id:t.id,result:r}))};try{switch(t.type){case"searchTag":e(Xt(t.query,t.priorityTags));break;case"searchTagOnServer":Yt(t.query,t.priorityTags,e);break;case"searchTagWithApi":Vt(t.query,e);break;case"searchLora":e(_t(t.query));break;case"searchSuggestion":e(Ve(ee(t.nearestTag,ft)));break}}catch(r){L=void 0,P({id:t.id,error:String(r)})}}function Ve(t){let e={};for(let r of t)e[r.value]=$t(r.value)?.category??"custom";return{items:t,categories:e}}})();
+//# sourceMappingURL=prompt_pilot_worker.js.map